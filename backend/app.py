@@ -1,14 +1,119 @@
-from fastapi import FastAPI, HTTPException
-from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import List, Literal, Optional, get_args, get_origin
 import sqlite3
-from pydantic import BaseModel
-from contextlib import contextmanager
+from pydantic import BaseModel, TypeAdapter, ValidationError, model_validator
+from contextlib import asynccontextmanager, contextmanager
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import json
 import datetime
+import base64
+import logging
+import os
+import re
+import time
+import urllib.parse
+
+import cache
+import db
+import geo
+import metrics
+import migrations
+import passwords
+import ranking
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele o caminho rápido usa o json da biblioteca padrão
+    orjson = None
+
+
+# Logs da aplicação: nível WARNING por padrão, então os logger.debug dos
+# caminhos quentes custam só a checagem de nível
+logger = logging.getLogger("diversityjobs")
+logger.setLevel(os.environ.get("DIVERSITYJOBS_LOG_LEVEL", "WARNING").upper())
+
+# Aquecimento na inicialização: GETs internos (sem rede) nas rotas mais usadas,
+# antes do servidor aceitar conexões. "0" desliga.
+WARMUP_ENABLED = os.environ.get("DIVERSITYJOBS_WARMUP", "1") != "0"
+WARMUP_PATHS = [
+    path.strip()
+    for path in os.environ.get("DIVERSITYJOBS_WARMUP_PATHS", "/jobs,/jobs?limit=50,/jobs/search?q=dados").split(",")
+    if path.strip()
+]
+# serve.py passa o instante em que lançou os workers; sem ele, conta a partir do import
+LAUNCHED_AT = float(os.environ.get("DIVERSITYJOBS_LAUNCHED_AT", time.time()))
+
+STARTUP_SECONDS = metrics.REGISTRY.gauge(
+    "diversityjobs_startup_seconds", "Time spent in each startup phase of this worker.", ("phase",)
+)
+
+async def warmup_request(path):
+    """
+    Executa um GET pelo app ASGI (middlewares incluídos) sem passar pela rede.
+    """
+    url = urllib.parse.urlsplit(path)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": url.path, "raw_path": url.path.encode(), "query_string": url.query.encode(),
+        "root_path": "", "headers": [(b"host", b"warmup")], "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    status = [None]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+
+    await app(scope, receive, send)
+    return status[0]
+
+async def warm_up():
+    """
+    Abre todas as conexões do pool, traz o arquivo do banco para o cache de
+    páginas do sistema e roda cada rota de WARMUP_PATHS uma vez por thread de
+    leitura: as consultas ficam no cache de statements das conexões, o SQLite
+    carrega as páginas dos índices e o FastAPI monta os validadores das rotas.
+    As requisições aparecem nas métricas HTTP. Também sobe o pool de processos
+    do scrypt, já calculando o hash usado no login de e-mails inexistentes.
+    """
+    db.get_pool().open_all()
+    db.get_write_pool().open_all()
+    await asyncio.to_thread(db.warm_page_cache)
+    await passwords.dummy_hash_async()
+    for path in WARMUP_PATHS:
+        statuses = await asyncio.gather(*(warmup_request(path) for _ in range(db.READ_WORKERS)))
+        if any(status != 200 for status in statuses):
+            logger.warning("warm-up request %s answered %s", path, sorted(set(statuses), key=str))
+
+@asynccontextmanager
+async def lifespan(app):
+    # Caminho absoluto: todos os workers usam o mesmo arquivo, qualquer que seja o cwd
+    db.DATABASE_URL = db.resolve_database()
+
+    started = time.perf_counter()
+    # Atualiza bancos existentes (índices, restrições) sem precisar recriá-los;
+    # com vários workers só um aplica, sob o lock de arquivo
+    await asyncio.to_thread(migrations.migrate_database)
+    STARTUP_SECONDS.set("migrations", value=time.perf_counter() - started)
+
+    if WARMUP_ENABLED:
+        started = time.perf_counter()
+        await warm_up()
+        STARTUP_SECONDS.set("warmup", value=time.perf_counter() - started)
+    STARTUP_SECONDS.set("ready", value=time.time() - LAUNCHED_AT)
+    logger.info("worker %d ready %.2fs after launch", os.getpid(), time.time() - LAUNCHED_AT)
 
+    try:
+        yield
+    finally:
+        db.close_pool()
+        passwords.shutdown()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,9 +121,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # Paginação de GET /jobs
 )
-
-DATABASE_URL = "diversityjobs.db"
+# Latência, status e requisições em andamento por rota (exportados em /metrics)
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.get("/")
 def read_root():
@@ -26,12 +132,202 @@ def read_root():
 
 @contextmanager
 def get_db():
-    conn = sqlite3.connect(DATABASE_URL)
-    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
-    try:
+    # Conexões vêm do pool já configuradas (WAL, cache, row_factory)
+    with db.get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+@app.get("/db/pool")
+async def get_pool_stats():
+    """
+    Estatísticas do pool de conexões (inclui tempo de espera) para dimensionamento.
+    """
+    return db.get_pool().stats()
+
+# Streaming das listagens grandes: as linhas são lidas em lotes com fetchmany
+# e escritas na resposta à medida que chegam, sem montar a lista inteira
+StreamFormat = Literal["ndjson", "json"]
+STREAM_BATCH_SIZE = 500
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+def get_stream_format(request: Request, stream: Optional[str]):
+    """
+    Formato de streaming pedido via `?stream=ndjson|json` ou `Accept: application/x-ndjson`.
+    """
+    if stream:
+        return stream
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return "ndjson"
+    return None
+
+def stream_rows(query, params, transform, stream_format, json_column=None):
+    """
+    `json_column`: coluna que já traz o item em JSON (ex.: JobCards.card_json);
+    nesse caso o texto é repassado sem `transform` nem nova serialização.
+    """
+    def generate():
+        with get_db() as conn:
+            cursor = conn.execute(query, params)
+            first = True
+            if stream_format == "json":
+                yield b"["
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                chunk = []
+                for row in rows:
+                    if json_column:
+                        item = row[json_column]
+                    else:
+                        item = json.dumps(transform(row), ensure_ascii=False, default=str)
+                    if stream_format == "ndjson":
+                        chunk.append(item + "\n")
+                    else:
+                        chunk.append(item if first else "," + item)
+                    first = False
+                yield "".join(chunk).encode()
+            if stream_format == "json":
+                yield b"]"
+
+    return StreamingResponse(generate(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+# Cache de respostas das leituras de vagas (bytes já serializados);
+# create_job/update_job/delete_job invalidam as entradas afetadas
+response_cache = cache.ResponseCache()
+_type_adapters = {}
+
+def render_json(model, data):
+    """
+    Valida `data` contra o response_model e serializa em bytes, como o FastAPI faria.
+    """
+    adapter = _type_adapters.get(model)
+    if adapter is None:
+        adapter = _type_adapters[model] = TypeAdapter(model)
+    return adapter.dump_json(adapter.validate_python(data))
+
+# Caminho rápido das listagens grandes: as linhas do banco já têm o formato do
+# response_model, então cada item é só projetado nos campos do modelo e a lista
+# vira bytes direto (orjson quando instalado), sem validar item a item.
+# O response_model continua declarado nas rotas, então o OpenAPI não muda.
+# Opt-in (DIVERSITYJOBS_FAST_JSON=1): por padrão o FastAPI/Pydantic valida a resposta.
+FAST_JSON = os.environ.get("DIVERSITYJOBS_FAST_JSON", "0") == "1"
+_projections = {}
+
+def dump_json_bytes(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+def render_trusted_json(model, data):
+    """
+    Serializa `data` (lista vinda do banco) sem validar: para List[Modelo], cada
+    dict é reduzido aos campos do modelo, com os defaults dos campos ausentes.
+    """
+    item_model = get_args(model)[0] if get_origin(model) in (list, List) else None
+    if isinstance(item_model, type) and issubclass(item_model, BaseModel):
+        fields = _projections.get(item_model)
+        if fields is None:
+            fields = _projections[item_model] = [
+                (name, None if info.is_required() else info.default)
+                for name, info in item_model.model_fields.items()
+            ]
+        data = [{name: item.get(name, default) for name, default in fields} for item in data]
+    return dump_json_bytes(data)
+
+def list_response(model, data, headers=None):
+    """
+    Resposta de uma listagem: bytes prontos pelo caminho rápido ou, com
+    FAST_JSON desligado, os próprios dados para o FastAPI validar.
+    """
+    if not FAST_JSON:
+        return data
+    return Response(content=render_trusted_json(model, data), media_type="application/json", headers=headers)
+
+async def cached_json(key, tags, model, produce, trusted=False):
+    """
+    Devolve a resposta em cache para `key` ou chama `produce()` -> (dados, headers),
+    serializa e guarda com as `tags` usadas na invalidação. `trusted` usa o
+    caminho rápido (sem validação) para listas montadas direto do banco;
+    `dados` em bytes já são o corpo JSON pronto.
+    """
+    if response_cache.sync_due():
+        # No máximo uma leitura por intervalo neste processo; os acertos no
+        # meio do intervalo não vão ao banco
+        version, changed = await db.read(read_cache_changes, response_cache.version)
+        response_cache.apply_versions(version, changed)
+    entry = response_cache.get(key)
+    if entry is not None:
+        body, headers, status = entry.body, entry.headers, "HIT"
+    else:
+        generation = response_cache.generation
+        data, headers = await produce()
+        if isinstance(data, bytes):
+            body = data
+        elif trusted and FAST_JSON:
+            body = render_trusted_json(model, data)
+        else:
+            body = render_json(model, data)
+        response_cache.set(key, body, tags, headers, generation)
+        status = "MISS"
+    return Response(content=body, media_type="application/json", headers={**headers, "X-Cache": status})
+
+def read_cache_changes(conn, since):
+    """
+    (maior versão, tags alteradas) de CacheVersions depois da versão `since`,
+    pelo índice de version. Sem `since` (primeira leitura do processo) só a
+    maior versão, o ponto de partida das invalidações.
+    """
+    if since is None:
+        cursor = conn.execute("SELECT COALESCE(MAX(version), 0) FROM CacheVersions")
+        return cursor.fetchone()[0], []
+    cursor = conn.execute("SELECT tag, version FROM CacheVersions WHERE version > ?", (since,))
+    rows = cursor.fetchall()
+    return max((version for _, version in rows), default=since), [tag for tag, _ in rows]
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return response_cache.stats()
+
+DB_POOL_CONNECTIONS = metrics.REGISTRY.gauge(
+    "diversityjobs_db_pool_connections", "Database connections by pool and state.", ("pool", "state")
+)
+DB_POOL_WAITS = metrics.REGISTRY.counter(
+    "diversityjobs_db_pool_waits_total", "Acquisitions that waited for a free connection.", ("pool",)
+)
+DB_POOL_WAIT_SECONDS = metrics.REGISTRY.counter(
+    "diversityjobs_db_pool_wait_seconds_total", "Time spent waiting for a connection.", ("pool",)
+)
+DB_POOL_TIMEOUTS = metrics.REGISTRY.counter(
+    "diversityjobs_db_pool_timeouts_total", "Acquisitions that timed out.", ("pool",)
+)
+CACHE_ENTRIES = metrics.REGISTRY.gauge("diversityjobs_cache_entries", "Responses in the cache.")
+CACHE_EVENTS = metrics.REGISTRY.counter(
+    "diversityjobs_cache_events_total",
+    "Response cache hits, misses, evictions, invalidations and entries dropped as stale.", ("event",)
+)
+
+def collect_pool_and_cache():
+    for name, pool in (("read", db.get_pool()), ("write", db.get_write_pool())):
+        stats = pool.stats()
+        DB_POOL_CONNECTIONS.set(name, "in_use", value=stats["in_use"])
+        DB_POOL_CONNECTIONS.set(name, "idle", value=stats["idle"])
+        DB_POOL_WAITS.set(name, value=stats["waits"])
+        DB_POOL_WAIT_SECONDS.set(name, value=stats["wait_seconds_total"])
+        DB_POOL_TIMEOUTS.set(name, value=stats["timeouts"])
+    stats = response_cache.stats()
+    CACHE_ENTRIES.set(value=stats["entries"])
+    for event in ("hits", "misses", "evictions", "invalidations", "stale"):
+        CACHE_EVENTS.set(event, value=stats[event])
+
+metrics.REGISTRY.add_collector(collect_pool_and_cache)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Métricas no formato do Prometheus: latência por rota e por comando SQL,
+    linhas por comando, consultas lentas, pool de conexões e cache.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # Pydantic models remain the same
 class Resume(BaseModel):
@@ -89,6 +385,10 @@ class Job(BaseModel):
     posted_date: str
     application_deadline: Optional[str]
     application_process: Optional[str]
+    match_count: Optional[int] = None  # Grupos sociais em comum (matching-jobs)
+    latitude: Optional[float] = None  # Geocodificadas de location (geo.py)
+    longitude: Optional[float] = None
+    distance_km: Optional[float] = None  # Buscas por distância
 
 class JobCreate(BaseModel):
     business_email: str
@@ -116,9 +416,45 @@ class JobUpdate(BaseModel):
 class JobApplication(BaseModel):
     applicant_email: str
 
+def dump_social_groups(groups):
+    """
+    Serializa grupos sociais como array JSON sem vazios/duplicados; os triggers
+    mantêm UserSocialGroups/JobSocialGroups a partir dessa coluna.
+    """
+    normalized = []
+    for group in groups or []:
+        group = group.strip()
+        if group and group not in normalized:
+            normalized.append(group)
+    return json.dumps(normalized, ensure_ascii=False) if normalized else None
+
+# Experiências, formações e habilidades ficam em colunas JSON de Resumes
+# (ver migração 5); gravação e leitura não fazem parsing de texto
+def dump_resume_list(items):
+    return json.dumps(items, ensure_ascii=False) if items else None
+
+def load_resume_list(value):
+    return json.loads(value) if value else []
+
+# Busca textual (FTS5, ranking bm25)
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+def fts_query(text):
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira um
+    termo entre aspas (sem operadores do usuário) e a última aceita prefixo.
+    """
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
 @app.get("/applicants/{email}", response_model=Applicant)
 async def get_applicant_info(email: str):
-    with get_db() as conn:
+    def fetch(conn):
         cursor = conn.cursor()
         
         query = """
@@ -137,38 +473,6 @@ async def get_applicant_info(email: str):
         if not result:
             raise HTTPException(status_code=404, detail="Applicant not found")
         
-        # Tratamento das experiências
-        experiencias_list = []
-        if result['experiencias']:
-            experiencias = result['experiencias'].split('|')  # Usa "|" como delimitador de experiências
-            for experiencia in experiencias:
-                partes = experiencia.split(':', maxsplit=3)
-                experiencia_dict = {
-                    'tempo': partes[0].strip() if len(partes) > 0 else '',
-                    'empresa': partes[1].strip() if len(partes) > 1 else '',
-                    'cargo': partes[2].strip() if len(partes) > 2 else '',
-                    'descricao': partes[3].strip() if len(partes) > 3 else ''
-                }
-                experiencias_list.append(experiencia_dict)
-
-        # Tratamento das formações
-        formacoes_list = []
-        if result['formacoes']:
-            formacoes = result['formacoes'].split('|')  # Usa "|" como delimitador de formações
-            for formacao in formacoes:
-                partes = formacao.split(':', maxsplit=2)
-                formacao_dict = {
-                    'tempo': partes[0].strip() if len(partes) > 0 else '',
-                    'instituicao': partes[1].strip() if len(partes) > 1 else '',
-                    'curso': partes[2].strip() if len(partes) > 2 else ''
-                }
-                formacoes_list.append(formacao_dict)
-
-        # Tratamento das habilidades
-        habilidades_list = []
-        if result['habilidades']:
-            habilidades_list = [habilidade.strip() for habilidade in result['habilidades'].split(',')]
-        
         # Construção do objeto applicant
         applicant = {
             'user_id': result['user_id'],
@@ -177,101 +481,177 @@ async def get_applicant_info(email: str):
             'telefone': result['telefone'],
             'localizacao': result['localizacao'],
             'linkedin': result['linkedin'],
-            'grupoSocial': [result['grupoSocial']] if result['grupoSocial'] else [],
+            'grupoSocial': json.loads(result['grupoSocial']) if result['grupoSocial'] else [],
             'resumoProfissional': result['resumoProfissional'],
-            'experiencias': experiencias_list,
-            'formacoes': formacoes_list,
-            'habilidades': habilidades_list
+            # Colunas estruturadas (arrays JSON): leitura direta, sem parsing
+            'experiencias': load_resume_list(result['experiencias']),
+            'formacoes': load_resume_list(result['formacoes']),
+            'habilidades': load_resume_list(result['habilidades'])
         }
         
         return applicant
 
+    return await db.read(fetch)
+
     
+def applicant_list_item(result):
+    return {
+        'user_id': result['user_id'],
+        'nome': result['nome'],
+        'email': result['email'],
+        'telefone': result['telefone'],
+        'localizacao': result['localizacao'],
+        'linkedin': result['linkedin'],
+        'grupoSocial': json.loads(result['grupoSocial']) if result['grupoSocial'] else [],
+        'resumoProfissional': result['resumoProfissional'],
+        'experiencias': load_resume_list(result['experiencias']),
+        'formacoes': load_resume_list(result['formacoes']),
+        'habilidades': load_resume_list(result['habilidades'])
+    }
+
 @app.get("/applicants", response_model=List[Applicant])
-async def get_all_applicants():
-    with get_db() as conn:
+async def get_all_applicants(request: Request, stream: Optional[StreamFormat] = None):
+    query = """
+    SELECT u.user_id, u.name as nome, u.email, u.phone_number as telefone, 
+           u.address as localizacao, u.linkedin, u.social_group as grupoSocial,
+           r.resume_id, r.resume_file_url, r.summary as resumoProfissional, 
+           r.skills as habilidades, r.education as formacoes, r.experience as experiencias
+    FROM Users u
+    LEFT JOIN Resumes r ON u.user_id = r.user_id
+    WHERE u.user_type = 'applicant'
+    """
+
+    stream_format = get_stream_format(request, stream)
+    if stream_format:
+        return stream_rows(query, (), applicant_list_item, stream_format)
+
+    def fetch(conn):
         cursor = conn.cursor()
-        
-        query = """
-        SELECT u.user_id, u.name as nome, u.email, u.phone_number as telefone, 
-               u.address as localizacao, u.linkedin, u.social_group as grupoSocial,
-               r.resume_id, r.resume_file_url, r.summary as resumoProfissional, 
-               r.skills as habilidades, r.education as formacoes, r.experience as experiencias
-        FROM Users u
-        LEFT JOIN Resumes r ON u.user_id = r.user_id
-        WHERE u.user_type = 'applicant'
-        """
-        
         cursor.execute(query)
         results = cursor.fetchall()
         
         if not results:
             raise HTTPException(status_code=404, detail="No applicants found")
         
-        applicants = []
-        for result in results:
-            experiencias_list = []
-            formacoes_list = []
-            habilidades_list = []
-
-            if result['experiencias']:
-                experiencias = result['experiencias'].split(',')
-                for experiencia in experiencias:
-                    try:
-                        experiencia_dict = {
-                            'tempo': experiencia.split(':')[0],
-                            'empresa': experiencia.split(':')[1],
-                            'cargo': experiencia.split(':')[2],
-                            'descricao': experiencia.split(':')[3]
-                        }
-                    except:
-                        experiencia_dict = {
-                            'tempo': '',
-                            'empresa': experiencia
-                        }
-                    experiencias_list.append(experiencia_dict)
-
-            if result['formacoes']:
-                formacoes = result['formacoes'].split(',')
-                for formacao in formacoes:
-                    try:
-                        formacao_dict = {
-                            'tempo': formacao.split(':')[0],
-                            'instituicao': formacao.split(':')[1]
-                        }
-                    except:
-                        formacao_dict = {
-                            'tempo': '',
-                            'instituicao': formacao
-                        }
-                    formacoes_list.append(formacao_dict)
-                    
-            if result['habilidades']:
-                habilidades_list = result['habilidades'].split(',')
-            
-            applicant = {
-                'user_id': result['user_id'],
-                'nome': result['nome'],
-                'email': result['email'],
-                'telefone': result['telefone'],
-                'localizacao': result['localizacao'],
-                'linkedin': result['linkedin'],
-                'grupoSocial': [result['grupoSocial']] if result['grupoSocial'] else [],
-                'resumoProfissional': result['resumoProfissional'],
-                'experiencias': experiencias_list,
-                'formacoes': formacoes_list,
-                'habilidades': habilidades_list
-            }
-            
-            applicants.append(applicant)
-        
-        return applicants
+        return [applicant_list_item(result) for result in results]
+
+    return list_response(List[Applicant], await db.read(fetch))
+
+
+# Busca de candidatos para empresas (FTS5 + índice de habilidades)
+class CandidateHit(BaseModel):
+    user_id: int
+    nome: str
+    email: str
+    localizacao: Optional[str]
+    grupoSocial: List[str]
+    resumoProfissional: Optional[str]
+    habilidades: List[str]
+    matched_skills: int = 0
+    snippet: Optional[str] = None
+
+@app.get("/candidates/search", response_model=List[CandidateHit])
+async def search_candidates(
+    q: Optional[str] = None,
+    skills: List[str] = Query([]),
+    location: Optional[str] = None,
+    social_group: Optional[str] = None,
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Busca candidatos por habilidades (`?skills=python&skills=sql`), texto livre no
+    resumo/experiências (`q`), localização e grupo social. Os resultados vêm
+    ordenados por número de habilidades encontradas e depois por relevância (bm25).
+    """
+    ctes = []
+    joins = []
+    conditions = ["u.user_type = 'applicant'"]
+    order = []
+    cte_params = []
+    params = []
+
+    wanted_skills = sorted({skill.strip().lower() for skill in skills if skill.strip()})
+    if wanted_skills:
+        placeholders = ", ".join("?" for _ in wanted_skills)
+        ctes.append(f"""skill_hits AS (
+            SELECT user_id, COUNT(DISTINCT skill) AS matched_skills
+            FROM ResumeSkills
+            WHERE skill IN ({placeholders})
+            GROUP BY user_id
+        )""")
+        cte_params += wanted_skills
+        joins.append("INNER JOIN skill_hits k ON k.user_id = u.user_id")
+        order.append("k.matched_skills DESC")
+
+    match = fts_query(q) if q else None
+    if q and not match:
+        return []
+    if match:
+        # snippet() não pode ser usado junto com GROUP BY: os matches são
+        # materializados antes; MIN(rank) escolhe o melhor currículo do candidato
+        # e o snippet vem da mesma linha
+        ctes.append("""text_matches AS MATERIALIZED (
+            SELECT CAST(user_id AS INTEGER) AS user_id, rank AS text_rank,
+                   snippet(ResumesSearch, -1, '<mark>', '</mark>', '…', 12) AS snippet
+            FROM ResumesSearch
+            WHERE ResumesSearch MATCH ?
+        ), text_hits AS (
+            SELECT user_id, MIN(text_rank) AS text_rank, snippet
+            FROM text_matches
+            GROUP BY user_id
+        )""")
+        cte_params.append(match)
+        joins.append("INNER JOIN text_hits t ON t.user_id = u.user_id")
+        order.append("t.text_rank")
+
+    if social_group:
+        conditions.append("u.user_id IN (SELECT user_id FROM UserSocialGroups WHERE social_group = ?)")
+        params.append(social_group)
+    if location:
+        conditions.append("instr(lower(u.address), lower(?)) > 0")
+        params.append(location)
+
+    order.append("u.user_id DESC")
+    with_clause = f"WITH {', '.join(ctes)}" if ctes else ""
+
+    query = f"""
+    {with_clause}
+    SELECT u.user_id, u.name as nome, u.email, u.address as localizacao,
+           u.social_group as grupoSocial, r.summary as resumoProfissional,
+           r.skills as habilidades,
+           {"k.matched_skills" if wanted_skills else "0"} as matched_skills,
+           {"t.snippet" if match else "NULL"} as snippet
+    FROM Users u
+    {" ".join(joins)}
+    LEFT JOIN Resumes r ON r.resume_id = (
+        SELECT MAX(resume_id) FROM Resumes WHERE user_id = u.user_id
+    )
+    WHERE {" AND ".join(conditions)}
+    ORDER BY {", ".join(order)}
+    LIMIT ? OFFSET ?
+    """
+
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(query, cte_params + params + [limit, offset])
+        results = cursor.fetchall()
+
+        hits = []
+        for row in results:
+            hit = dict(row)
+            hit["grupoSocial"] = json.loads(hit["grupoSocial"]) if hit["grupoSocial"] else []
+            hit["habilidades"] = load_resume_list(hit["habilidades"])
+            hits.append(hit)
+        return hits
+
+    return await db.read(fetch)
 
 
 # 2. Get business information
 @app.get("/businesses/{email}", response_model=Business)
 async def get_business_info(email: str):
-    with get_db() as conn:
+    def fetch(conn):
         cursor = conn.cursor()
         
         query = """
@@ -289,10 +669,118 @@ async def get_business_info(email: str):
         
         return dict(result)
 
+    return await db.read(fetch)
+
+# Busca textual de vagas (FTS5, ranking bm25)
+@app.get("/jobs/search", response_model=List[dict])
+async def search_jobs(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Busca vagas por título, descrição, requisitos e benefícios, ordenadas por
+    relevância (bm25). `snippet` traz o trecho encontrado com os termos em <mark>.
+    """
+    match = fts_query(q)
+    if not match:
+        return []
+
+    def fetch(conn):
+        cursor = conn.cursor()
+
+        # O ranking e o LIMIT são resolvidos dentro do FTS5; só as vagas
+        # da página são buscadas em Jobs/Users
+        query = """
+        WITH hits AS (
+            SELECT rowid AS job_id, rank,
+                   snippet(JobsSearch, -1, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM JobsSearch
+            WHERE JobsSearch MATCH ?
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        )
+        SELECT j.job_id as id,
+               j.job_title as title,
+               u.business_name as company,
+               j.location,
+               j.job_type as type,
+               j.social_group as tags,
+               j.salary_range as salary,
+               j.posted_date,
+               h.snippet
+        FROM hits h
+        INNER JOIN Jobs j ON j.job_id = h.job_id
+        INNER JOIN Users u ON u.user_id = j.business_id
+        ORDER BY h.rank
+        """
+        cursor.execute(query, (match, limit, offset))
+        results = cursor.fetchall()
+
+        jobs = []
+        for row in results:
+            job = dict(row)
+            job["tags"] = _decode_list(job["tags"])
+            jobs.append(job)
+        return jobs
+
+    return await db.read(fetch)
+
+# Busca por distância: o R*Tree JobsGeo pré-filtra pelo retângulo que contém
+# o círculo e a distância haversine (geo.distance_sql) confirma e ordena
+NEARBY_PAGE_SIZE = 50
+NEARBY_MAX_PAGE_SIZE = 200
+NEARBY_DEFAULT_RADIUS_KM = 25
+NEARBY_MAX_RADIUS_KM = 500
+
+# O ponto vem do próprio R*Tree (sem ler Jobs para cada candidata); os limites
+# em float32 diferem da coordenada gravada em menos de um metro
+WITHIN_RADIUS_SQL = f"""
+    SELECT g.job_id, {geo.distance_sql("(g.min_lat + g.max_lat) / 2", "(g.min_lon + g.max_lon) / 2")} AS distance_km
+    FROM JobsGeo g
+    WHERE g.max_lat >= ? AND g.min_lat <= ? AND g.max_lon >= ? AND g.min_lon <= ?
+      AND distance_km <= ?
+"""
+
+def within_radius_params(latitude, longitude, radius_km):
+    min_lat, max_lat, min_lon, max_lon = geo.bounding_box(latitude, longitude, radius_km)
+    return geo.distance_params(latitude, longitude) + [min_lat, max_lat, min_lon, max_lon, radius_km]
+
+@app.get("/jobs/nearby", response_model=List[Job])
+async def get_nearby_jobs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(NEARBY_DEFAULT_RADIUS_KM, gt=0, le=NEARBY_MAX_RADIUS_KM),
+    limit: int = Query(NEARBY_PAGE_SIZE, ge=1, le=NEARBY_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Vagas a até `radius_km` do ponto, da mais próxima para a mais distante
+    (`distance_km`). Vagas sem cidade conhecida (ex.: remotas) não entram.
+    """
+    query = f"""
+    WITH ranked AS (
+        {WITHIN_RADIUS_SQL}
+        ORDER BY distance_km, g.job_id
+        LIMIT ? OFFSET ?
+    )
+    SELECT j.*, r.distance_km
+    FROM ranked r
+    INNER JOIN Jobs j ON j.job_id = r.job_id
+    ORDER BY r.distance_km, j.job_id
+    """
+
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(query, within_radius_params(lat, lon, radius_km) + [limit, offset])
+        return [business_job(row) for row in cursor.fetchall()]
+
+    return await db.read(fetch)
+
 # 3. Get job information
 @app.get("/jobs/{job_id}", response_model=Job)
 async def get_job_info(job_id: int):
-    with get_db() as conn:
+    def fetch(conn):
         cursor = conn.cursor()
         
         query = """
@@ -311,151 +799,453 @@ async def get_job_info(job_id: int):
         if job.get("social_group"):
             job["social_group"] = json.loads(job["social_group"])  # Desserializar JSON para lista
         
-        return job
+        return job, {}
+
+    return await cached_json(("job", job_id), (f"job:{job_id}",), Job, lambda: db.read(fetch))
 
 
 # 4. Get all applicants for a job
-@app.get("/jobs/{job_id}/applicants", response_model=List[Applicant])
-async def get_job_applicants(job_id: int):
-    with get_db() as conn:
+APPLICANTS_PAGE_SIZE = 50
+APPLICANTS_MAX_PAGE_SIZE = 200
+
+class RankedApplicant(Applicant):
+    score: float
+    matched_skills: int
+
+@app.get("/jobs/{job_id}/applicants", response_model=List[RankedApplicant])
+async def get_job_applicants(
+    job_id: int,
+    limit: int = Query(APPLICANTS_PAGE_SIZE, ge=1, le=APPLICANTS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Candidatos da vaga ordenados por aderência (ver ranking.py): habilidades
+    citadas nos requisitos, grupos sociais em comum e localização.
+    """
+    def fetch(conn):
         cursor = conn.cursor()
-        
-        query = """
-        SELECT u.user_id, u.email, u.name, u.phone_number, u.address, 
-               u.social_group, u.profile_photo_url,
-               r.resume_id, r.resume_file_url, r.summary, r.skills, 
-               r.education, r.experience
-        FROM Users u
-        LEFT JOIN Resumes r ON u.user_id = r.user_id
-        INNER JOIN Applications a ON u.user_id = a.user_id
-        WHERE a.job_id = ?
-        """
-        
-        cursor.execute(query, (job_id,))
-        results = cursor.fetchall()
-        
-        applicants = []
-        for row in results:
-            resume = {
-                'resume_id': row['resume_id'],
-                'resume_file_url': row['resume_file_url'],
-                'summary': row['summary'],
-                'skills': row['skills'],
-                'education': row['education'],
-                'experience': row['experience']
-            }
-            
-            applicant = {
-                'user_id': row['user_id'],
-                'email': row['email'],
-                'name': row['name'],
-                'phone_number': row['phone_number'],
-                'address': row['address'],
-                'social_group': row['social_group'],
-                'profile_photo_url': row['profile_photo_url'],
-                'resume': resume
-            }
-            applicants.append(applicant)
-            
-        return applicants
+
+        cursor.execute(
+            "SELECT requirements, location, social_group FROM Jobs WHERE job_id = ?",
+            (job_id,)
+        )
+        job = cursor.fetchone()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        job_groups = json.loads(job["social_group"]) if job["social_group"] else []
+
+        # Só colunas leves para pontuar todos os candidatos de uma vez
+        cursor.execute("""
+            SELECT a.user_id, u.address
+            FROM Applications a
+            INNER JOIN Users u ON u.user_id = a.user_id
+            WHERE a.job_id = ?
+        """, (job_id,))
+        applicants = cursor.fetchall()
+        if not applicants:
+            return []
+
+        # Habilidades distintas dos candidatos: os requisitos da vaga são
+        # comparados uma vez por termo, e só os pares que casam saem do SQLite
+        cursor.execute("""
+            SELECT DISTINCT rs.skill
+            FROM Applications a
+            INNER JOIN Resumes r ON r.user_id = a.user_id
+            INNER JOIN ResumeSkills rs ON rs.resume_id = r.resume_id
+            WHERE a.job_id = ?
+        """, (job_id,))
+        required = ranking.required_skills(job["requirements"], [row[0] for row in cursor.fetchall()])
+
+        pairs = conn.cursor()
+        pairs.row_factory = None  # tuplas simples: milhares de linhas de inteiros
+        skill_pairs = []
+        if required:
+            placeholders = ", ".join("?" * len(required))
+            pairs.execute(f"""
+                SELECT DISTINCT r.user_id, rs.skill
+                FROM Applications a
+                INNER JOIN Resumes r ON r.user_id = a.user_id
+                INNER JOIN ResumeSkills rs ON rs.resume_id = r.resume_id
+                WHERE a.job_id = ? AND rs.skill IN ({placeholders})
+            """, (job_id, *required))
+            # Um par por (candidato, termo): variantes da mesma habilidade contam uma vez
+            skill_pairs = [user_id for user_id, _ in {
+                (user_id, required[skill]) for user_id, skill in pairs.fetchall()
+            }]
+
+        group_pairs = []
+        if job_groups:
+            placeholders = ", ".join("?" * len(job_groups))
+            pairs.execute(f"""
+                SELECT usg.user_id
+                FROM Applications a
+                INNER JOIN UserSocialGroups usg ON usg.user_id = a.user_id
+                WHERE a.job_id = ? AND usg.social_group IN ({placeholders})
+            """, (job_id, *job_groups))
+            group_pairs = [user_id for (user_id,) in pairs.fetchall()]
+
+        user_ids, scores, matched = ranking.rank_applicants(
+            [row["user_id"] for row in applicants],
+            [row["address"] for row in applicants],
+            job["location"],
+            skill_pairs, len(set(required.values())),
+            group_pairs, len(set(job_groups)),
+        )
+
+        page = [
+            (int(user_id), round(float(score), 4), int(count))
+            for user_id, score, count in zip(
+                user_ids[offset:offset + limit], scores[offset:offset + limit], matched[offset:offset + limit]
+            )
+        ]
+        if not page:
+            return []
+
+        # Perfis completos só para a página pedida
+        placeholders = ", ".join("?" * len(page))
+        cursor.execute(f"""
+            SELECT u.user_id, u.name as nome, u.email, u.phone_number as telefone,
+                   u.address as localizacao, u.linkedin, u.social_group as grupoSocial,
+                   r.resume_id, r.resume_file_url, r.summary as resumoProfissional,
+                   r.skills as habilidades, r.education as formacoes, r.experience as experiencias
+            FROM Users u
+            LEFT JOIN Resumes r ON u.user_id = r.user_id
+            WHERE u.user_id IN ({placeholders})
+        """, [user_id for user_id, _, _ in page])
+        profiles = {row["user_id"]: row for row in cursor.fetchall()}
+
+        results = []
+        for user_id, score, count in page:
+            applicant = applicant_list_item(profiles[user_id])
+            applicant["score"] = score
+            applicant["matched_skills"] = count
+            results.append(applicant)
+        return results
+
+    return await db.read(fetch)
 
 # 5. Get jobs matching applicant's disability type
+MATCHING_JOBS_PAGE_SIZE = 50
+MATCHING_JOBS_MAX_PAGE_SIZE = 200
+# Vagas mais recentes consideradas por grupo do candidato: limita o conjunto
+# que é contado e ordenado, mesmo para grupos com milhares de vagas
+MATCHING_JOBS_PER_GROUP = 1000
+
+def decode_match_cursor(cursor):
+    match_count, job_id = decode_cursor(cursor)
+    try:
+        return int(match_count), job_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/applicants/{email}/matching-jobs", response_model=List[Job])
-async def get_matching_jobs(email: str):
-    with get_db() as conn:
+async def get_matching_jobs(
+    email: str,
+    response: Response,
+    limit: int = Query(MATCHING_JOBS_PAGE_SIZE, ge=1, le=MATCHING_JOBS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=NEARBY_MAX_RADIUS_KM),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+):
+    """
+    Vagas que compartilham ao menos um grupo social com o candidato,
+    ordenadas pelo número de grupos em comum (`match_count`), entre as
+    MATCHING_JOBS_PER_GROUP vagas mais recentes de cada grupo dele.
+    Paginadas por cursor sobre (match_count, job_id): o token da próxima
+    página vem no header `X-Next-Cursor`.
+
+    Com `radius_km`, só entram vagas a até essa distância do candidato (cidade
+    do cadastro, ou `lat`/`lon` se informados), com `distance_km` preenchido.
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="Provide both lat and lon")
+    after = decode_match_cursor(cursor) if cursor else None
+
+    def fetch(conn):
         cursor = conn.cursor()
-        
-        query = """
-        SELECT j.*
-        FROM Jobs j
-        INNER JOIN Users u ON u.social_group = j.social_group
-        WHERE u.email = ? AND u.user_type = 'applicant'
+
+        cursor.execute(
+            "SELECT user_id, latitude, longitude FROM Users WHERE email = ? AND user_type = 'applicant'",
+            (email,)
+        )
+        applicant = cursor.fetchone()
+        if not applicant:
+            raise HTTPException(status_code=404, detail="Applicant not found")
+
+        nearby = ""
+        distance = "NULL"
+        nearby_params = []
+        distance_params = []
+        if radius_km is not None:
+            origin = (lat, lon) if lat is not None else (applicant['latitude'], applicant['longitude'])
+            if origin[0] is None or origin[1] is None:
+                raise HTTPException(status_code=400, detail="Applicant location unknown; provide lat and lon")
+            nearby = f"AND job_id IN (SELECT job_id FROM ({WITHIN_RADIUS_SQL}))"
+            distance = geo.distance_sql("j.latitude", "j.longitude")
+            nearby_params = within_radius_params(origin[0], origin[1], radius_km)
+            distance_params = geo.distance_params(origin[0], origin[1])
+
+        cursor.execute("SELECT social_group FROM UserSocialGroups WHERE user_id = ?", (applicant['user_id'],))
+        groups = [row[0] for row in cursor.fetchall()]
+
+        # Candidatas: as vagas mais recentes de cada grupo, lidas em ordem pelo
+        # índice (social_group, posted_date, job_id)
+        candidates = set()
+        for group in groups:
+            cursor.execute(f"""
+                SELECT job_id FROM JobSocialGroups
+                WHERE social_group = ? {nearby}
+                ORDER BY posted_date DESC, job_id DESC
+                LIMIT ?
+            """, [group] + nearby_params + [MATCHING_JOBS_PER_GROUP])
+            candidates.update(row[0] for row in cursor.fetchall())
+        if not candidates:
+            return []
+
+        # Grupos em comum contados só para as candidatas (busca pela chave
+        # (job_id, social_group)); só as vagas da página são buscadas em Jobs
+        having = "HAVING (match_count, jsg.job_id) < (?, ?)" if after else ""
+        query = f"""
+        WITH matches AS (
+            SELECT jsg.job_id, COUNT(*) AS match_count
+            FROM JobSocialGroups jsg
+            WHERE jsg.job_id IN (SELECT value FROM json_each(?))
+              AND jsg.social_group IN (SELECT value FROM json_each(?))
+            GROUP BY jsg.job_id
+            {having}
+            ORDER BY match_count DESC, jsg.job_id DESC
+            LIMIT ?
+        )
+        SELECT j.*, m.match_count, {distance} AS distance_km
+        FROM matches m
+        INNER JOIN Jobs j ON j.job_id = m.job_id
+        ORDER BY m.match_count DESC, j.job_id DESC
         """
-        
-        cursor.execute(query, (email,))
+
+        # Placeholders na ordem do texto: CTE (candidatas, grupos, cursor, LIMIT) e depois o SELECT
+        # Busca um item a mais para saber se existe próxima página
+        params = [json.dumps(sorted(candidates)), json.dumps(groups, ensure_ascii=False)]
+        cursor.execute(query, params + list(after or ()) + [limit + 1] + distance_params)
         results = cursor.fetchall()
-        
-        return [dict(row) for row in results]
+
+        if len(results) > limit:
+            last = results[limit - 1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last["match_count"], last["job_id"])
+        return [business_job(row) for row in results[:limit]]
+
+    return await db.read(fetch)
 
 # 6. List all jobs for a business
+def business_job(row):
+    # Transformar resultado em dicionário e desserializar social_group
+    job = dict(row)
+    if job.get("social_group"):
+        job["social_group"] = json.loads(job["social_group"])  # Desserializar JSON para lista
+    return job
+
 @app.get("/businesses/{email}/jobs", response_model=List[Job])
-async def get_business_jobs(email: str):
-    with get_db() as conn:
+async def get_business_jobs(email: str, request: Request, stream: Optional[StreamFormat] = None):
+    # Query para buscar as vagas do negócio
+    query = """
+    SELECT j.*
+    FROM Jobs j
+    INNER JOIN Users u ON u.user_id = j.business_id
+    WHERE u.email = ? AND u.user_type = 'business'
+    """
+
+    def check_business(conn):
         cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM Users WHERE email = ? AND user_type = 'business'", (email,))
+        if cursor.fetchone() is None:
+            raise HTTPException(status_code=404, detail="Business not found")
 
-        # Query para buscar as vagas do negócio
-        query = """
-        SELECT j.*
-        FROM Jobs j
-        INNER JOIN Users u ON u.user_id = j.business_id
-        WHERE u.email = ? AND u.user_type = 'business'
-        """
+    stream_format = get_stream_format(request, stream)
+    if stream_format:
+        # O 404 precisa sair antes do primeiro byte do stream
+        await db.read(check_business)
+        return stream_rows(query, (email,), business_job, stream_format)
+
+    def fetch(conn):
+        cursor = conn.cursor()
         cursor.execute(query, (email,))
         results = cursor.fetchall()
+        if not results:
+            # Lista vazia: empresa sem vagas (200) ou inexistente (404)
+            check_business(conn)
+        return [business_job(row) for row in results], {}
+
+    return await cached_json(
+        ("business_jobs", email), (f"business:{email}",), List[Job], lambda: db.read(fetch), trusted=True
+    )
+
 
-        # Transformar resultados em dicionários e desserializar social_group
+class ApplicationStatusCounts(BaseModel):
+    pending: int = 0
+    reviewed: int = 0
+    accepted: int = 0
+    rejected: int = 0
+
+class DashboardJob(Job):
+    applicant_count: int
+    status_counts: ApplicationStatusCounts
+    latest_application_date: Optional[str]
+
+@app.get("/businesses/{email}/dashboard", response_model=List[DashboardJob])
+async def get_business_dashboard(email: str):
+    """
+    Vagas da empresa com o total de candidaturas, a contagem por status e a
+    data da candidatura mais recente, em uma única consulta agrupada (em vez de
+    chamar /jobs/{id}/candidates para cada vaga). Não passa pelo cache: as
+    candidaturas mudam sem invalidar as entradas da empresa.
+    """
+    query = """
+    WITH business AS (
+        SELECT user_id FROM Users WHERE email = ? AND user_type = 'business'
+    ),
+    totals AS (
+        SELECT a.job_id,
+               COUNT(*) AS applicant_count,
+               SUM(a.status = 'pending') AS pending,
+               SUM(a.status = 'reviewed') AS reviewed,
+               SUM(a.status = 'accepted') AS accepted,
+               SUM(a.status = 'rejected') AS rejected,
+               MAX(a.application_date) AS latest_application_date
+        FROM Applications a
+        WHERE a.job_id IN (SELECT job_id FROM Jobs WHERE business_id = (SELECT user_id FROM business))
+        GROUP BY a.job_id
+    )
+    SELECT j.*,
+           COALESCE(t.applicant_count, 0) AS applicant_count,
+           COALESCE(t.pending, 0) AS pending,
+           COALESCE(t.reviewed, 0) AS reviewed,
+           COALESCE(t.accepted, 0) AS accepted,
+           COALESCE(t.rejected, 0) AS rejected,
+           t.latest_application_date
+    FROM Jobs j
+    LEFT JOIN totals t ON t.job_id = j.job_id
+    WHERE j.business_id = (SELECT user_id FROM business)
+    ORDER BY j.posted_date DESC, j.job_id DESC
+    """
+
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(query, (email,))
         jobs = []
-        for row in results:
-            job = dict(row)
-            if job.get("social_group"):
-                job["social_group"] = json.loads(job["social_group"])  # Desserializar JSON para lista
+        for row in cursor.fetchall():
+            job = business_job(row)
+            job["status_counts"] = {status: job.pop(status) for status in ApplicationStatusCounts.model_fields}
             jobs.append(job)
-
         return jobs
 
+    return await db.read(fetch)
+
 
 # 7. Get all available jobs
+JOBS_PAGE_SIZE = 50
+JOBS_MAX_PAGE_SIZE = 200
+
+def encode_cursor(posted_date, job_id):
+    raw = json.dumps([posted_date, job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        posted_date, job_id = json.loads(raw)
+        return str(posted_date), int(job_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _decode_list(value):
+    # Desserializar JSON, tratando possíveis erros
+    try:
+        return json.loads(value) if value else []
+    except json.JSONDecodeError:
+        return []
+
 @app.get("/jobs", response_model=List[dict])
-async def get_all_jobs():
-    with get_db() as conn:
+async def get_all_jobs(
+    request: Request,
+    limit: int = Query(JOBS_PAGE_SIZE, ge=1, le=JOBS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: Literal["desc", "asc"] = "desc",
+    location: Optional[str] = None,
+    job_type: Optional[str] = None,
+    social_group: Optional[str] = None,
+    business: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+):
+    """
+    Lista vagas paginadas por cursor sobre (posted_date, job_id).
+    O token da próxima página vem no header `X-Next-Cursor` (ausente na última página).
+    Em modo streaming (`?stream=` ou `Accept: application/x-ndjson`) todas as vagas
+    a partir do cursor são enviadas, sem `limit`.
+
+    Lê só de JobCards (cards já em JSON, mantidos por triggers): a página é uma
+    leitura por faixa de índice, sem join com Users e sem decodificar colunas.
+    Com `social_group` a faixa vem de JobSocialGroups (grupo, data, id) e cada
+    vaga é buscada em JobCards pela chave.
+    """
+    # Tabela cuja ordem de índice define a página: o cursor e o ORDER BY usam as colunas dela
+    sort = "g" if social_group else "c"
+    conditions = []
+    params = []
+    if cursor:
+        posted_date, job_id = decode_cursor(cursor)
+        comparison = "<" if order == "desc" else ">"
+        conditions.append(f"({sort}.posted_date, {sort}.job_id) {comparison} (?, ?)")
+        params += [posted_date, job_id]
+    if location:
+        conditions.append("c.location = ?")
+        params.append(location)
+    if job_type:
+        conditions.append("c.job_type = ?")
+        params.append(job_type)
+    if social_group:
+        conditions.append("g.social_group = ?")
+        params.append(social_group)
+    if business:
+        conditions.append("c.business_id = (SELECT user_id FROM Users WHERE email = ? AND user_type = 'business')")
+        params.append(business)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    direction = "DESC" if order == "desc" else "ASC"
+    # CROSS JOIN fixa JobSocialGroups como tabela externa (o SQLite não reordena)
+    source = "JobSocialGroups g CROSS JOIN JobCards c ON c.job_id = g.job_id" if social_group else "JobCards c"
+
+    query = f"""
+    SELECT c.posted_date, c.job_id, c.card_json
+    FROM {source}
+    {where}
+    ORDER BY {sort}.posted_date {direction}, {sort}.job_id {direction}
+    """
+
+    stream_format = get_stream_format(request, stream)
+    if stream_format:
+        return stream_rows(query, params, None, stream_format, json_column="card_json")
+
+    def fetch(conn):
         cursor = conn.cursor()
         
-        query = """
-        SELECT j.job_id as id, 
-               j.job_title as title,
-               u.business_name as company,
-               j.location,
-               j.job_type as type,
-               j.social_group as tags,
-               j.job_description as description,
-               j.requirements as skills,
-               j.benefits,
-               j.salary_range as salary
-        FROM Jobs j
-        INNER JOIN Users u ON u.user_id = j.business_id
-        """
-        
-        cursor.execute(query)
+        # Busca um item a mais para saber se existe próxima página
+        cursor.execute(query + " LIMIT ?", params + [limit + 1])
         results = cursor.fetchall()
         
-        jobs = []
-        for row in results:
-            job = dict(row)
-            
-            # Desserializar JSON, tratando possíveis erros
-            try:
-                job["tags"] = json.loads(job["tags"]) if job["tags"] else []
-            except json.JSONDecodeError:
-                job["tags"] = []
+        page = results[:limit]
+        body = ("[" + ",".join(row["card_json"] for row in page) + "]").encode()
+        headers = {}
+        if len(results) > limit:
+            last = page[-1]
+            headers["X-Next-Cursor"] = encode_cursor(last["posted_date"], last["job_id"])
+        return body, headers
 
-            try:
-                job["skills"] = json.loads(job["skills"]) if job["skills"] else []
-            except json.JSONDecodeError:
-                job["skills"] = []
-
-            try:
-                job["benefits"] = json.loads(job["benefits"]) if job["benefits"] else []
-            except json.JSONDecodeError:
-                job["benefits"] = []
-            
-            jobs.append(job)
-            
-        return jobs
+    key = ("jobs", limit, cursor, order, location, job_type, social_group, business)
+    return await cached_json(key, ("jobs",), List[dict], lambda: db.read(fetch))
 
 # 8. Get all jobs applications for an applicant
 @app.get("/applicants/{email}/applications")
 async def get_applicant_applications(email: str):
-    with get_db() as conn:
+    def fetch(conn):
         cursor = conn.cursor()
         
         query = """
@@ -479,12 +1269,42 @@ async def get_applicant_applications(email: str):
         results = cursor.fetchall()
         
         return [dict(row) for row in results]
+
+    return await db.read(fetch)
     
 # Create a new job
+INSERT_JOB_QUERY = """
+INSERT INTO Jobs (
+    business_id,
+    social_group,
+    job_title,
+    job_description,
+    location,
+    salary_range,
+    requirements,
+    posted_date,
+    application_deadline,
+    application_process
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def job_insert_params(job, business_id):
+    return (
+        business_id,
+        dump_social_groups(job.social_group),  # Salvar como JSON
+        job.job_title,
+        job.job_description,
+        job.location,
+        job.salary_range,
+        job.requirements,
+        job.posted_date,
+        job.application_deadline,
+        job.application_process
+    )
+
 @app.post("/jobs", response_model=JobCreate)
 async def create_job(job: JobCreate):
-    social_group_json = json.dumps(job.social_group) if job.social_group else None  # Serializa para JSON
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
         
         # Obter business_id a partir do e-mail
@@ -501,46 +1321,177 @@ async def create_job(job: JobCreate):
             
         business_id = result['user_id']
         
-        # Inserir na tabela Jobs
-        query = """
-        INSERT INTO Jobs (
-            business_id,
-            social_group,
-            job_title,
-            job_description,
-            location,
-            salary_range,
-            requirements,
-            posted_date,
-            application_deadline,
-            application_process
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
         try:
-            cursor.execute(query, (
-                business_id,
-                social_group_json,  # Salvar como JSON
-                job.job_title,
-                job.job_description,
-                job.location,
-                job.salary_range,
-                job.requirements,
-                job.posted_date,
-                job.application_deadline,
-                job.application_process
-            ))
-            conn.commit()
+            cursor.execute(INSERT_JOB_QUERY, job_insert_params(job, business_id))
             
             return job
             
         except sqlite3.Error as e:
             raise HTTPException(status_code=400, detail=str(e))
 
+    result = await db.write(transaction)
+    response_cache.invalidate("jobs", f"business:{job.business_email}")
+    return result
+
+
+# Importação em lote de vagas (POST /jobs/bulk e import_jobs.py)
+JOBS_BULK_MAX_ROWS = 5000
+SQLITE_MAX_PARAMS = 500  # parâmetros por consulta IN (...)
+
+class JobBulkItem(JobCreate):
+    # Em lote os campos opcionais podem ser omitidos (ex.: colunas vazias no CSV)
+    social_group: Optional[List[str]] = None
+    location: Optional[str] = None
+    salary_range: Optional[str] = None
+    requirements: Optional[str] = None
+    application_deadline: Optional[str] = None
+    application_process: Optional[str] = None
+
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkJobsResult(BaseModel):
+    received: int
+    inserted: int
+    errors: List[BulkRowError]
+
+_job_bulk_adapter = TypeAdapter(JobBulkItem)
 
-@app.post("/applicants", response_model=ApplicantCreate)
+def validation_message(error):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+def parse_ndjson_jobs(lines, first_row=1):
+    """
+    Lê NDJSON (uma vaga por linha). Devolve (linhas, erros) no formato
+    aceito por `insert_jobs`; linhas em branco são ignoradas.
+    """
+    rows, errors = [], []
+    for number, line in enumerate(lines, first_row):
+        if not line.strip():
+            continue
+        try:
+            rows.append((number, json.loads(line)))
+        except ValueError as e:
+            errors.append({"row": number, "error": f"Invalid JSON: {e}"})
+    return rows, errors
+
+def resolve_user_ids(conn, emails, user_type):
+    """
+    Um único SELECT (em blocos) para todos os e-mails do lote: {email: user_id}.
+    """
+    emails = list(emails)
+    user_ids = {}
+    for start in range(0, len(emails), SQLITE_MAX_PARAMS):
+        chunk = emails[start:start + SQLITE_MAX_PARAMS]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor = conn.execute(
+            f"SELECT user_id, email FROM Users WHERE user_type = ? AND email IN ({placeholders})",
+            (user_type, *chunk)
+        )
+        user_ids.update((row["email"], row["user_id"]) for row in cursor.fetchall())
+    return user_ids
+
+def insert_jobs(conn, rows):
+    """
+    Valida e insere um lote de vagas na transação atual de `conn`.
+
+    `rows` é uma lista de (número da linha, objeto bruto). Linhas inválidas ou
+    de empresas inexistentes são reportadas e puladas; as válidas entram com um
+    único `executemany`. Retorna (inseridas, erros, e-mails das empresas afetadas).
+    """
+    errors = []
+    valid = []
+    for number, raw in rows:
+        try:
+            valid.append((number, _job_bulk_adapter.validate_python(raw)))
+        except ValidationError as e:
+            errors.append({"row": number, "error": validation_message(e)})
+
+    business_ids = resolve_user_ids(conn, {job.business_email for _, job in valid}, 'business')
+    params = []
+    for number, job in valid:
+        business_id = business_ids.get(job.business_email)
+        if business_id is None:
+            errors.append({"row": number, "error": "Business not found"})
+        else:
+            params.append((number, job.business_email, job_insert_params(job, business_id)))
+
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    cursor = conn.cursor()
+    cursor.execute("SAVEPOINT bulk_jobs")
+    try:
+        cursor.executemany(INSERT_JOB_QUERY, [values for _, _, values in params])
+        inserted = params
+    except sqlite3.Error:
+        # Alguma linha violou uma restrição: refaz uma a uma para isolar o erro
+        cursor.execute("ROLLBACK TO bulk_jobs")
+        inserted = []
+        for number, email, values in params:
+            cursor.execute("SAVEPOINT bulk_job_row")
+            try:
+                cursor.execute(INSERT_JOB_QUERY, values)
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO bulk_job_row")
+                errors.append({"row": number, "error": str(e)})
+            else:
+                inserted.append((number, email, values))
+            cursor.execute("RELEASE bulk_job_row")
+    cursor.execute("RELEASE bulk_jobs")
+
+    errors.sort(key=lambda error: error["row"])
+    return len(inserted), errors, {email for _, email, _ in inserted}
+
+@app.post("/jobs/bulk", response_model=BulkJobsResult)
+async def create_jobs_bulk(request: Request):
+    """
+    Cria várias vagas em uma transação. Aceita um array JSON ou NDJSON
+    (`Content-Type: application/x-ndjson`); erros são reportados por linha
+    (índice a partir de 1) sem abortar as demais.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows, errors = parse_ndjson_jobs(body.decode("utf-8").splitlines())
+    else:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of jobs")
+        rows, errors = list(enumerate(payload, 1)), []
+
+    received = len(rows) + len(errors)
+    if received > JOBS_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {JOBS_BULK_MAX_ROWS} jobs per request"
+        )
+
+    def transaction(conn):
+        return insert_jobs(conn, rows)
+
+    inserted, row_errors, business_emails = await db.write(transaction)
+    if inserted:
+        response_cache.invalidate("jobs", *(f"business:{email}" for email in business_emails))
+    return {
+        "received": received,
+        "inserted": inserted,
+        "errors": sorted(errors + row_errors, key=lambda error: error["row"]),
+    }
+
+
+# Mesmo formato de GET /applicants/{email}: a senha enviada não volta na resposta
+@app.post("/applicants", response_model=Applicant)
 async def create_applicant(applicant: ApplicantCreate):
-    with get_db() as conn:
+    # scrypt no pool de processos, antes de ocupar a faixa de escrita
+    password_hash = await passwords.hash_password_async(applicant.senha)
+
+    def transaction(conn):
         cursor = conn.cursor()
         
         # Verifica se o email já existe
@@ -548,10 +1499,8 @@ async def create_applicant(applicant: ApplicantCreate):
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        # Serializa grupoSocial
-        social_group_str = None
-        if applicant.grupoSocial:
-            social_group_str = ','.join(applicant.grupoSocial)
+        # Serializa grupoSocial (array JSON, como nas vagas)
+        social_group_str = dump_social_groups(applicant.grupoSocial)
         
         # Insere na tabela Users
         user_query = """
@@ -564,7 +1513,7 @@ async def create_applicant(applicant: ApplicantCreate):
         try:
             cursor.execute(user_query, (
                 applicant.email,
-                applicant.senha,
+                password_hash,
                 applicant.nome,
                 applicant.telefone,
                 applicant.localizacao,
@@ -577,26 +1526,10 @@ async def create_applicant(applicant: ApplicantCreate):
             if any([applicant.resumoProfissional, applicant.experiencias, 
                     applicant.formacoes, applicant.habilidades]):
                 
-                # Serializa experiencias
-                experiencias_str = None
-                if applicant.experiencias:
-                    experiencias_str = '|'.join(
-                        f"{exp['tempo']}:{exp['empresa']}:{exp['cargo']}:{exp['descricao']}" 
-                        for exp in applicant.experiencias
-                    )
-                
-                # Serializa formacoes
-                formacoes_str = None
-                if applicant.formacoes:
-                    formacoes_str = '|'.join(
-                        f"{form['tempo']}:{form['instituicao']}:{form['curso']}" 
-                        for form in applicant.formacoes
-                    )
-                
-                # Serializa habilidades
-                habilidades_str = None
-                if applicant.habilidades:
-                    habilidades_str = ','.join(applicant.habilidades)
+                # Experiências, formações e habilidades são gravadas como arrays JSON
+                experiencias_str = dump_resume_list(applicant.experiencias)
+                formacoes_str = dump_resume_list(applicant.formacoes)
+                habilidades_str = dump_resume_list(applicant.habilidades)
                 
                 resume_query = """
                 INSERT INTO Resumes (
@@ -612,29 +1545,92 @@ async def create_applicant(applicant: ApplicantCreate):
                     habilidades_str
                 ))
             
-            conn.commit()
-            return applicant
+            return {"user_id": user_id, **applicant.model_dump(exclude={"senha"})}
             
         except sqlite3.Error as e:
             raise HTTPException(status_code=400, detail=str(e))
 
+    return await db.write(transaction)
+
+class LoginRequest(BaseModel):
+    email: str
+    senha: str
+
+class LoginResult(BaseModel):
+    user_id: int
+    email: str
+    name: str
+    user_type: str
+
+@app.post("/login", response_model=LoginResult)
+async def login(credentials: LoginRequest):
+    """
+    Confere a senha (scrypt, no pool de processos). Se o hash gravado usa um
+    custo diferente do configurado, ou ainda é texto puro, grava um novo hash.
+    """
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT user_id, email, name, user_type, password_hash FROM Users WHERE email = ?",
+            (credentials.email,)
+        )
+        return cursor.fetchone()
+
+    user = await db.read(fetch)
+    # E-mail inexistente também paga um scrypt, para não ser distinguível pelo tempo
+    stored = user["password_hash"] if user else await passwords.dummy_hash_async()
+    if not await passwords.verify_password_async(credentials.senha, stored) or not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    if passwords.needs_rehash(stored):
+        new_hash = await passwords.hash_password_async(credentials.senha)
+
+        def transaction(conn):
+            # Só troca se o hash não mudou desde a leitura (ex.: troca de senha)
+            conn.execute(
+                "UPDATE Users SET password_hash = ? WHERE user_id = ? AND password_hash = ?",
+                (new_hash, user["user_id"], stored)
+            )
+
+        await db.write(transaction)
+
+    return {key: user[key] for key in ("user_id", "email", "name", "user_type")}
+
 
 @app.get("/users/businesses", response_model=List[dict])
-async def get_business_users():
-    with get_db() as conn:
+async def get_business_users(request: Request, stream: Optional[StreamFormat] = None):
+    # Lista explícita: password_hash nunca sai na resposta
+    query = """
+    SELECT user_id, user_type, email, name, phone_number, address, social_group,
+           profile_photo_url, registration_date, linkedin, business_name
+    FROM Users
+    WHERE user_type = 'business'
+    """
+
+    stream_format = get_stream_format(request, stream)
+    if stream_format:
+        return stream_rows(query, (), dict, stream_format)
+
+    def fetch(conn):
         cursor = conn.cursor()
-        query = "SELECT * FROM Users WHERE user_type = 'business';"
         cursor.execute(query)
         results = cursor.fetchall()
         return [dict(row) for row in results]
+
+    return list_response(List[dict], await db.read(fetch))
     
 @app.put("/jobs/{job_id}")
 async def update_job(job_id: int, job: JobUpdate):
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
 
-        # Verifica se a vaga existe
-        cursor.execute("SELECT * FROM Jobs WHERE job_id = ?", (job_id,))
+        # Verifica se a vaga existe (e-mail da empresa para invalidar o cache)
+        cursor.execute("""
+        SELECT j.job_id, u.email AS business_email
+        FROM Jobs j
+        LEFT JOIN Users u ON u.user_id = j.business_id
+        WHERE j.job_id = ?
+        """, (job_id,))
         existing_job = cursor.fetchone()
         if not existing_job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -644,7 +1640,7 @@ async def update_job(job_id: int, job: JobUpdate):
 
         # Converte `social_group` para JSON, se necessário
         if "social_group" in update_data:
-            update_data["social_group"] = json.dumps(update_data["social_group"])
+            update_data["social_group"] = dump_social_groups(update_data["social_group"])
 
         # Verifica se há algo para atualizar
         if not update_data:
@@ -659,19 +1655,28 @@ async def update_job(job_id: int, job: JobUpdate):
                 f"UPDATE Jobs SET {update_query} WHERE job_id = ?",
                 values
             )
-            conn.commit()
         except sqlite3.Error as e:
             raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
+        return existing_job["business_email"]
+
+    business_email = await db.write(transaction)
+    response_cache.invalidate("jobs", f"job:{job_id}", f"business:{business_email}")
+
     return {"message": "Job updated successfully"}
 
 @app.delete("/jobs/{job_id}")
 async def delete_job(job_id: int):
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
 
-        # Check if the job exists
-        cursor.execute("SELECT * FROM Jobs WHERE job_id = ?", (job_id,))
+        # Check if the job exists (business email is needed to invalidate the cache)
+        cursor.execute("""
+        SELECT j.job_id, u.email AS business_email
+        FROM Jobs j
+        LEFT JOIN Users u ON u.user_id = j.business_id
+        WHERE j.job_id = ?
+        """, (job_id,))
         job = cursor.fetchone()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -679,10 +1684,14 @@ async def delete_job(job_id: int):
         # Delete the job
         try:
             cursor.execute("DELETE FROM Jobs WHERE job_id = ?", (job_id,))
-            conn.commit()
         except sqlite3.Error as e:
             raise HTTPException(status_code=500, detail=f"Database error: {e}")
 
+        return job["business_email"]
+
+    business_email = await db.write(transaction)
+    response_cache.invalidate("jobs", f"job:{job_id}", f"business:{business_email}")
+
     return {"message": "Job deleted successfully"}
 
 @app.post("/jobs/{job_id}/apply")
@@ -690,71 +1699,50 @@ async def apply_for_job(job_id: int, application: JobApplication):
     """
     Permite que um candidato aplique para uma vaga usando o ID da vaga e seu e-mail.
     """
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
 
-        try:
-            # Verificar se o candidato existe
-            print("Verificando candidato...")
-            applicant_query = """
-            SELECT user_id
-            FROM Users
-            WHERE email = ? AND user_type = 'applicant'
-            """
-            cursor.execute(applicant_query, (application.applicant_email,))
-            applicant = cursor.fetchone()
-            print("Candidato encontrado:", applicant)
-
-            if not applicant:
-                raise HTTPException(status_code=404, detail="Applicant not found")
-            applicant_id = applicant['user_id']
-
-            # Verificar se a vaga existe
-            print("Verificando vaga...")
-            job_query = """
-            SELECT job_id
-            FROM Jobs
-            WHERE job_id = ?
-            """
-            cursor.execute(job_query, (job_id,))
-            job = cursor.fetchone()
-            print("Vaga encontrada:", job)
-
-            if not job:
-                raise HTTPException(status_code=404, detail="Job not found")
-
-            # Verificar se o candidato já aplicou
-            print("Verificando aplicação existente...")
-            application_check_query = """
-            SELECT *
-            FROM Applications
-            WHERE user_id = ? AND job_id = ?
-            """
-            cursor.execute(application_check_query, (applicant_id, job_id))
-            existing_application = cursor.fetchone()
-            print("Aplicação existente:", existing_application)
-
-            if existing_application:
-                raise HTTPException(status_code=400, detail="Applicant already applied for this job")
-
-            # Inserir nova aplicação
-            print("Inserindo aplicação...")
-            apply_query = """
-            INSERT INTO Applications (user_id, job_id, application_date, status)
-            VALUES (?, ?, CURRENT_TIMESTAMP, 'pending')
-            """
-            cursor.execute(apply_query, (applicant_id, job_id))
-            conn.commit()
-            print("Aplicação inserida com sucesso.")
-            return {"message": "Application submitted successfully"}
+        def lookup():
+            # Só nos caminhos de erro: user_id para o log e o que faltou para a resposta 404
+            cursor.execute("""
+                SELECT (SELECT user_id FROM Users WHERE email = ? AND user_type = 'applicant') AS user_id,
+                       EXISTS(SELECT 1 FROM Jobs WHERE job_id = ?) AS job
+            """, (application.applicant_email, job_id))
+            return cursor.fetchone()
 
+        try:
+            # Um único INSERT ... SELECT: não insere nada se o candidato ou a
+            # vaga não existirem, e UNIQUE(user_id, job_id) barra duplicatas
+            # mesmo com envios simultâneos
+            cursor.execute("""
+                INSERT INTO Applications (user_id, job_id, application_date, status)
+                SELECT u.user_id, j.job_id, CURRENT_TIMESTAMP, 'pending'
+                FROM Users u, Jobs j
+                WHERE u.email = ? AND u.user_type = 'applicant' AND j.job_id = ?
+                RETURNING user_id
+            """, (application.applicant_email, job_id))
+            inserted = cursor.fetchone()
+        except sqlite3.IntegrityError:
+            logger.debug("apply duplicate job_id=%s user_id=%s", job_id, lookup()["user_id"])
+            raise HTTPException(status_code=400, detail="Applicant already applied for this job")
         except sqlite3.Error as e:
-            print("Erro no SQLite:", str(e))
+            logger.exception("apply failed job_id=%s", job_id)
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        if inserted is None:
+            found = lookup()
+            detail = "Applicant not found" if found["user_id"] is None else "Job not found"
+            logger.debug("apply rejected job_id=%s user_id=%s reason=%r", job_id, found["user_id"], detail)
+            raise HTTPException(status_code=404, detail=detail)
+
+        logger.debug("apply ok job_id=%s user_id=%s", job_id, inserted["user_id"])
+        return {"message": "Application submitted successfully"}
+
+    return await db.write(transaction)
         
 @app.put("/applicants/{email}")
 async def update_applicant(email: str, applicant: ApplicantCreate):
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
 
         # Verifica se o usuário existe
@@ -793,28 +1781,14 @@ async def update_applicant(email: str, applicant: ApplicantCreate):
                 applicant.telefone,
                 applicant.localizacao,
                 applicant.linkedin,
-                json.dumps(applicant.grupoSocial) if applicant.grupoSocial else None,
+                dump_social_groups(applicant.grupoSocial),
                 user_id
             ))
 
-            # Formata experiências, formações e habilidades como strings
-            experiencias_str = None
-            if applicant.experiencias:
-                experiencias_str = ",".join(
-                    f"{exp['tempo']}:{exp['empresa']}" 
-                    for exp in applicant.experiencias
-                )
-            
-            formacoes_str = None
-            if applicant.formacoes:
-                formacoes_str = ",".join(
-                    f"{form['tempo']}:{form['instituicao']}" 
-                    for form in applicant.formacoes
-                )
-            
-            habilidades_str = None
-            if applicant.habilidades:
-                habilidades_str = ",".join(applicant.habilidades)
+            # Experiências, formações e habilidades são gravadas como arrays JSON
+            experiencias_str = dump_resume_list(applicant.experiencias)
+            formacoes_str = dump_resume_list(applicant.formacoes)
+            habilidades_str = dump_resume_list(applicant.habilidades)
 
             # Atualiza Resumes
             cursor.execute(update_resume_query, (
@@ -825,16 +1799,30 @@ async def update_applicant(email: str, applicant: ApplicantCreate):
                 user_id
             ))
 
-            conn.commit()
+            # Candidato cadastrado sem currículo: cria em vez de descartar os dados
+            if cursor.rowcount == 0:
+                cursor.execute("""
+                INSERT INTO Resumes (summary, experience, education, skills, user_id)
+                VALUES (?, ?, ?, ?, ?)
+                """, (
+                    applicant.resumoProfissional,
+                    experiencias_str,
+                    formacoes_str,
+                    habilidades_str,
+                    user_id
+                ))
+
             return {"message": "Applicant updated successfully"}
             
         except sqlite3.Error as e:
             raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
 
+    return await db.write(transaction)
+
         
 @app.get("/jobs/{job_id}/candidates")
 async def get_job_candidates(job_id: int):
-    with get_db() as conn:
+    def fetch(conn):
         cursor = conn.cursor()
         
         query = """
@@ -857,12 +1845,18 @@ async def get_job_candidates(job_id: int):
         except sqlite3.Error as e:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    return await db.read(fetch)
+
+# Valores permitidos pelo CHECK de Applications.status
+ApplicationStatus = Literal["pending", "reviewed", "accepted", "rejected"]
+APPLICATION_STATUS_BULK_MAX = 1000
+
 @app.post("/applications/{job_id}/status")
-async def update_application_status(job_id: int, application: JobApplication, status: str):
+async def update_application_status(job_id: int, application: JobApplication, status: ApplicationStatus):
     """
     Updates the status of a job application based on applicant email and job ID.
     """
-    with get_db() as conn:
+    def transaction(conn):
         cursor = conn.cursor()
 
         try:
@@ -886,10 +1880,89 @@ async def update_application_status(job_id: int, application: JobApplication, st
             if cursor.rowcount == 0:
                 raise HTTPException(status_code=404, detail="Application not found")
             
-            conn.commit()
             return {"message": "Application status updated successfully"}
 
         except sqlite3.Error as e:
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    return await db.write(transaction)
+
+class ApplicationStatusUpdate(BaseModel):
+    applicant_email: Optional[str] = None
+    user_id: Optional[int] = None
+    status: ApplicationStatus
+
+    @model_validator(mode="after")
+    def check_applicant(self):
+        if (self.applicant_email is None) == (self.user_id is None):
+            raise ValueError("Provide exactly one of applicant_email or user_id")
+        return self
+
+class ApplicationStatusResult(BaseModel):
+    index: int
+    applicant_email: Optional[str]
+    user_id: Optional[int]
+    status: str
+    updated: bool
+    error: Optional[str] = None
+
+@app.post("/applications/{job_id}/status/bulk", response_model=List[ApplicationStatusResult])
+async def update_application_statuses(job_id: int, updates: List[ApplicationStatusUpdate]):
+    """
+    Atualiza o status de várias candidaturas da vaga em uma transação.
+    Os status são validados antes de tocar no banco (422 se algum for inválido);
+    candidatos/candidaturas inexistentes aparecem como erro no item.
+    """
+    if len(updates) > APPLICATION_STATUS_BULK_MAX:
+        raise HTTPException(
+            status_code=413, detail=f"At most {APPLICATION_STATUS_BULK_MAX} updates per request"
+        )
+
+    def transaction(conn):
+        cursor = conn.cursor()
+
+        # Todos os e-mails em uma consulta; depois, quais candidaturas existem
+        emails = resolve_user_ids(
+            conn, {u.applicant_email for u in updates if u.applicant_email is not None}, 'applicant'
+        )
+        results = []
+        for index, update in enumerate(updates):
+            user_id = update.user_id if update.user_id is not None else emails.get(update.applicant_email)
+            results.append({
+                "index": index,
+                "applicant_email": update.applicant_email,
+                "user_id": user_id,
+                "status": update.status,
+                "updated": False,
+                "error": None if user_id is not None else "Applicant not found",
+            })
+
+        user_ids = list({result["user_id"] for result in results if result["user_id"] is not None})
+        applied = set()
+        for start in range(0, len(user_ids), SQLITE_MAX_PARAMS):
+            chunk = user_ids[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT user_id FROM Applications WHERE job_id = ? AND user_id IN ({placeholders})",
+                (job_id, *chunk)
+            )
+            applied.update(row["user_id"] for row in cursor.fetchall())
+
+        params = []
+        for result in results:
+            if result["error"]:
+                continue
+            if result["user_id"] not in applied:
+                result["error"] = "Application not found"
+                continue
+            result["updated"] = True
+            params.append((result["status"], job_id, result["user_id"]))
+
+        cursor.executemany(
+            "UPDATE Applications SET status = ? WHERE job_id = ? AND user_id = ?", params
+        )
+        return results
+
+    return await db.write(transaction)
+
 
@@ -0,0 +1,99 @@
+"""
+Benchmark de throughput com requisições concorrentes, comparando as consultas
+executadas direto no event loop (DIVERSITYJOBS_DB_OFFLOAD=0, comportamento
+antigo) com as faixas de leitura/escrita em threads (DIVERSITYJOBS_DB_OFFLOAD=1).
+
+Uso (a partir de backend/):
+    python benchmarks/bench_offload.py --db diversityjobs.db --concurrency 32 --requests 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    "/jobs",
+    "/jobs/1",
+    "/applicants",
+    "/applicants/john@example.com",
+    "/businesses/tech@company.com/jobs",
+    "/applicants/john@example.com/applications",
+]
+
+
+def start_server(db_path, port, offload):
+    env = dict(os.environ)
+    env["DIVERSITYJOBS_DB"] = os.path.abspath(db_path)
+    env["DIVERSITYJOBS_DB_OFFLOAD"] = "1" if offload else "0"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base_url}/", timeout=0.5)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def run_load(base_url, concurrency, total):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def hit(i):
+        start = time.perf_counter()
+        response = session.get(base_url + ENDPOINTS[i % len(ENDPOINTS)])
+        return time.perf_counter() - start, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(hit, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status >= 500)
+    return {
+        "throughput": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "diversityjobs.db"))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, offload in (("before (on event loop)", False), ("after (read/write lanes)", True)):
+        process, base_url = start_server(args.db, args.port, offload)
+        try:
+            run_load(base_url, args.concurrency, min(args.requests, 200))  # aquecimento
+            result = run_load(base_url, args.concurrency, args.requests)
+        finally:
+            process.terminate()
+            process.wait()
+        print(
+            f"{label:26} {result['throughput']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"5xx {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark do cadastro com scrypt: vazão de POST /applicants com um custo
+escolhido, com os hashes no pool de processos e direto no event loop.
+
+Enquanto os cadastros rodam, uma tarefa mede a latência de GET / para mostrar
+quanto o event loop fica travado em cada modo.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_passwords.py --log-n 14 --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import os
+import statistics
+import sys
+import time
+import types
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_harness():
+    spec = importlib.util.spec_from_file_location("api_harness", os.path.join(BACKEND_DIR, "test.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+async def register(client, total, concurrency, prefix):
+    counter = itertools.count()
+    latencies = []
+
+    async def worker():
+        while next(counter) < total:
+            email = f"{prefix}-{time.perf_counter_ns()}@example.com"
+            start = time.perf_counter()
+            response = await client.post("/applicants", json={"email": email, "nome": "Bench", "senha": "senha-forte"})
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def probe(client, stop, interval=0.01):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/")).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(args):
+    harness = load_harness()
+    options = types.SimpleNamespace(
+        target="inprocess", db=args.db, in_place=False, concurrency=args.concurrency + 1, timeout=120, workers=1
+    )
+    async with harness.open_target(options) as (client, _):
+        import passwords
+
+        passwords.SCRYPT_LOG_N, passwords.SCRYPT_R, passwords.SCRYPT_P = args.log_n, args.r, args.p
+        start = time.perf_counter()
+        passwords.hash_password("senha-forte")
+        single = (time.perf_counter() - start) * 1000
+        print(f"scrypt ln={args.log_n} r={args.r} p={args.p}: {single:.1f} ms por hash, "
+              f"{128 * args.r * 2 ** args.log_n / 2 ** 20:.0f} MiB; {passwords.HASH_WORKERS} processo(s) no pool")
+
+        print(f"\n{'modo':10} {'cadastros/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'GET / p50':>10} {'GET / max':>10}")
+        for mode in ("pool", "inline"):
+            passwords.OFFLOAD = mode == "pool"
+            await register(client, min(args.concurrency, args.requests), args.concurrency, f"warmup-{mode}")
+
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop))
+            start = time.perf_counter()
+            latencies = await register(client, args.requests, args.concurrency, f"bench-{mode}")
+            elapsed = time.perf_counter() - start
+            stop.set()
+            probes = await prober
+            print(f"{mode:10} {args.requests / elapsed:12.1f} {statistics.median(latencies):9.1f} "
+                  f"{percentile(latencies, 0.99):9.1f} {statistics.median(probes):10.1f} {max(probes):10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(BACKEND_DIR, "diversityjobs.db"), help="copiado antes do teste")
+    parser.add_argument("--log-n", type=int, default=14, help="N = 2 ** log-n")
+    parser.add_argument("--r", type=int, default=8)
+    parser.add_argument("--p", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
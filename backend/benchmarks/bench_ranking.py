@@ -0,0 +1,197 @@
+"""
+Benchmark do ranking de candidatos de uma vaga (ranking.py) com muitos
+candidatos: compara a pontuação vetorizada (NumPy) com um laço Python por
+candidato e mede o endpoint GET /jobs/{job_id}/applicants completo.
+
+Os dados sintéticos são criados em uma cópia temporária do banco.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_ranking.py --applicants 10000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SKILLS = [f"skill{i}" for i in range(300)] + [
+    "Python", "SQL", "Docker", "Kubernetes", "AWS", "Java", "React", "Node.js", "Power BI", "Scrum",
+]
+GROUPS = ["Mulheres", "PCD", "LGBTQIA+", "Pessoas Negras", "Neurodiversidade", "Profissional 50+", "Outros"]
+CITIES = ["São Paulo, SP", "Rio de Janeiro, RJ", "Curitiba, PR", "Recife, PE", "Belo Horizonte, MG"]
+
+
+def build_database(path, applicants, seed):
+    import db
+    import migrations
+
+    shutil.copy(os.path.join(BACKEND_DIR, "diversityjobs.db"), path)
+    migrations.migrate_database(path)
+    rng = random.Random(seed)
+    conn = db.connect(path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id FROM Users WHERE user_type = 'business' LIMIT 1")
+        business_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO Jobs (business_id, social_group, job_title, job_description, location,
+                              requirements, posted_date)
+            VALUES (?, ?, 'Engenheiro(a) de Dados', 'Benchmark', 'São Paulo', ?, '2024-12-01')
+        """, (
+            business_id,
+            json.dumps(["Mulheres", "PCD", "Pessoas Negras"]),
+            "- Python, SQL e Docker\n- Kubernetes e AWS\n- skill1, skill2, skill3",
+        ))
+        job_id = cursor.lastrowid
+        for i in range(applicants):
+            cursor.execute("""
+                INSERT INTO Users (user_type, email, password_hash, name, address, social_group)
+                VALUES ('applicant', ?, 'x', ?, ?, ?)
+            """, (
+                f"bench{i}@example.com", f"Candidato {i}", rng.choice(CITIES),
+                json.dumps(rng.sample(GROUPS, rng.randint(1, 3)), ensure_ascii=False),
+            ))
+            user_id = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO Resumes (user_id, summary, skills) VALUES (?, 'Resumo', ?)",
+                (user_id, json.dumps(rng.sample(SKILLS, rng.randint(3, 12)))),
+            )
+            cursor.execute("INSERT INTO Applications (user_id, job_id) VALUES (?, ?)", (user_id, job_id))
+        conn.commit()
+    finally:
+        conn.close()
+    return job_id
+
+
+def load_inputs(path, job_id):
+    """
+    Entradas da versão vetorizada (como no endpoint: só pares que casam com a
+    vaga, como inteiros) e da referência em laço (todos os pares do candidato).
+    """
+    import db
+    import ranking
+
+    conn = db.connect(path)
+    conn.row_factory = None
+    try:
+        requirements, location, social_group = conn.execute(
+            "SELECT requirements, location, social_group FROM Jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        job_groups = json.loads(social_group)
+        applicants = conn.execute("""
+            SELECT a.user_id, u.address FROM Applications a
+            INNER JOIN Users u ON u.user_id = a.user_id WHERE a.job_id = ?
+        """, (job_id,)).fetchall()
+        all_skills = conn.execute("""
+            SELECT DISTINCT r.user_id, rs.skill FROM Applications a
+            INNER JOIN Resumes r ON r.user_id = a.user_id
+            INNER JOIN ResumeSkills rs ON rs.resume_id = r.resume_id
+            WHERE a.job_id = ?
+        """, (job_id,)).fetchall()
+        all_groups = conn.execute("""
+            SELECT usg.user_id, usg.social_group FROM Applications a
+            INNER JOIN UserSocialGroups usg ON usg.user_id = a.user_id WHERE a.job_id = ?
+        """, (job_id,)).fetchall()
+        required = ranking.required_skills(requirements, sorted({skill for _, skill in all_skills}))
+        matched = conn.execute(f"""
+            SELECT DISTINCT r.user_id, rs.skill FROM Applications a
+            INNER JOIN Resumes r ON r.user_id = a.user_id
+            INNER JOIN ResumeSkills rs ON rs.resume_id = r.resume_id
+            WHERE a.job_id = ? AND rs.skill IN ({", ".join("?" * len(required))})
+        """, (job_id, *required)).fetchall()
+        skill_pairs = [user_id for user_id, _ in {(user_id, required[skill]) for user_id, skill in matched}]
+        group_pairs = [user_id for (user_id,) in conn.execute(f"""
+            SELECT usg.user_id FROM Applications a
+            INNER JOIN UserSocialGroups usg ON usg.user_id = a.user_id
+            WHERE a.job_id = ? AND usg.social_group IN ({", ".join("?" * len(job_groups))})
+        """, (job_id, *job_groups))]
+    finally:
+        conn.close()
+
+    user_ids = [user_id for user_id, _ in applicants]
+    addresses = [address for _, address in applicants]
+    vectorized = (user_ids, addresses, location, skill_pairs, len(set(required.values())), group_pairs, len(set(job_groups)))
+    job = {"requirements": requirements, "location": location, "social_group": job_groups}
+    return vectorized, (job, user_ids, addresses, all_skills, all_groups)
+
+
+def rank_loop(job, user_ids, addresses, skill_pairs, group_pairs):
+    # Referência: mesmo score calculado candidato a candidato
+    import ranking
+
+    skills_by_user, groups_by_user = {}, {}
+    for user_id, skill in skill_pairs:
+        skills_by_user.setdefault(user_id, []).append(skill)
+    for user_id, group in group_pairs:
+        groups_by_user.setdefault(user_id, []).append(group)
+    required = ranking.required_skills(job["requirements"], sorted({skill for _, skill in skill_pairs}))
+    required_count = len(set(required.values()))
+    job_groups = set(job["social_group"])
+    location = ranking.normalize(job["location"])
+
+    scored = []
+    for user_id, address in zip(user_ids, addresses):
+        skills = len({required[skill] for skill in skills_by_user.get(user_id, []) if skill in required})
+        groups = sum(1 for group in groups_by_user.get(user_id, []) if group in job_groups)
+        located = location in ranking.REMOTE_LOCATIONS or (location and location in ranking.normalize(address))
+        score = (
+            ranking.SKILL_WEIGHT * (skills / required_count if required else 0.0)
+            + ranking.GROUP_WEIGHT * (groups / len(job_groups) if job_groups else 0.0)
+            + ranking.LOCATION_WEIGHT * (1.0 if located else 0.0)
+        )
+        scored.append((-score, user_id, skills))
+    scored.sort()
+    return scored
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, "bench.db")
+    os.environ["DIVERSITYJOBS_DB"] = path
+    try:
+        job_id = build_database(path, args.applicants, args.seed)
+
+        import ranking
+        from fastapi.testclient import TestClient
+        import app
+
+        vectorized, loop = load_inputs(path, job_id)
+        ranked = ranking.rank_applicants(*vectorized)
+        reference = rank_loop(*loop)
+        assert [int(u) for u in ranked[0]] == [user_id for _, user_id, _ in reference]
+
+        print(f"{args.applicants} candidatos, {len(loop[3])} pares de habilidades")
+        print(f"{'ranking NumPy':26} {timed(lambda: ranking.rank_applicants(*vectorized), args.repeat):8.2f} ms")
+        print(f"{'ranking laço Python':26} {timed(lambda: rank_loop(*loop), args.repeat):8.2f} ms")
+        with TestClient(app.app) as client:
+            url = f"/jobs/{job_id}/applicants?limit=50"
+            assert client.get(url).status_code == 200
+            print(f"{'GET ' + '/jobs/{id}/applicants':26} {timed(lambda: client.get(url), args.repeat):8.2f} ms")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark da serialização das listagens grandes: o caminho padrão do FastAPI
+(validação do response_model + jsonable + json.dumps) contra o caminho rápido
+de app.py (projeção nos campos do modelo + orjson, ou json se o orjson não
+estiver instalado), com 10 mil e 100 mil itens.
+
+Mede também GET /applicants de ponta a ponta em um banco sintético, com
+FAST_JSON ligado e desligado.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_serialization.py --sizes 10000 100000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+GROUPS = ["Mulheres", "PCD", "LGBTQIA+", "Pessoas Negras", "Neurodiversidade"]
+SKILLS = ["Python", "SQL", "Docker", "Excel", "Power BI", "Java", "React", "Scrum", "Figma", "AWS"]
+
+
+def applicant_items(count, rng):
+    return [{
+        "user_id": i,
+        "nome": f"Candidata {i}",
+        "email": f"candidata{i}@example.com",
+        "telefone": "(11) 99999-0000",
+        "localizacao": "São Paulo, SP",
+        "linkedin": f"linkedin.com/in/candidata{i}",
+        "grupoSocial": rng.sample(GROUPS, 2),
+        "resumoProfissional": "Profissional de dados com experiência em análise e engenharia.",
+        "experiencias": [{"tempo": "2020 - Atual", "empresa": "Empresa", "cargo": "Analista", "descricao": "Relatórios"}],
+        "formacoes": [{"curso": "Estatística", "instituicao": "USP", "periodo": "2015 - 2019"}],
+        "habilidades": rng.sample(SKILLS, 4),
+    } for i in range(count)]
+
+
+def job_items(count, rng):
+    # Como business_job(row): todas as colunas de Jobs, inclusive as fora do modelo
+    return [{
+        "job_id": i, "business_id": rng.randint(1, 500), "social_group": rng.sample(GROUPS, 2),
+        "job_title": "Analista de Dados", "job_description": "Análise de dados e relatórios. " * 4,
+        "location": "Remoto", "salary_range": "R$ 5.000 - R$ 7.000", "requirements": "- SQL\n- Python",
+        "posted_date": "2024-11-20", "application_deadline": None, "application_process": None,
+        "job_type": "CLT", "benefits": "VR, VA, plano de saúde",
+    } for i in range(count)]
+
+
+def fastapi_default(adapter, data):
+    # O que serialize_response + JSONResponse.render fazem no FastAPI 0.115
+    value = adapter.validate_python(data)
+    content = adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_encoders(sizes, repeat, seed):
+    from pydantic import TypeAdapter
+    import app
+
+    rng = random.Random(seed)
+    for model, build in ((app.Applicant, applicant_items), (app.Job, job_items)):
+        adapter = TypeAdapter(List[model])
+        for size in sizes:
+            data = build(size, rng)
+            assert json.loads(fastapi_default(adapter, data)) == json.loads(app.render_trusted_json(List[model], data))
+            results = [
+                ("FastAPI (validação + json)", timed(lambda: fastapi_default(adapter, data), repeat)),
+                ("render_json (validação)", timed(lambda: app.render_json(List[model], data), repeat)),
+                ("rápido (orjson)" if app.orjson else "rápido (json)",
+                 timed(lambda: app.render_trusted_json(List[model], data), repeat)),
+            ]
+            baseline = results[0][1]
+            print(f"\nList[{model.__name__}] com {size} itens")
+            for name, ms in results:
+                print(f"  {name:30} {ms:9.1f} ms  {baseline / ms:5.1f}x")
+
+
+def synthetic_databases(sizes, seed):
+    import generate_db
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            path = os.path.join(tmpdir, f"applicants{size}.db")
+            # 5% dos usuários são empresas no gerador
+            generate_db.generate_synthetic(path, int(size / 0.95) + 1, 100, size, seed=seed)
+            yield path, size
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-endpoint", action="store_true")
+    args = parser.parse_args()
+
+    bench_encoders(args.sizes, args.repeat, args.seed)
+    if args.skip_endpoint:
+        return
+
+    from fastapi.testclient import TestClient
+    import app
+    import db
+
+    # A consulta de 100 mil linhas passa do limite do log de consultas lentas
+    logging.getLogger("diversityjobs.sql").setLevel(logging.ERROR)
+    print("\nGET /applicants de ponta a ponta")
+    for path, size in synthetic_databases(args.sizes, args.seed):
+        db.close_pool()
+        db.DATABASE_URL = path
+        with TestClient(app.app) as client:
+            for fast in (False, True):
+                app.FAST_JSON = fast
+                response = client.get("/applicants")
+                assert response.status_code == 200
+                ms = timed(lambda: client.get("/applicants"), args.repeat)
+                label = "rápido" if fast else "FastAPI"
+                print(f"  {len(response.json()):7d} candidatos  {label:8} {ms:9.1f} ms")
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+CACHE_ENABLED = os.environ.get("DIVERSITYJOBS_CACHE", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.environ.get("DIVERSITYJOBS_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL = float(os.environ.get("DIVERSITYJOBS_CACHE_TTL", "60"))
+# Acompanha as versões das tags no banco (tabela CacheVersions): escritas feitas
+# por outros workers também invalidam este cache. Desligado por padrão (um único
+# worker); o serve.py liga quando sobe mais de um
+CACHE_SHARED = os.environ.get("DIVERSITYJOBS_CACHE_SHARED", "0") != "0"
+# Intervalo mínimo entre duas leituras de CacheVersions no mesmo processo; é
+# também o atraso máximo para uma escrita de outro processo invalidar o cache
+CACHE_SYNC_INTERVAL = float(os.environ.get("DIVERSITYJOBS_CACHE_SYNC_MS", "200")) / 1000
+
+
+class CacheEntry:
+    __slots__ = ("body", "headers", "tags", "expires_at")
+
+    def __init__(self, body, headers, tags, expires_at):
+        self.body = body
+        self.headers = headers
+        self.tags = tags
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Cache LRU + TTL de respostas já serializadas (bytes), em memória do processo.
+
+    Cada entrada recebe tags (ex.: "job:7", "business:x@y.com", "jobs") e as
+    escritas chamam `invalidate(*tags)` para remover só as entradas afetadas.
+    `generation` muda a cada invalidação: uma leitura que começou antes de uma
+    escrita não grava no cache um resultado que já pode estar desatualizado.
+
+    Com vários workers cada processo tem seu cache e `invalidate` só alcança o
+    processo que fez a escrita. Com `shared`, o processo guarda a maior versão
+    de CacheVersions que já viu (`version`; triggers gravam versões crescentes
+    nas tags de cada escrita) e, quando `sync_due()`, quem usa o cache lê as
+    tags alteradas desde ela e chama `apply_versions`, que as invalida. Os
+    acertos não consultam o banco: uma escrita de outro processo leva no
+    máximo `sync_interval` (mais a duração de uma leitura) para valer aqui.
+    """
+
+    def __init__(
+        self,
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl=CACHE_TTL,
+        enabled=CACHE_ENABLED,
+        shared=CACHE_SHARED,
+        sync_interval=CACHE_SYNC_INTERVAL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self.version = None
+        self.generation = 0
+        self._synced_at = float("-inf")
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, tags, headers=None, generation=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(body, headers or {}, tuple(tags), time.monotonic() + self.ttl)
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def sync_due(self):
+        """
+        True quando passou `sync_interval` desde a última leitura de
+        CacheVersions; já marca a leitura como feita, para que só uma das
+        requisições simultâneas vá ao banco.
+        """
+        if not (self.enabled and self.shared):
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._synced_at < self.sync_interval:
+                return False
+            self._synced_at = now
+            return True
+
+    def apply_versions(self, version, tags):
+        """
+        Invalida as `tags` alteradas por qualquer processo desde `self.version`
+        e avança para `version`. A primeira chamada (sem versão anterior) só
+        define o ponto de partida.
+        """
+        with self._lock:
+            first = self.version is None
+            if first or tags:
+                # Leituras em andamento podem ter visto os dados antes dessas escritas
+                self.generation += 1
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.stale += 1
+            if first or version > self.version:
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "shared": self.shared,
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+            }
@@ -0,0 +1,411 @@
+"""
+Confere o plano de execução (EXPLAIN QUERY PLAN) de cada comando SQL que a
+API emite, em um banco grande gerado pelo generate_db.py.
+
+Os comandos são coletados com a API rodando no próprio processo: cada
+operação do workload do test.py (e as variações de filtros/streaming abaixo)
+é chamada uma vez, e o cursor instrumentado do db.py registra o SQL, os
+parâmetros e a função do app.py que o executou. Chamadas a execute no app.py
+que nenhuma requisição alcançou aparecem como não cobertas.
+
+Falha quando um comando que filtra ou junta por chave (email, job_id,
+business_id, user_id) faz SCAN em uma tabela grande em vez de SEARCH por
+índice. O relatório é ordenado pelo SQL normalizado e não tem tempos,
+contagens nem números de linha, então pode ser comparado com diff entre versões.
+
+Uso (a partir de backend/):
+    python check_query_plans.py                              # banco sintético temporário
+    python check_query_plans.py --db bench.db --report plans.txt
+"""
+import argparse
+import ast
+import asyncio
+import bisect
+import importlib.util
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BACKEND_DIR, "app.py")
+
+HOT_TABLES = {"Users", "Applications", "Jobs", "Resumes"}
+# Busca por chave com valor (`u.email = ?`, `a.user_id IN (?, ...)`, `j.business_id = (SELECT ...)`)
+KEY_LOOKUP = re.compile(
+    r"(?:\b(\w+)\.)?\b(?:email|job_id|business_id|user_id)\s*(?:=|IN)\s*(?:\?|\(\s*(?:\?|SELECT\b))",
+    re.IGNORECASE,
+)
+TABLE_REFERENCE = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)"
+    r"(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|INNER|LEFT|CROSS|JOIN|ORDER|GROUP|LIMIT|USING|SET|VALUES|SELECT)\b)(\w+))?",
+    re.IGNORECASE,
+)
+# Listagens paginadas por data (cursor sobre (posted_date, job_id)) devem sair na
+# ordem de um índice: uma ordenação em árvore temporária lê e ordena todas as
+# linhas do filtro antes do LIMIT. Rankings por score calculado (bm25, distância,
+# grupos em comum) ordenam por natureza e ficam de fora
+DATE_LISTING = re.compile(r"\bORDER\s+BY\s+(?:\w+\.)?posted_date\b.*\bLIMIT\b", re.IGNORECASE | re.DOTALL)
+SKIPPED_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA", "CREATE", "DROP", "ANALYZE")
+
+# Varreduras intencionais: trecho do SQL normalizado -> motivo
+ALLOWED_SCANS = {
+    "FROM JobSocialGroups WHERE social_group = ? AND job_id IN (SELECT job_id FROM ( SELECT g.job_id": (
+        "candidatas de matching-jobs com radius_km: o SQLite parte das vagas do raio (R*Tree, limitado "
+        "pela área) e ordena só as do grupo dentro dele; percorrer o índice do grupo em ordem leria o "
+        "grupo inteiro quando o raio é pequeno"
+    ),
+}
+
+# Chamadas a execute que o driver não alcança de propósito: (função, SQL) -> motivo
+ALLOWED_UNCOVERED = {
+    ("insert_jobs", "INSERT_JOB_QUERY"): (
+        "refaz o lote linha a linha só quando o executemany viola uma restrição; "
+        "mesmo SQL (e plano) do executemany, que é coberto por POST /jobs/bulk"
+    ),
+}
+
+# Candidato cadastrado sem currículo: o PUT cria a linha em Resumes
+NO_RESUME_EMAIL = f"plans-sem-curriculo-{os.getpid()}-{int(time.time())}@example.com"
+
+def job_cursor(key, job_id):
+    # O app só é importado depois que o test.py aponta DIVERSITYJOBS_DB para o banco
+    import app
+
+    return app.encode_cursor(key, job_id)
+
+
+# Variações de parâmetros que geram SQL diferente das operações do workload
+EXTRA_REQUESTS = [
+    ("GET /jobs?job_type", lambda w: ("GET", "/jobs", {"params": {"job_type": "CLT", "limit": 20}})),
+    ("GET /jobs?social_group", lambda w: ("GET", "/jobs", {"params": {"social_group": "PCD", "limit": 20}})),
+    ("GET /jobs?social_group&cursor", lambda w: (
+        "GET", "/jobs", {"params": {"social_group": "PCD", "limit": 20, "cursor": job_cursor("2024-06-01", 1)}}
+    )),
+    ("GET /jobs?business", lambda w: ("GET", "/jobs", {"params": {"business": w.pick("businesses"), "limit": 20}})),
+    ("GET /jobs?order=asc", lambda w: ("GET", "/jobs", {"params": {"order": "asc", "limit": 20}})),
+    ("GET /jobs?stream", lambda w: ("GET", "/jobs", {"params": {"stream": "ndjson", "location": "Recife"}})),
+    ("GET /candidates/search?q", lambda w: (
+        "GET", "/candidates/search", {"params": {"q": "python", "location": "São Paulo", "social_group": "PCD"}}
+    )),
+    ("GET /jobs/{id}/applicants (with applicants)", lambda w: (
+        "GET", f"/jobs/{max(w.fixtures['applications'], key=lambda job_id: len(w.fixtures['applications'][job_id]))}"
+               "/applicants", {"params": {"limit": 20}}
+    )),
+    ("POST /jobs/{id}/apply (missing job)", lambda w: (
+        "POST", "/jobs/999999999/apply", {"json": {"applicant_email": w.pick("applicants")}}
+    )),
+    # Senha em texto puro do gerador: o login grava o hash (UPDATE do rehash)
+    ("POST /login (rehash)", lambda w: ("POST", "/login", {"json": {"email": w.pick("applicants"), "senha": "hash"}})),
+    ("GET /applicants/{email}/matching-jobs?cursor", lambda w: (
+        "GET", f"/applicants/{w.pick('applicants')}/matching-jobs",
+        {"params": {"limit": 20, "cursor": job_cursor(1, 999999999)}}
+    )),
+    ("GET /applicants/{email}/matching-jobs?radius_km", lambda w: (
+        "GET", f"/applicants/{w.pick('applicants')}/matching-jobs",
+        {"params": {"radius_km": 100, "lat": -22.91, "lon": -43.17, "limit": 20}}
+    )),
+    ("POST /applicants (sem currículo)", lambda w: (
+        "POST", "/applicants", {"json": {"email": NO_RESUME_EMAIL, "nome": "Sem Currículo", "senha": "x"}}
+    )),
+    ("PUT /applicants/{email} (sem currículo)", lambda w: (
+        "PUT", f"/applicants/{NO_RESUME_EMAIL}",
+        {"json": {"email": NO_RESUME_EMAIL, "nome": "Sem Currículo", "senha": "x", "habilidades": ["python"]}}
+    )),
+    ("GET /applicants?stream", lambda w: ("GET", "/applicants", {"params": {"stream": "ndjson"}})),
+    ("GET /users/businesses?stream", lambda w: ("GET", "/users/businesses", {"params": {"stream": "ndjson"}})),
+    ("GET /businesses/{email}/jobs?stream", lambda w: (
+        "GET", f"/businesses/{w.pick('businesses')}/jobs", {"params": {"stream": "ndjson"}}
+    )),
+]
+
+
+class Statement:
+    __slots__ = ("sql", "parameters", "sites", "operations", "count")
+
+    def __init__(self, sql, parameters):
+        self.sql = sql
+        self.parameters = parameters
+        self.sites = set()
+        self.operations = set()
+        self.count = 0
+
+
+def load_harness():
+    # test.py colide com o pacote `test` da biblioteca padrão: carrega pelo caminho
+    spec = importlib.util.spec_from_file_location("api_harness", os.path.join(BACKEND_DIR, "test.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def app_call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename == APP_PATH:
+            return frame.f_lineno
+        frame = frame.f_back
+    return None
+
+
+def parse_app():
+    with open(APP_PATH, encoding="utf-8") as file:
+        source = file.read()
+    return source, ast.parse(source, APP_PATH)
+
+
+def function_ranges(tree):
+    """
+    (primeira linha, última linha, nome) das funções de nível de módulo do app.py.
+    """
+    return sorted(
+        (node.lineno, node.end_lineno, node.name)
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    )
+
+
+def function_at(ranges, line):
+    index = bisect.bisect_right(ranges, (line, float("inf"))) - 1
+    if index >= 0 and ranges[index][0] <= line <= ranges[index][1]:
+        return ranges[index][2]
+    return "<module>"
+
+
+def execute_call_sites():
+    """
+    Chamadas a execute/executemany do app.py (inventário estático): linha ->
+    (função, primeira linha do SQL). Comandos de controle de transação com SQL
+    literal ficam de fora.
+    """
+    source, tree = parse_app()
+    ranges = function_ranges(tree)
+    sites = {}
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        if node.func.attr not in ("execute", "executemany") or not node.args:
+            continue
+        first = node.args[0]
+        if isinstance(first, ast.Constant) and str(first.value).split(None, 1)[0].upper() in SKIPPED_STATEMENTS:
+            continue
+        sites[node.lineno] = (function_at(ranges, node.lineno), ast.get_source_segment(source, first).split("\n")[0])
+    return sites
+
+
+async def collect_statements(args, database):
+    harness = load_harness()
+    options = argparse.Namespace(
+        target="inprocess", db=database, in_place=args.in_place, workers=1, concurrency=1, timeout=120,
+    )
+    statements = {}
+    current = [None]
+
+    async with harness.open_target(options) as (client, working_database):
+        import app
+        import db
+        import metrics
+
+        # Um só worker aqui: liga o acompanhamento de CacheVersions (o dos
+        # vários workers do serve.py) e lê a cada requisição para cobrir as leituras
+        app.response_cache.shared = True
+        app.response_cache.sync_interval = 0
+
+        def capture(sql, parameters):
+            label = metrics.fingerprint(sql)
+            if label.split(None, 1)[0].upper() in SKIPPED_STATEMENTS:
+                return
+            statement = statements.get(label)
+            if statement is None:
+                statement = statements[label] = Statement(sql, parameters)
+            site = app_call_site()
+            if site is not None:
+                statement.sites.add(site)
+            if current[0]:
+                statement.operations.add(current[0])
+            statement.count += 1
+
+        fixtures = harness.load_fixtures(working_database)
+        workload = harness.Workload(fixtures, args.seed, run_id="plans")
+        await harness.prepare(client, workload, working_database)
+        db.statement_listeners.append(capture)
+        try:
+            requests = [(op.name, op.build, op) for op in harness.OPERATIONS]
+            requests += [(name, build, None) for name, build in EXTRA_REQUESTS]
+            for name, build, op in requests:
+                request = build(workload)
+                if request is None:
+                    continue
+                method, url, kwargs = request
+                current[0] = name
+                response = await client.request(method, url, **kwargs)
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text[:200]}")
+                if op is not None and op.on_success and response.status_code in op.expected:
+                    op.on_success(workload, method, url, kwargs, response)
+                if name == "GET /jobs" and response.headers.get("X-Next-Cursor"):
+                    current[0] = "GET /jobs?cursor"
+                    await client.get("/jobs", params={"limit": 50, "cursor": response.headers["X-Next-Cursor"]})
+        finally:
+            db.statement_listeners.remove(capture)
+        plans = explain_all(working_database, statements)
+    return statements, plans
+
+
+def explain_all(database, statements):
+    import geo
+
+    conn = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    geo.register_functions(conn)
+    try:
+        plans = {}
+        for label, statement in statements.items():
+            try:
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters).fetchall()
+            except sqlite3.Error as e:
+                plans[label] = [(0, 0, f"EXPLAIN failed: {e}")]
+                continue
+            plans[label] = [(node_id, parent, detail) for node_id, parent, _, detail in rows]
+        return plans
+    finally:
+        conn.close()
+
+
+def table_aliases(sql):
+    aliases = {}
+    for table, alias in TABLE_REFERENCE.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def scan_violations(label, plan):
+    """
+    SCANs em tabelas grandes que deveriam ser SEARCH: a tabela tem uma busca
+    por chave com valor, ou é o lado interno de um join (uma varredura por
+    linha da tabela externa). A varredura da tabela externa de uma listagem
+    sem filtro por chave (ex.: GET /jobs ordenado por índice) é permitida.
+    Também acusa listagens por data ordenadas em árvore temporária.
+    """
+    aliases = table_aliases(label)
+    looked_up = set()
+    for alias in (match.group(1) for match in KEY_LOOKUP.finditer(label)):
+        looked_up.update([aliases.get(alias, alias)] if alias else aliases.values())
+
+    violations = []
+    loops_by_parent = {}
+    for _, parent, detail in plan:
+        if detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail and DATE_LISTING.search(label):
+            violations.append(f"{detail} (page sorted after reading every matching row)")
+            continue
+        match = re.match(r"(SCAN|SEARCH) (\w+)", detail)
+        if not match:
+            continue
+        inner = loops_by_parent.get(parent, 0) > 0
+        loops_by_parent[parent] = loops_by_parent.get(parent, 0) + 1
+        if match.group(1) != "SCAN" or "VIRTUAL TABLE" in detail:
+            continue
+        table = aliases.get(match.group(2), match.group(2))
+        if table not in HOT_TABLES:
+            continue
+        if table in looked_up:
+            violations.append(f"{detail} (full scan of {table} despite a key lookup)")
+        elif inner:
+            violations.append(f"{detail} (full scan of {table} inside a join)")
+    return violations
+
+
+def plan_lines(plan):
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("    " + "  " * depth[node_id] + detail)
+    return lines
+
+
+def build_report(statements, plans, call_sites):
+    """
+    Retorna (linhas do relatório, comandos com varredura, chamadas não cobertas).
+
+    Cada comando é identificado pelo SQL normalizado; as funções do app.py que
+    o executaram entram só como informação, sem números de linha, para que
+    edições que não mudam o SQL não mudem o relatório.
+    """
+    ranges = function_ranges(parse_app()[1])
+    lines = []
+    failures = []
+    for label, statement in sorted(statements.items()):
+        functions = ", ".join(sorted({function_at(ranges, line) for line in statement.sites})) or "?"
+        violations = scan_violations(label, plans[label])
+        allowed = next((reason for fragment, reason in ALLOWED_SCANS.items() if fragment in label), None)
+        lines.append(f"## {label}")
+        lines.append(f"    app.py: {functions}  [{', '.join(sorted(statement.operations))}]")
+        lines.extend(plan_lines(plans[label]))
+        for violation in violations:
+            if allowed:
+                lines.append(f"    ok: {violation} -- {allowed}")
+            else:
+                lines.append(f"    !! {violation}")
+                failures.append((functions, violation, label))
+        lines.append("")
+
+    covered = set().union(*(statement.sites for statement in statements.values())) if statements else set()
+    missed = sorted({site for line, site in call_sites.items() if line not in covered})
+    uncovered = [site for site in missed if site not in ALLOWED_UNCOVERED]
+    if missed:
+        lines.append("## execute() calls not reached by any request")
+        for function, source in missed:
+            reason = ALLOWED_UNCOVERED.get((function, source))
+            lines.append(f"    {'ok' if reason else '!!'}: app.py {function}  {source}" + (f" -- {reason}" if reason else ""))
+        lines.append("")
+    return lines, failures, uncovered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="banco já gerado (padrão: gera um banco sintético temporário)")
+    parser.add_argument("--in-place", action="store_true", help="usa --db direto em vez de uma cópia")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--applications", type=int, default=60000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", help="grava o relatório neste arquivo (além do stdout)")
+    parser.add_argument("--strict-coverage", action="store_true",
+                        help="falha também se alguma chamada a execute não for alcançada")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="diversityjobs-plans-")
+    try:
+        database = args.db
+        if database is None:
+            import generate_db
+
+            database = os.path.join(workdir, "plans.db")
+            generate_db.generate_synthetic(database, args.users, args.jobs, args.applications, seed=args.seed)
+            args.in_place = True
+        statements, plans = asyncio.run(collect_statements(args, database))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    lines, failures, uncovered = build_report(statements, plans, execute_call_sites())
+    report = "\n".join(lines)
+    print(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+
+    print(f"{len(statements)} statements, {len(failures)} hot-path scans, {len(uncovered)} uncovered execute() calls")
+    if failures or (args.strict_coverage and uncovered):
+        for functions, violation, label in failures:
+            print(f"FAIL app.py {functions}: {violation}\n    {label}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,578 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import geo
+import metrics
+
+
+# Configuração do banco de dados (pode ser sobrescrita por variáveis de ambiente).
+# Sem a variável, o banco é o diversityjobs.db ao lado deste arquivo (como no
+# generate_db.py), não um caminho relativo ao diretório de onde o servidor subiu.
+DEFAULT_DATABASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diversityjobs.db")
+DATABASE_URL = os.environ.get("DIVERSITYJOBS_DB", DEFAULT_DATABASE)
+POOL_SIZE = int(os.environ.get("DIVERSITYJOBS_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("DIVERSITYJOBS_DB_POOL_TIMEOUT", "30"))
+STATEMENT_CACHE_SIZE = int(os.environ.get("DIVERSITYJOBS_DB_STATEMENT_CACHE", "256"))
+# Threads da faixa de leitura; por padrão uma por conexão do pool
+READ_WORKERS = int(os.environ.get("DIVERSITYJOBS_DB_READ_WORKERS", str(POOL_SIZE)))
+# "0" executa as consultas direto no event loop (apenas para depuração/benchmark)
+OFFLOAD = os.environ.get("DIVERSITYJOBS_DB_OFFLOAD", "1") != "0"
+# Group commit: a thread de escrita junta as escritas pendentes em uma única
+# transação, por até GROUP_COMMIT_MS depois da primeira ou GROUP_COMMIT_MAX escritas
+GROUP_COMMIT_MS = float(os.environ.get("DIVERSITYJOBS_DB_GROUP_COMMIT_MS", "2"))
+GROUP_COMMIT_MAX = int(os.environ.get("DIVERSITYJOBS_DB_GROUP_COMMIT_MAX", "64"))
+
+# PRAGMAs aplicados uma única vez quando cada conexão é criada.
+# cache_size negativo é em KiB (-65536 = 64 MiB por conexão).
+PRAGMAS = {
+    "journal_mode": os.environ.get("DIVERSITYJOBS_DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("DIVERSITYJOBS_DB_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.environ.get("DIVERSITYJOBS_DB_CACHE_SIZE", "-65536")),
+    "mmap_size": int(os.environ.get("DIVERSITYJOBS_DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "foreign_keys": "ON",
+    "busy_timeout": int(os.environ.get("DIVERSITYJOBS_DB_BUSY_TIMEOUT", "5000")),
+    "temp_store": "MEMORY",
+}
+
+
+slow_query_logger = logging.getLogger("diversityjobs.sql")
+# Funções chamadas com (sql, parâmetros) antes de cada comando; usadas pelo
+# check_query_plans.py para coletar os comandos que a API realmente emite
+statement_listeners = []
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor que mede cada comando: tempo do execute somado ao dos fetch*
+    seguintes e linhas devolvidas (ou alteradas, em escritas). A medição é
+    fechada no próximo execute, quando o resultado se esgota ou no fetchone
+    (usado para consultas de uma linha).
+    """
+
+    _sql = None
+    _seconds = 0.0
+    _rows = 0
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        for listener in statement_listeners:
+            listener(sql, parameters)
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, time.perf_counter() - start)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        if statement_listeners:
+            seq_of_parameters = list(seq_of_parameters)
+            for listener in statement_listeners:
+                listener(sql, seq_of_parameters[0] if seq_of_parameters else ())
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._begin(sql, time.perf_counter() - start)
+        return self
+
+    def _begin(self, sql, seconds):
+        self._sql, self._seconds, self._rows = sql, seconds, 0
+        if self.description is None:
+            # INSERT/UPDATE/DELETE/DDL: nada para buscar
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+
+    def _fetched(self, start, rows, done):
+        if self._sql is not None:
+            self._seconds += time.perf_counter() - start
+            self._rows += rows
+            if done:
+                self._finish()
+
+    def _finish(self):
+        if self._sql is not None:
+            if self.connection.recording:
+                metrics.record_query(self._sql, self._seconds, self._rows, slow_query_logger)
+            self._sql = None
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, True)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexão que registra seus cursores para que o pool os feche ao receber a
+    conexão de volta: um comando não esgotado (fetchone, stream interrompido,
+    cursor preso num traceback) mantém aberto o snapshot de leitura do WAL e a
+    conexão continuaria lendo dados anteriores aos commits de outras conexões.
+    """
+
+    def cursor(self, factory=sqlite3.Cursor):
+        cursor = super().cursor(factory)
+        try:
+            cursors = self._cursors
+        except AttributeError:
+            cursors = self._cursors = weakref.WeakSet()
+        cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close_cursors(self):
+        cursors = getattr(self, "_cursors", None)
+        if cursors:
+            for cursor in list(cursors):
+                cursor.close()
+            cursors.clear()
+
+
+class InstrumentedConnection(PooledConnection):
+    """
+    Conexão cujos cursores (inclusive os de conn.execute) são InstrumentedCursor.
+    Com `recording` falso os comandos não entram nas métricas (configuração
+    da conexão em `connect`).
+    """
+
+    recording = True
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+
+def connect(database=None, pragmas=None, cached_statements=None, instrumented=True):
+    """
+    Abre uma conexão SQLite já configurada (row_factory e PRAGMAs).
+    `instrumented=False` abre uma conexão fora das métricas, para migrações e
+    scripts: cada comando instrumentado vira uma série em /metrics.
+    """
+    conn = sqlite3.connect(
+        database or DATABASE_URL,
+        check_same_thread=False,  # conexões do pool circulam entre threads
+        cached_statements=cached_statements or STATEMENT_CACHE_SIZE,
+        factory=InstrumentedConnection if instrumented and metrics.METRICS_ENABLED else PooledConnection,
+    )
+    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
+    # A configuração (sonda das funções matemáticas, PRAGMAs) não entra nas métricas
+    conn.recording = False
+    geo.register_functions(conn)  # funções matemáticas da busca por distância
+    for name, value in (PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    conn.recording = isinstance(conn, InstrumentedConnection)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Pool limitado de conexões SQLite pré-configuradas.
+
+    As conexões são criadas sob demanda até `size` e depois reutilizadas;
+    quando todas estão em uso, `connection()` espera até `timeout` segundos.
+    O tempo de espera acumulado fica disponível em `stats()` para
+    dimensionar o pool.
+    """
+
+    def __init__(self, database, size=POOL_SIZE, pragmas=None, timeout=POOL_TIMEOUT):
+        self.database = database
+        self.size = size
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._timeouts = 0
+        self._closed = False
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+            else:
+                create = False
+            if conn is not None or create:
+                self._in_use += 1
+                self._acquisitions += 1
+
+        if conn is not None:
+            return conn
+        if create:
+            try:
+                return connect(self.database, self.pragmas)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                    self._in_use -= 1
+                raise
+
+        # Pool cheio: espera uma conexão ser devolvida
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(
+                f"Timed out after {self.timeout}s waiting for a database connection"
+            )
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._acquisitions += 1
+            self._waits += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        return conn
+
+    def _release(self, conn):
+        # Nunca devolve ao pool uma conexão com transação ou comando aberto
+        if isinstance(conn, PooledConnection):
+            conn.close_cursors()
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+        if closed:
+            conn.close()
+        else:
+            self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                self._release(conn)
+            except sqlite3.Error:
+                # Conexão em estado desconhecido: descarta em vez de reutilizar
+                self._discard(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._created -= 1
+                self._in_use -= 1
+
+    def open_all(self):
+        """
+        Cria de uma vez as conexões que faltam (PRAGMAs e mmap prontos antes
+        do primeiro acesso). Retorna quantas foram criadas.
+        """
+        with self._lock:
+            missing = self.size - self._created
+            self._created += missing
+        for opened in range(missing):
+            try:
+                conn = connect(self.database, self.pragmas)
+            except Exception:
+                with self._lock:
+                    self._created -= missing - opened
+                raise
+            self._idle.put_nowait(conn)
+        return missing
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._created - self._in_use,
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "wait_seconds_total": self._wait_seconds,
+                "wait_seconds_max": self._max_wait_seconds,
+                "timeouts": self._timeouts,
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_write_pool = None
+_read_executor = None
+_writer = None
+_pool_lock = threading.Lock()
+
+
+def resolve_database(path=None):
+    """
+    Caminho absoluto do banco: todos os workers abrem o mesmo arquivo, qualquer
+    que seja o diretório de trabalho de cada um.
+    """
+    path = path or DATABASE_URL
+    if path == ":memory:" or path.startswith("file:"):
+        return path
+    return os.path.abspath(path)
+
+
+def warm_page_cache(database=None, limit=None):
+    """
+    Lê o arquivo do banco (até `limit` bytes, por padrão o mmap_size) para o
+    cache de páginas do sistema, para que as primeiras consultas não esperem
+    o disco. Retorna os bytes lidos.
+    """
+    database = resolve_database(database)
+    limit = PRAGMAS["mmap_size"] if limit is None else limit
+    total = 0
+    try:
+        with open(database, "rb", buffering=0) as file:
+            while total < limit:
+                chunk = file.read(min(1024 * 1024, limit - total))
+                if not chunk:
+                    break
+                total += len(chunk)
+    except OSError:
+        return 0
+    return total
+
+
+def get_pool():
+    """
+    Retorna o pool global de leitura, criando-o na primeira chamada.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_URL)
+    return _pool
+
+
+def get_write_pool():
+    """
+    Retorna o pool de escrita: uma única conexão, usada só pela faixa de escrita.
+    """
+    global _write_pool
+    if _write_pool is None:
+        with _pool_lock:
+            if _write_pool is None:
+                _write_pool = ConnectionPool(DATABASE_URL, size=1)
+    return _write_pool
+
+
+def _get_executors():
+    global _read_executor, _writer
+    if _read_executor is None:
+        with _pool_lock:
+            if _read_executor is None:
+                _read_executor = ThreadPoolExecutor(
+                    max_workers=READ_WORKERS, thread_name_prefix="db-read"
+                )
+                # Um único escritor: o SQLite serializa escritas de qualquer forma,
+                # e assim uma escrita longa nunca ocupa as threads de leitura
+                _writer = GroupCommitWriter()
+    return _read_executor, _writer
+
+
+class GroupCommitWriter:
+    """
+    Thread única de escrita que esvazia uma fila de escritas.
+
+    As escritas pendentes entram em uma só transação (BEGIN IMMEDIATE ... COMMIT),
+    cada uma dentro do seu SAVEPOINT: se uma levanta exceção, só ela é desfeita
+    e só o seu chamador recebe o erro. Os resultados são entregues depois do
+    commit. Com vários workers do uvicorn, cada processo pega o lock de escrita
+    uma vez por lote, e o BEGIN IMMEDIATE espera o lock (busy_timeout) em vez de
+    falhar com "database is locked" ao promover uma leitura para escrita.
+    """
+
+    def __init__(self, window_ms=GROUP_COMMIT_MS, max_batch=GROUP_COMMIT_MAX):
+        self.window = window_ms / 1000
+        self.max_batch = max(max_batch, 1)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="db-write", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, args, kwargs):
+        future = concurrent.futures.Future()
+        self._queue.put((fn, args, kwargs, future, time.perf_counter()))
+        metrics.DB_WRITE_QUEUE_DEPTH.inc()
+        return future
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                # O que já está na fila entra mesmo com a janela vencida
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # encerra depois deste lote
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            metrics.DB_WRITE_QUEUE_DEPTH.dec(amount=len(batch))
+            metrics.DB_WRITE_BATCH_SIZE.observe(value=len(batch))
+            started = time.perf_counter()
+            for _, _, _, _, queued_at in batch:
+                metrics.DB_WRITE_QUEUE_WAIT.observe(value=started - queued_at)
+            # Chamadores que desistiram (ex.: requisição cancelada) saem do lote
+            batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+            if batch:
+                self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        outcomes = []
+        try:
+            with get_write_pool().connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for fn, args, kwargs, _, _ in batch:
+                        conn.execute("SAVEPOINT write")
+                        try:
+                            result = fn(conn, *args, **kwargs)
+                        except BaseException as exc:
+                            conn.execute("ROLLBACK TO write")
+                            conn.execute("RELEASE write")
+                            outcomes.append((False, exc))
+                        else:
+                            conn.execute("RELEASE write")
+                            outcomes.append((True, result))
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+        except BaseException as exc:
+            # Falha da transação inteira (lock, disco, savepoint): todos recebem o erro
+            for _, _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        for (_, _, _, future, _), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+def _run_read(fn, args, kwargs):
+    with get_pool().connection() as conn:
+        return fn(conn, *args, **kwargs)
+
+
+def _run_write(fn, args, kwargs):
+    with get_write_pool().connection() as conn:
+        try:
+            result = fn(conn, *args, **kwargs)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return result
+
+
+async def read(fn, *args, **kwargs):
+    """
+    Executa `fn(conn, *args, **kwargs)` na faixa de leitura, fora do event loop.
+    """
+    if not OFFLOAD:
+        return _run_read(fn, args, kwargs)
+    executor, _ = _get_executors()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(_run_read, fn, args, kwargs)
+    )
+
+
+async def write(fn, *args, **kwargs):
+    """
+    Executa `fn(conn, *args, **kwargs)` na thread de escrita, dentro de uma
+    transação: o resultado volta depois do commit; se `fn` levantar exceção,
+    as alterações dela são desfeitas e a exceção é repassada. Escritas
+    concorrentes podem dividir a mesma transação (group commit).
+    """
+    if not OFFLOAD:
+        return _run_write(fn, args, kwargs)
+    _, writer = _get_executors()
+    return await asyncio.wrap_future(writer.submit(fn, args, kwargs))
+
+
+def close_pool():
+    global _pool, _write_pool, _read_executor, _writer
+    with _pool_lock:
+        if _read_executor is not None:
+            _read_executor.shutdown(wait=True)
+        if _writer is not None:
+            _writer.shutdown()
+        for pool in (_pool, _write_pool):
+            if pool is not None:
+                pool.close()
+        _pool = _write_pool = _read_executor = _writer = None
@@ -23,9 +23,9 @@ CREATE TABLE Resumes (
     user_id INTEGER NOT NULL,
     resume_file_url TEXT,
     summary TEXT,
-    skills TEXT,
-    education TEXT,
-    experience TEXT,
+    skills TEXT, -- Array JSON de strings
+    education TEXT, -- Array JSON de objetos {tempo, instituicao, curso}
+    experience TEXT, -- Array JSON de objetos {tempo, empresa, cargo, descricao}
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
 );
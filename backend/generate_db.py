@@ -3,18 +3,23 @@ import json
 from datetime import datetime, timedelta
 import random
 import os
+import argparse
+import itertools
+import sys
+import time
+import unicodedata
 
-def create_database():
-    # Caminho absoluto para o banco de dados
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    DB_PATH = os.path.join(BASE_DIR, 'diversityjobs.db')
+import numpy as np
 
-    # Conectar ao banco de dados SQLite (cria o arquivo se ele não existir)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+import migrations
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, 'diversityjobs.db')
+SCHEMA_PATH = os.path.join(BASE_DIR, 'diversityjobs_schema.sql')
 
+def create_schema(cursor):
     # Criação de tabelas a partir do esquema
-    with open('backend/diversityjobs_schema.sql', 'r') as schema_file:
+    with open(SCHEMA_PATH, 'r') as schema_file:
         statements = [stmt.strip() for stmt in schema_file.read().split(';') if stmt.strip()]
         for statement in statements:
             if statement.upper().startswith(('CREATE DATABASE', 'USE')):
@@ -24,6 +29,13 @@ def create_database():
             statement = statement.replace('ON UPDATE CURRENT_TIMESTAMP', '')
             cursor.execute(statement)
 
+def create_database(db_path=DB_PATH):
+    # Conectar ao banco de dados SQLite (cria o arquivo se ele não existir)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    create_schema(cursor)
+
     # Dados de exemplo para Users
     sample_users = [
         ('applicant', 'john@example.com', 'hash1', 'John Doe', '123-456-7890', '123 Main St', json.dumps(['LGBTQIA+', 'PCD']), None, '2024-01-01', None, 'linkedin.com/in/johndoe'),
@@ -39,8 +51,16 @@ def create_database():
 
     # Dados de exemplo para Resumes
     sample_resumes = [
-        (1, 'resume1.pdf', 'Experienced professional', 'Python, SQL, Web Development', '2020: Bachelor in Computer Science, 2024: Master in Computer Science', '5 years of experience: TAG, 2 years of experience: Nasa', '2024-01-05'),
-        (2, 'resume2.pdf', 'Marketing specialist', 'Marketing, Social Media, Analytics', '2022: Bachelor in Marketing, 2024: Master in Marketing', '3 years of experience: Youtube, 2 years of experience: Facebook', '2024-01-06')
+        (1, 'resume1.pdf', 'Experienced professional',
+         json.dumps(['Python', 'SQL', 'Web Development']),
+         json.dumps([{'tempo': '2020', 'instituicao': 'Bachelor', 'curso': 'Computer Science'}, {'tempo': '2024', 'instituicao': 'Master', 'curso': 'Computer Science'}]),
+         json.dumps([{'tempo': '5 years', 'empresa': 'TAG', 'cargo': '', 'descricao': ''}, {'tempo': '2 years', 'empresa': 'Nasa', 'cargo': '', 'descricao': ''}]),
+         '2024-01-05'),
+        (2, 'resume2.pdf', 'Marketing specialist',
+         json.dumps(['Marketing', 'Social Media', 'Analytics']),
+         json.dumps([{'tempo': '2022', 'instituicao': 'Bachelor', 'curso': 'Marketing'}, {'tempo': '2024', 'instituicao': 'Master', 'curso': 'Marketing'}]),
+         json.dumps([{'tempo': '3 years', 'empresa': 'Youtube', 'cargo': '', 'descricao': ''}, {'tempo': '2 years', 'empresa': 'Facebook', 'cargo': '', 'descricao': ''}]),
+         '2024-01-06')
     ]
 
     cursor.executemany('''
@@ -70,10 +90,370 @@ def create_database():
     VALUES (?, ?, ?, ?)
     ''', sample_applications)
 
-    # Salvar alterações e fechar a conexão
+    # Salvar alterações
     conn.commit()
+
+    # Índices e restrições ficam nas migrações versionadas
+    migrations.migrate(conn)
+
+    conn.close()
+
+# ---------------------------------------------------------------------------
+# Gerador sintético (benchmarks): volumes configuráveis, determinístico pela seed
+# ---------------------------------------------------------------------------
+
+# PRAGMAs só para a carga inicial: sem journal nem fsync. Um banco que
+# falhar no meio da carga deve ser descartado e gerado de novo
+LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": -524288,  # 512 MiB
+    "temp_store": "MEMORY",
+    "locking_mode": "EXCLUSIVE",
+}
+BATCH_SIZE = 50000
+START_DATE = datetime(2023, 1, 1)
+DAYS = 730
+
+SOCIAL_GROUPS = {
+    'Mulheres': 35, 'Pessoas Negras': 30, 'LGBTQIA+': 15, 'PCD': 10,
+    'Profissional 50+': 8, 'Neurodiversidade': 5, 'Outros': 4,
+}
+
+# (endereço do candidato, localização da vaga, peso ~ população)
+CITIES = [
+    ('São Paulo, SP', 'São Paulo', 30), ('Rio de Janeiro, RJ', 'Rio de Janeiro', 14),
+    ('Belo Horizonte, MG', 'Belo Horizonte', 7), ('Brasília, DF', 'Brasília', 6),
+    ('Curitiba, PR', 'Curitiba', 5), ('Porto Alegre, RS', 'Porto Alegre', 5),
+    ('Recife, PE', 'Recife', 5), ('Salvador, BA', 'Salvador', 5),
+    ('Fortaleza, CE', 'Fortaleza', 4), ('Campinas, SP', 'Campinas', 4),
+    ('Florianópolis, SC', 'Florianópolis', 3), ('Goiânia, GO', 'Goiânia', 3),
+    ('Manaus, AM', 'Manaus', 3), ('Belém, PA', 'Belém', 3),
+]
+REMOTE_SHARE = 0.2
+
+# área: (peso, cargos, habilidades em ordem de popularidade, cursos)
+AREAS = {
+    'tecnologia': (30,
+        ['Desenvolvedor(a) Back-end', 'Desenvolvedor(a) Front-end', 'Desenvolvedor(a) Full Stack',
+         'Engenheiro(a) de Software', 'Engenheiro(a) DevOps', 'Analista de QA'],
+        ['Python', 'JavaScript', 'SQL', 'Java', 'React', 'TypeScript', 'Node.js', 'Git', 'Docker',
+         'AWS', 'PostgreSQL', 'Linux', 'Kubernetes', 'MongoDB', 'Spring Boot', 'Go', 'CI/CD'],
+        ['Ciência da Computação', 'Engenharia de Software', 'Sistemas de Informação', 'Análise e Desenvolvimento de Sistemas']),
+    'dados': (15,
+        ['Analista de Dados', 'Cientista de Dados', 'Engenheiro(a) de Dados', 'Analista de BI'],
+        ['SQL', 'Python', 'Excel', 'Power BI', 'Estatística', 'Tableau', 'Machine Learning', 'Pandas', 'ETL', 'Spark'],
+        ['Estatística', 'Ciência da Computação', 'Matemática Aplicada', 'Economia']),
+    'design': (10,
+        ['Designer UX/UI', 'Designer Gráfico', 'Pesquisador(a) UX'],
+        ['Figma', 'Prototipação', 'Adobe XD', 'Photoshop', 'Illustrator', 'Design System',
+         'Acessibilidade Digital', 'HTML', 'CSS'],
+        ['Design', 'Design Gráfico', 'Comunicação Visual']),
+    'marketing': (15,
+        ['Analista de Marketing Digital', 'Social Media', 'Analista de SEO', 'Coordenador(a) de Marketing'],
+        ['Redes Sociais', 'Google Analytics', 'SEO', 'Google Ads', 'Meta Ads', 'Copywriting',
+         'CRM', 'E-commerce', 'Excel'],
+        ['Publicidade e Propaganda', 'Marketing', 'Jornalismo', 'Administração']),
+    'gestao': (12,
+        ['Gerente de Projetos', 'Product Manager', 'Scrum Master', 'Analista de Processos'],
+        ['Gestão de Projetos', 'Scrum', 'Liderança', 'Kanban', 'Jira', 'Excel', 'Roadmap', 'PMP', 'MS Project'],
+        ['Administração', 'Engenharia de Produção', 'MBA em Gestão de Projetos']),
+    'operacoes': (18,
+        ['Gerente de Loja', 'Assistente Administrativo', 'Analista Financeiro', 'Analista de RH'],
+        ['Pacote Office', 'Atendimento ao Cliente', 'Excel', 'Vendas', 'Negociação',
+         'Gestão de Estoque', 'Contabilidade', 'Recrutamento'],
+        ['Administração', 'Ciências Contábeis', 'Gestão de Recursos Humanos', 'Logística']),
+}
+JOB_TYPES = {'Tempo integral': 70, 'Meio período': 10, 'Estágio': 10, 'Temporário': 5, 'Freelance': 5}
+APPLICATION_STATUSES = {'pending': 60, 'reviewed': 25, 'accepted': 5, 'rejected': 10}
+
+FIRST_NAMES = [
+    'Ana', 'Maria', 'Juliana', 'Camila', 'Fernanda', 'Beatriz', 'Larissa', 'Patrícia', 'Aline', 'Bruna',
+    'João', 'Carlos', 'Pedro', 'Lucas', 'Rafael', 'Gabriel', 'Mateus', 'Thiago', 'Felipe', 'André',
+    'Alex', 'Sam', 'Cris', 'Dani', 'Jô', 'Luiza', 'Marcos', 'Renata', 'Vitória', 'Caio',
+]
+LAST_NAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+]
+COMPANIES = [
+    'Itaú Unibanco', 'Nubank', 'Magazine Luiza', 'Ambev', 'Natura', 'Petrobras', 'Stone', 'iFood',
+    'Mercado Livre', 'TOTVS', 'Embraer', 'Vale', 'XP Investimentos', 'Localiza', 'Via', 'Americanas',
+]
+COMPANY_SUFFIXES = ['Tecnologia', 'Soluções', 'Digital', 'Serviços', 'Varejo', 'Consultoria', 'Labs', 'Group']
+INSTITUTIONS = [
+    'Universidade de São Paulo (USP)', 'Unicamp', 'UFRJ', 'UFMG', 'UFPE', 'UFRGS', 'PUC-SP',
+    'Fundação Getúlio Vargas (FGV)', 'Mackenzie', 'UnB', 'UFBA', 'UFPR',
+]
+MONTHS = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+
+
+def ascii_slug(text):
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if c.isalnum() and ord(c) < 128).lower()
+
+
+class SyntheticData:
+    """
+    Gera linhas para Users, Resumes, Jobs e Applications. `random.Random`
+    cuida do texto linha a linha e NumPy das colunas numéricas grandes
+    (candidaturas), ambos a partir da mesma seed.
+    """
+
+    def __init__(self, seed, users, jobs, applications, business_share):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.users = users
+        self.businesses = max(1, int(users * business_share))
+        self.applicants = users - self.businesses
+        self.jobs = jobs
+        self.applications = applications
+        self.area_names = list(AREAS)
+        self.area_weights = [AREAS[area][0] for area in self.area_names]
+        self.city_cum_weights = list(itertools.accumulate(weight for _, _, weight in CITIES))
+        self.slugs = {name: ascii_slug(name) for name in FIRST_NAMES + LAST_NAMES}
+        self.group_names = list(SOCIAL_GROUPS)
+        self.group_cum_weights = list(itertools.accumulate(SOCIAL_GROUPS.values()))
+        # Popularidade decrescente das habilidades dentro da área (~Zipf)
+        self.skill_cum_weights = {
+            area: list(itertools.accumulate(1 / (rank + 1) for rank in range(len(skills))))
+            for area, (_, _, skills, _) in AREAS.items()
+        }
+
+    def weighted_sample(self, population, cum_weights, count):
+        # Amostra ponderada sem repetição: um único sorteio com folga e
+        # descarte das repetições (evita um choices() por item)
+        chosen = []
+        while len(chosen) < count:
+            for item in self.rng.choices(population, cum_weights=cum_weights, k=count * 3):
+                if item not in chosen:
+                    chosen.append(item)
+                    if len(chosen) == count:
+                        break
+        return chosen
+
+    def pick_groups(self, counts):
+        count = self.rng.choices(range(len(counts)), weights=counts)[0]
+        return self.weighted_sample(self.group_names, self.group_cum_weights, count)
+
+    def pick_skills(self, area, count):
+        skills = AREAS[area][2]
+        chosen = self.weighted_sample(skills, self.skill_cum_weights[area], min(count, len(skills)))
+        if self.rng.random() < 0.2:
+            skill = self.rng.choice(AREAS[self.rng.choice(self.area_names)][2])
+            if skill not in chosen:
+                chosen.append(skill)
+        return chosen
+
+    def date(self, day_offset, with_time=False):
+        value = START_DATE + timedelta(days=int(day_offset))
+        if with_time:
+            value += timedelta(seconds=self.rng.randrange(86400))
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        return value.strftime('%Y-%m-%d')
+
+    def period(self):
+        start = self.rng.randrange(2005, 2024)
+        end = start + self.rng.randrange(1, 6)
+        if end >= 2024:
+            return f"{self.rng.choice(MONTHS)} {start} - Atual"
+        return f"{self.rng.choice(MONTHS)} {start} - {self.rng.choice(MONTHS)} {end}"
+
+    def user_rows(self):
+        for user_id in range(1, self.users + 1):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            address = self.rng.choices(CITIES, cum_weights=self.city_cum_weights)[0][0]
+            phone = f"({self.rng.randrange(11, 99)}) 9{self.rng.randrange(1000, 9999)}-{self.rng.randrange(1000, 9999)}"
+            registered = self.date(self.rng.randrange(DAYS))
+            if user_id <= self.businesses:
+                company = f"{self.rng.choice(COMPANIES).split()[0]} {self.rng.choice(COMPANY_SUFFIXES)} {user_id}"
+                slug = ascii_slug(company)
+                yield ('business', f"rh@{slug}.example.com", 'hash', f"RH {company}", phone, address,
+                       None, None, registered, company, f"linkedin.com/company/{slug}")
+            else:
+                groups = self.pick_groups([15, 50, 25, 10])
+                slug = f"{self.slugs[first]}.{self.slugs[last]}.{user_id}"
+                yield ('applicant', f"{slug}@example.com", 'hash',
+                       f"{first} {last}", phone, address,
+                       json.dumps(groups, ensure_ascii=False) if groups else None,
+                       None, registered, None, f"linkedin.com/in/{slug}")
+
+    def resume_rows(self):
+        # Mesmo formato gravado pela API (arrays JSON, ver migração 5)
+        for user_id in range(self.businesses + 1, self.users + 1):
+            area = self.rng.choices(self.area_names, weights=self.area_weights)[0]
+            _, titles, _, courses = AREAS[area]
+            skills = self.pick_skills(area, self.rng.randrange(3, 11))
+            experience = [
+                {'tempo': self.period(), 'empresa': self.rng.choice(COMPANIES), 'cargo': self.rng.choice(titles),
+                 'descricao': f"Atuação com {', '.join(self.rng.sample(skills, min(2, len(skills))))}."}
+                for _ in range(self.rng.randrange(0, 4))
+            ]
+            education = [
+                {'tempo': self.period(), 'instituicao': self.rng.choice(INSTITUTIONS), 'curso': self.rng.choice(courses)}
+                for _ in range(self.rng.randrange(0, 3))
+            ]
+            summary = f"{self.rng.choice(titles)} com experiência em {', '.join(skills[:3])}."
+            yield (user_id, None, summary,
+                   json.dumps(skills, ensure_ascii=False),
+                   json.dumps(education, ensure_ascii=False) if education else None,
+                   json.dumps(experience, ensure_ascii=False) if experience else None,
+                   self.date(self.rng.randrange(DAYS), with_time=True))
+
+    def job_rows(self, posted_days):
+        # Poucas empresas publicam a maior parte das vagas
+        business_ids = self.np_rng.zipf(1.5, size=self.jobs) % self.businesses + 1
+        job_types = list(JOB_TYPES)
+        for index in range(self.jobs):
+            area = self.rng.choices(self.area_names, weights=self.area_weights)[0]
+            _, titles, skills, _ = AREAS[area]
+            title = self.rng.choice(titles)
+            required = self.pick_skills(area, 4)
+            while len(required) < 4:
+                required.append(self.rng.choice(skills))
+            location = ('Remoto' if self.rng.random() < REMOTE_SHARE
+                        else self.rng.choices(CITIES, cum_weights=self.city_cum_weights)[0][1])
+            groups = self.pick_groups([10, 35, 30, 15, 10])
+            low = self.rng.randrange(2, 15) * 1000
+            posted = int(posted_days[index])
+            yield (int(business_ids[index]),
+                   json.dumps(groups, ensure_ascii=False) if groups else None,
+                   title,
+                   f"{title} para atuar com {required[0]} e {required[1]} em um time diverso e inclusivo.",
+                   location,
+                   f"R$ {low:,} - R$ {int(low * 1.5):,}".replace(',', '.'),
+                   f"- Experiência com {required[0]} e {required[1]}\n"
+                   f"- Conhecimento em {required[2]}\n"
+                   f"- {required[3]} é um diferencial",
+                   self.date(posted),
+                   self.date(posted + self.rng.randrange(30, 91)),
+                   'Candidatura pela plataforma',
+                   self.rng.choices(job_types, weights=list(JOB_TYPES.values()))[0],
+                   'Vale-refeição, plano de saúde')
+
+    def application_rows(self, posted_days):
+        """
+        Pares (candidato, vaga) únicos com vagas populares recebendo mais
+        candidaturas; gerados em lote com NumPy e ordenados pela data.
+        """
+        if not self.applicants or not self.jobs or not self.applications:
+            return
+        total = min(self.applications, self.applicants * self.jobs)
+        popularity = 1.0 / np.arange(1, self.jobs + 1) ** 0.8
+        popularity = self.np_rng.permutation(popularity / popularity.sum())
+        keys = np.empty(0, dtype=np.int64)
+        while len(keys) < total:
+            missing = total - len(keys)
+            users = self.np_rng.integers(0, self.applicants, size=missing * 2)
+            jobs = self.np_rng.choice(self.jobs, size=missing * 2, p=popularity)
+            keys = np.unique(np.concatenate([keys, users.astype(np.int64) * self.jobs + jobs]))
+        keys = self.np_rng.permutation(keys)[:total]
+        user_ids = keys // self.jobs + self.businesses + 1
+        job_ids = keys % self.jobs + 1
+        # Candidatura até 45 dias depois da publicação
+        seconds = (posted_days[job_ids - 1] * 86400
+                   + self.np_rng.integers(0, 45 * 86400, size=total)).astype('timedelta64[s]')
+        order = np.argsort(seconds, kind='stable')
+        dates = np.char.replace(
+            np.datetime_as_string(np.datetime64(START_DATE, 's') + seconds[order], unit='s'), 'T', ' '
+        )
+        statuses = np.array(list(APPLICATION_STATUSES))[
+            self.np_rng.choice(len(APPLICATION_STATUSES), size=total,
+                               p=np.array(list(APPLICATION_STATUSES.values())) / 100)
+        ]
+        yield from zip(user_ids[order].tolist(), job_ids[order].tolist(), dates.tolist(), statuses.tolist())
+
+
+def insert_batches(conn, query, rows, label, batch_size):
+    total = 0
+    start = time.perf_counter()
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(query, batch)
+        conn.commit()
+        total += len(batch)
+        print(f"\r{label}: {total:,}", end='', file=sys.stderr, flush=True)
+    print(f"\r{label}: {total:,} em {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def generate_synthetic(db_path, users, jobs, applications, seed=42,
+                       business_share=0.05, batch_size=BATCH_SIZE):
+    """
+    Cria um banco novo com volumes de produção para benchmarks.
+
+    Modo de carga em massa: só as tabelas do esquema existem durante os
+    INSERTs; índices, tabelas de junção e índices FTS vêm depois, das
+    migrações (uma passada em SQL sobre os dados já carregados).
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists")
+    data = SyntheticData(seed, users, jobs, applications, business_share)
+    posted_days = data.np_rng.integers(0, DAYS, size=jobs)
+
+    conn = sqlite3.connect(db_path)
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    create_schema(conn.cursor())
+
+    insert_batches(conn, '''
+        INSERT INTO Users (user_type, email, password_hash, name, phone_number, address, social_group,
+                           profile_photo_url, registration_date, business_name, linkedin)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', data.user_rows(), 'Users', batch_size)
+    insert_batches(conn, '''
+        INSERT INTO Resumes (user_id, resume_file_url, summary, skills, education, experience, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', data.resume_rows(), 'Resumes', batch_size)
+    insert_batches(conn, '''
+        INSERT INTO Jobs (business_id, social_group, job_title, job_description, location, salary_range,
+                          requirements, posted_date, application_deadline, application_process, job_type, benefits)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', data.job_rows(posted_days), 'Jobs', batch_size)
+    insert_batches(conn, '''
+        INSERT INTO Applications (user_id, job_id, application_date, status)
+        VALUES (?, ?, ?, ?)
+    ''', data.application_rows(posted_days), 'Applications', batch_size)
+
+    start = time.perf_counter()
+    migrations.migrate(conn)
+    conn.execute("ANALYZE")
+    print(f"Índices/migrações em {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    # Volta ao modo normal de operação da API
+    conn.execute("PRAGMA locking_mode = NORMAL")
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.close()
 
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cria o banco com dados de exemplo ou, com --users/--jobs/--applications, "
+                    "um banco sintético grande para benchmarks."
+    )
+    parser.add_argument('--db', default=None, help='caminho do banco (padrão: diversityjobs.db ao lado do script)')
+    parser.add_argument('--users', type=int, help='total de usuários (candidatos + empresas)')
+    parser.add_argument('--jobs', type=int, default=0)
+    parser.add_argument('--applications', type=int, default=0)
+    parser.add_argument('--business-share', type=float, default=0.05, help='fração dos usuários que são empresas')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.users is None:
+        create_database(args.db or DB_PATH)
+        print("Database created and populated successfully!")
+        return
+
+    start = time.perf_counter()
+    generate_synthetic(
+        args.db or os.path.join(BASE_DIR, 'diversityjobs-synthetic.db'),
+        args.users, args.jobs, args.applications,
+        seed=args.seed, business_share=args.business_share, batch_size=args.batch_size,
+    )
+    print(f"Synthetic database created in {time.perf_counter() - start:.1f}s")
+
+
 if __name__ == "__main__":
-    create_database()
-    print("Database created and populated successfully!")
+    main()
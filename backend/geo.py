@@ -0,0 +1,168 @@
+"""
+Geocodificação local (sem rede) e distâncias.
+
+`GAZETTEER` traz as capitais e as maiores cidades do país com o centro
+aproximado de cada uma. A migração 9 grava essas cidades na tabela Gazetteer,
+uma linha por forma de escrita aceita ("São Paulo", "sao paulo", "São Paulo, SP",
+"São Paulo - SP", ...), e os triggers de Jobs e Users consultam essa tabela
+com `lower(trim(texto))` para preencher latitude/longitude. Textos que não são
+uma cidade conhecida (ex.: "Remoto", endereços com rua) ficam sem coordenadas.
+"""
+import math
+import sqlite3
+import unicodedata
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# (cidade, UF, latitude, longitude)
+GAZETTEER = [
+    ("São Paulo", "SP", -23.5505, -46.6333),
+    ("Rio de Janeiro", "RJ", -22.9068, -43.1729),
+    ("Belo Horizonte", "MG", -19.9167, -43.9345),
+    ("Brasília", "DF", -15.7939, -47.8828),
+    ("Salvador", "BA", -12.9714, -38.5014),
+    ("Fortaleza", "CE", -3.7319, -38.5267),
+    ("Curitiba", "PR", -25.4284, -49.2733),
+    ("Manaus", "AM", -3.1190, -60.0217),
+    ("Recife", "PE", -8.0476, -34.8770),
+    ("Porto Alegre", "RS", -30.0346, -51.2177),
+    ("Belém", "PA", -1.4558, -48.4902),
+    ("Goiânia", "GO", -16.6869, -49.2648),
+    ("São Luís", "MA", -2.5307, -44.3068),
+    ("Maceió", "AL", -9.6658, -35.7353),
+    ("Natal", "RN", -5.7945, -35.2110),
+    ("Teresina", "PI", -5.0892, -42.8019),
+    ("Campo Grande", "MS", -20.4697, -54.6201),
+    ("João Pessoa", "PB", -7.1195, -34.8450),
+    ("Cuiabá", "MT", -15.6014, -56.0979),
+    ("Aracaju", "SE", -10.9472, -37.0731),
+    ("Florianópolis", "SC", -27.5954, -48.5480),
+    ("Porto Velho", "RO", -8.7612, -63.9004),
+    ("Macapá", "AP", 0.0349, -51.0694),
+    ("Rio Branco", "AC", -9.9747, -67.8243),
+    ("Vitória", "ES", -20.3155, -40.3128),
+    ("Boa Vista", "RR", 2.8235, -60.6758),
+    ("Palmas", "TO", -10.1840, -48.3336),
+    ("Campinas", "SP", -22.9056, -47.0608),
+    ("Guarulhos", "SP", -23.4538, -46.5333),
+    ("São Bernardo do Campo", "SP", -23.6914, -46.5646),
+    ("Santo André", "SP", -23.6639, -46.5383),
+    ("Osasco", "SP", -23.5329, -46.7917),
+    ("Santos", "SP", -23.9608, -46.3336),
+    ("São José dos Campos", "SP", -23.1896, -45.8841),
+    ("Ribeirão Preto", "SP", -21.1775, -47.8103),
+    ("Sorocaba", "SP", -23.5015, -47.4526),
+    ("Jundiaí", "SP", -23.1857, -46.8978),
+    ("Niterói", "RJ", -22.8832, -43.1034),
+    ("Duque de Caxias", "RJ", -22.7858, -43.3054),
+    ("Nova Iguaçu", "RJ", -22.7556, -43.4603),
+    ("Contagem", "MG", -19.9386, -44.0529),
+    ("Uberlândia", "MG", -18.9186, -48.2772),
+    ("Juiz de Fora", "MG", -21.7642, -43.3496),
+    ("Joinville", "SC", -26.3045, -48.8487),
+    ("Blumenau", "SC", -26.9194, -49.0661),
+    ("Londrina", "PR", -23.3045, -51.1696),
+    ("Maringá", "PR", -23.4210, -51.9331),
+    ("Caxias do Sul", "RS", -29.1678, -51.1794),
+    ("Feira de Santana", "BA", -12.2664, -38.9663),
+    ("Jaboatão dos Guararapes", "PE", -8.1130, -35.0149),
+    ("Vila Velha", "ES", -20.3297, -40.2925),
+    ("Serra", "ES", -20.1286, -40.3075),
+    ("Aparecida de Goiânia", "GO", -16.8198, -49.2469),
+]
+
+
+def _sqlite_lower(text):
+    # lower() do SQLite só converte A-Z; as chaves precisam bater com ele
+    return "".join(chr(ord(c) + 32) if "A" <= c <= "Z" else c for c in text)
+
+
+def _strip_accents(text):
+    return "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+
+
+def gazetteer_keys(city, uf):
+    """
+    Formas aceitas para uma cidade, já no formato de `lower(trim(texto))`.
+    """
+    keys = set()
+    for name in {city, _strip_accents(city)}:
+        for text in (name, f"{name}, {uf}", f"{name} - {uf}", f"{name}/{uf}", f"{name} ({uf})", f"{name} {uf}"):
+            keys.add(_sqlite_lower(text))
+            keys.add(_sqlite_lower(text.lower()))
+    return keys
+
+
+def gazetteer_rows():
+    rows = {}
+    for city, uf, latitude, longitude in GAZETTEER:
+        for key in gazetteer_keys(city, uf):
+            rows.setdefault(key, (key, latitude, longitude))
+    return sorted(rows.values())
+
+
+def geocode(text):
+    """
+    (latitude, longitude) de uma cidade do GAZETTEER, com a mesma regra dos triggers.
+    """
+    if not text:
+        return None
+    key = _sqlite_lower(text.strip())
+    for city, uf, latitude, longitude in GAZETTEER:
+        if key in gazetteer_keys(city, uf):
+            return latitude, longitude
+    return None
+
+
+def distance_sql(latitude, longitude):
+    """
+    Expressão SQL da distância (haversine, em km) entre as colunas/expressões
+    dadas e um ponto passado em parâmetros: use com `distance_params(lat, lon)`.
+    Usa as funções matemáticas do SQLite, sem chamar Python a cada linha.
+    """
+    return (
+        f"(2 * {EARTH_RADIUS_KM} * asin(min(1.0, sqrt("
+        f"power(sin(radians({latitude} - ?) / 2), 2)"
+        f" + cos(radians(?)) * cos(radians({latitude})) * power(sin(radians({longitude} - ?) / 2), 2)"
+        f"))))"
+    )
+
+
+def distance_params(latitude, longitude):
+    return [latitude, latitude, longitude]
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lat, max_lat, min_lon, max_lon) que contém o círculo de `radius_km`:
+    pré-filtro do R*Tree, refinado depois pela distância exata.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - dlat, latitude + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # O círculo alcança um polo: todas as longitudes
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    # Perto do antimeridiano a faixa seria dividida em duas; usa todas as longitudes
+    if longitude - dlon < -180 or longitude + dlon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
+
+
+_MATH_FUNCTIONS = {
+    "sin": (1, math.sin), "cos": (1, math.cos), "asin": (1, math.asin),
+    "sqrt": (1, math.sqrt), "radians": (1, math.radians), "power": (2, math.pow),
+}
+
+
+def register_functions(conn):
+    """
+    SQLite compilado sem SQLITE_ENABLE_MATH_FUNCTIONS: registra as funções
+    usadas por `distance_sql` em Python (mais lentas, mesmo resultado).
+    """
+    try:
+        conn.execute("SELECT sin(0), cos(0), asin(0), sqrt(0), radians(0), power(0, 2)").fetchone()
+    except sqlite3.OperationalError:
+        for name, (arity, function) in _MATH_FUNCTIONS.items():
+            conn.create_function(name, arity, function, deterministic=True)
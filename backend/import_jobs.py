@@ -0,0 +1,92 @@
+"""
+Importa vagas de um arquivo CSV ou NDJSON direto no banco, em lotes.
+
+Cada lote resolve os e-mails das empresas com uma única consulta e insere as
+vagas válidas com `executemany` em uma transação (mesma lógica de
+POST /jobs/bulk). Linhas inválidas são listadas no stderr e não interrompem
+a importação.
+
+Uso (a partir de backend/):
+    python import_jobs.py vagas.csv
+    python import_jobs.py vagas.ndjson --db diversityjobs.db --batch-size 1000
+
+No CSV, a primeira linha traz os nomes dos campos de JobCreate
+(business_email, job_title, job_description, posted_date, ...); células
+vazias viram null e social_group aceita um array JSON ou valores separados
+por ";".
+"""
+import argparse
+import csv
+import json
+import sys
+
+import db
+from app import insert_jobs, parse_ndjson_jobs
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def csv_social_groups(value):
+    value = value.strip()
+    if value.startswith("["):
+        return json.loads(value)
+    return [group.strip() for group in value.split(";") if group.strip()]
+
+
+def read_csv(file):
+    rows, errors = [], []
+    # Linha 1 é o cabeçalho
+    for number, record in enumerate(csv.DictReader(file), 2):
+        row = {key: (value if value != "" else None) for key, value in record.items() if key}
+        try:
+            if row.get("social_group"):
+                row["social_group"] = csv_social_groups(row["social_group"])
+        except ValueError as e:
+            errors.append({"row": number, "error": f"Invalid social_group: {e}"})
+            continue
+        rows.append((number, row))
+    return rows, errors
+
+
+def read_rows(path, file_format):
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            return read_csv(file)
+        return parse_ndjson_jobs(file)
+
+
+def import_jobs(database, path, file_format, batch_size=DEFAULT_BATCH_SIZE):
+    rows, errors = read_rows(path, file_format)
+    received = len(rows) + len(errors)
+    inserted = 0
+    conn = db.connect(database)
+    try:
+        for start in range(0, len(rows), batch_size):
+            count, batch_errors, _ = insert_jobs(conn, rows[start:start + batch_size])
+            conn.commit()
+            inserted += count
+            errors.extend(batch_errors)
+    finally:
+        conn.close()
+    errors.sort(key=lambda error: error["row"])
+    return received, inserted, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--db", default=db.DATABASE_URL)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="padrão: pela extensão do arquivo")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    received, inserted, errors = import_jobs(args.db, args.path, file_format, args.batch_size)
+    for error in errors:
+        print(f"linha {error['row']}: {error['error']}", file=sys.stderr)
+    print(f"{inserted} de {received} vagas importadas, {len(errors)} com erro")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
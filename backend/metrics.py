@@ -0,0 +1,317 @@
+import bisect
+import os
+import re
+import threading
+import time
+
+from starlette.routing import Match
+
+
+# "0" desliga a instrumentação (middleware e cursores do banco)
+METRICS_ENABLED = os.environ.get("DIVERSITYJOBS_METRICS", "1") != "0"
+# Consultas acima deste tempo vão para o log (logger "diversityjobs.sql")
+SLOW_QUERY_MS = float(os.environ.get("DIVERSITYJOBS_SLOW_QUERY_MS", "200"))
+
+# Limites dos histogramas de latência, em segundos
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Poucas faixas: o histograma de linhas existe por comando SQL
+ROWS_BUCKETS = (0, 1, 100, 10000)
+# Máximo de comandos SQL distintos com série própria; os demais somam em "<other>"
+MAX_STATEMENT_LABELS = int(os.environ.get("DIVERSITYJOBS_METRICS_MAX_STATEMENTS", "200"))
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base dos contadores/gauges/histogramas: uma série por combinação de labels.
+    """
+
+    kind = ""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def set(self, *labels, value):
+        # Também para contadores mantidos por outro componente (pool, cache)
+        with self._lock:
+            self._series[labels] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for values, value in series:
+            lines.extend(self._render_series(values, value))
+        return lines
+
+    def _render_series(self, values, value):
+        return [f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Histograma cumulativo no formato do Prometheus (_bucket, _sum, _count).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # contagem por faixa (não cumulativa), soma, total
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _render_series(self, values, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labels, values, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Métricas do processo. `collectors` são funções chamadas a cada coleta
+    (ex.: estatísticas do pool e do cache, lidas na hora).
+    Com vários workers do uvicorn cada processo tem o seu registro.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labels=()):
+        return self._add(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self._add(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self):
+        """
+        Texto no formato de exposição do Prometheus (version 0.0.4).
+        """
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "diversityjobs_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "diversityjobs_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "diversityjobs_http_requests_in_flight", "HTTP requests being processed.", ("method", "route")
+)
+DB_QUERIES = REGISTRY.counter(
+    "diversityjobs_db_queries_total", "SQL statements executed.", ("statement",)
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "diversityjobs_db_query_duration_seconds", "SQL statement time (execute + fetch).", ("statement",)
+)
+DB_QUERY_ROWS = REGISTRY.histogram(
+    "diversityjobs_db_query_rows", "Rows returned (or changed) per SQL statement.", ("statement",), ROWS_BUCKETS
+)
+DB_SLOW_QUERIES = REGISTRY.counter(
+    "diversityjobs_db_slow_queries_total", "SQL statements slower than the slow-query threshold.", ("statement",)
+)
+DB_WRITE_QUEUE_DEPTH = REGISTRY.gauge(
+    "diversityjobs_db_write_queue_depth", "Writes waiting for the writer thread."
+)
+DB_WRITE_QUEUE_DEPTH.set(value=0)
+DB_WRITE_BATCH_SIZE = REGISTRY.histogram(
+    "diversityjobs_db_write_batch_size", "Writes committed per transaction (group commit).", (), BATCH_BUCKETS
+)
+DB_WRITE_QUEUE_WAIT = REGISTRY.histogram(
+    "diversityjobs_db_write_queue_wait_seconds", "Time a write waited in the queue before its batch started."
+)
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope):
+    """
+    Caminho da rota (ex.: /jobs/{job_id}) em vez do caminho real, para não
+    criar uma série por id/e-mail.
+    """
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: latência, requisições em andamento e status por rota.
+    O tempo inclui o corpo inteiro das respostas em streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_LATENCY.observe(method, route, value=time.perf_counter() - start)
+            HTTP_IN_FLIGHT.dec(method, route)
+            HTTP_REQUESTS.inc(method, route, str(status[0]))
+
+
+# ---------------------------------------------------------------------------
+# SQL
+# ---------------------------------------------------------------------------
+
+_COMMENT = re.compile(r"--[^\n]*")
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+# PRAGMAs e DDL (migrações, configuração de conexões) não viram séries
+_UNRECORDED = re.compile(r"(?:PRAGMA|CREATE|DROP|ALTER|ANALYZE|VACUUM|REINDEX)\b", re.IGNORECASE)
+_fingerprints = {}
+MAX_FINGERPRINTS = 1024
+OTHER_STATEMENT = "<other>"
+_statement_labels = set()
+_statement_labels_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    """
+    Texto normalizado usado como label: sem comentários, espaços colapsados
+    e listas de placeholders (IN (?, ?, ...)) reduzidas, para que consultas
+    montadas com quantidades diferentes de parâmetros caiam na mesma série.
+    """
+    label = _fingerprints.get(sql)
+    if label is None:
+        label = _WHITESPACE.sub(" ", _COMMENT.sub("", sql)).strip()
+        label = _VALUES_LIST.sub(r"\1, ...", label)
+        label = _IN_LIST.sub("(?, ...)", label)
+        if len(_fingerprints) < MAX_FINGERPRINTS:
+            _fingerprints[sql] = label
+    return label
+
+
+def statement_label(label):
+    """
+    Label da série de um comando: o próprio fingerprint para os primeiros
+    MAX_STATEMENT_LABELS distintos e OTHER_STATEMENT para os seguintes. O
+    memo do fingerprint não limita as séries: SQL fora dele ainda criaria uma.
+    """
+    if label in _statement_labels:
+        return label
+    with _statement_labels_lock:
+        if label not in _statement_labels and len(_statement_labels) >= MAX_STATEMENT_LABELS:
+            return OTHER_STATEMENT
+        _statement_labels.add(label)
+    return label
+
+
+def record_query(sql, seconds, rows, logger=None):
+    text = fingerprint(sql)
+    if _UNRECORDED.match(text):
+        return
+    label = statement_label(text)
+    DB_QUERIES.inc(label)
+    DB_QUERY_LATENCY.observe(label, value=seconds)
+    DB_QUERY_ROWS.observe(label, value=max(rows, 0))
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc(label)
+        if logger is not None:
+            logger.warning("slow query: %.1f ms, %d rows: %s", seconds * 1000, rows, text)
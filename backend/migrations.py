@@ -0,0 +1,852 @@
+"""
+Migrações versionadas do banco de dados.
+
+Cada migração tem um número, uma descrição e um passo: um script SQL ou uma
+função que recebe a conexão. A versão aplicada fica em `PRAGMA user_version`,
+então rodar `migrate()` de novo só aplica o que estiver pendente. Cada
+migração roda em sua própria transação.
+
+Para atualizar um banco existente sem recriá-lo:
+    python migrations.py diversityjobs.db
+"""
+import json
+import sqlite3
+import sys
+from contextlib import contextmanager
+
+import db
+import geo
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem o lock de arquivo, vale só o BEGIN IMMEDIATE de cada migração
+    fcntl = None
+
+
+def run_script(conn, script):
+    for statement in split_statements(script):
+        conn.execute(statement)
+
+
+def parse_legacy_social_groups(value):
+    """
+    Lê grupos sociais em qualquer um dos formatos já gravados: array JSON,
+    texto separado por vírgulas ou array JSON com itens separados por vírgulas.
+    """
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+    except json.JSONDecodeError:
+        items = [value]
+    if isinstance(items, str):
+        items = [items]
+    if not isinstance(items, list):
+        return []
+    groups = []
+    for item in items:
+        for group in str(item).split(","):
+            group = group.strip()
+            if group and group not in groups:
+                groups.append(group)
+    return groups
+
+
+# Tabelas de junção mantidas pelos triggers a partir das colunas JSON
+# Users.social_group e Jobs.social_group
+SOCIAL_GROUPS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS UserSocialGroups (
+    user_id INTEGER NOT NULL,
+    social_group TEXT NOT NULL,
+    PRIMARY KEY (user_id, social_group),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_social_groups_group ON UserSocialGroups (social_group, user_id);
+
+CREATE TABLE IF NOT EXISTS JobSocialGroups (
+    job_id INTEGER NOT NULL,
+    social_group TEXT NOT NULL,
+    PRIMARY KEY (job_id, social_group),
+    FOREIGN KEY (job_id) REFERENCES Jobs(job_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_job_social_groups_group ON JobSocialGroups (social_group, job_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_users_social_groups_insert AFTER INSERT ON Users
+BEGIN
+    INSERT OR IGNORE INTO UserSocialGroups (user_id, social_group)
+    SELECT NEW.user_id, trim(value)
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_social_groups_update AFTER UPDATE OF social_group ON Users
+BEGIN
+    DELETE FROM UserSocialGroups WHERE user_id = OLD.user_id;
+    INSERT OR IGNORE INTO UserSocialGroups (user_id, social_group)
+    SELECT NEW.user_id, trim(value)
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_social_groups_delete AFTER DELETE ON Users
+BEGIN
+    DELETE FROM UserSocialGroups WHERE user_id = OLD.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_social_groups_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT OR IGNORE INTO JobSocialGroups (job_id, social_group)
+    SELECT NEW.job_id, trim(value)
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_social_groups_update AFTER UPDATE OF social_group ON Jobs
+BEGIN
+    DELETE FROM JobSocialGroups WHERE job_id = OLD.job_id;
+    INSERT OR IGNORE INTO JobSocialGroups (job_id, social_group)
+    SELECT NEW.job_id, trim(value)
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_social_groups_delete AFTER DELETE ON Jobs
+BEGIN
+    DELETE FROM JobSocialGroups WHERE job_id = OLD.job_id;
+END;
+"""
+
+
+NORMALIZE_SOCIAL_GROUPS_BATCH = 10000
+
+
+def normalize_social_groups(conn):
+    # Regrava as colunas legadas (texto com vírgulas) como arrays JSON antes
+    # de criar os triggers, e então preenche as tabelas de junção.
+    # Lê em blocos pela chave, como structure_resumes, para não carregar
+    # tabelas grandes inteiras na memória
+    for table, key in (("Users", "user_id"), ("Jobs", "job_id")):
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                f"SELECT {key}, social_group FROM {table} "
+                f"WHERE {key} > ? AND social_group IS NOT NULL ORDER BY {key} LIMIT ?",
+                (last_id, NORMALIZE_SOCIAL_GROUPS_BATCH),
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for row_id, value in rows:
+                groups = parse_legacy_social_groups(value)
+                normalized = json.dumps(groups, ensure_ascii=False) if groups else None
+                if normalized != value:
+                    updates.append((normalized, row_id))
+            conn.executemany(f"UPDATE {table} SET social_group = ? WHERE {key} = ?", updates)
+            last_id = rows[-1][0]
+
+    run_script(conn, SOCIAL_GROUPS_SCHEMA)
+    run_script(conn, """
+        INSERT OR IGNORE INTO UserSocialGroups (user_id, social_group)
+        SELECT u.user_id, trim(g.value)
+        FROM Users u, json_each(u.social_group) g
+        WHERE json_valid(u.social_group) AND trim(g.value) <> '';
+
+        INSERT OR IGNORE INTO JobSocialGroups (job_id, social_group)
+        SELECT j.job_id, trim(g.value)
+        FROM Jobs j, json_each(j.social_group) g
+        WHERE json_valid(j.social_group) AND trim(g.value) <> '';
+    """)
+
+
+EXPERIENCE_FIELDS = ("tempo", "empresa", "cargo", "descricao")
+EDUCATION_FIELDS = ("tempo", "instituicao", "curso")
+
+
+def _split_legacy_items(value):
+    # Formato de create_applicant: itens separados por "|".
+    # Formato de update_applicant/dados de exemplo: itens separados por ",",
+    # mas descrições também podem conter vírgulas; um pedaço sem ":" é
+    # continuação do item anterior.
+    if "|" in value:
+        return [item for item in value.split("|") if item.strip()]
+    items = []
+    for piece in value.split(","):
+        if items and ":" not in piece:
+            items[-1] += "," + piece
+        elif piece.strip():
+            items.append(piece)
+    return items
+
+
+def parse_legacy_resume_entries(value, fields):
+    """
+    Converte experiências/formações gravadas como texto ("tempo:empresa:...")
+    ou como JSON com chaves antigas ("periodo") em uma lista de dicts.
+    """
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+    except json.JSONDecodeError:
+        items = None
+    if isinstance(items, list):
+        entries = []
+        for item in items:
+            if isinstance(item, dict):
+                item = dict(item)
+                if "tempo" not in item and "periodo" in item:
+                    item["tempo"] = item.pop("periodo")
+                entries.append({field: str(item.get(field) or "").strip() for field in fields})
+        return entries
+
+    entries = []
+    for item in _split_legacy_items(value):
+        parts = item.split(":", maxsplit=len(fields) - 1)
+        entries.append({
+            field: parts[index].strip() if index < len(parts) else ""
+            for index, field in enumerate(fields)
+        })
+    return entries
+
+
+def parse_legacy_skills(value):
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+    except json.JSONDecodeError:
+        items = value.split(",")
+    if not isinstance(items, list):
+        items = [items]
+    skills = []
+    for skill in items:
+        skill = str(skill).strip()
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+STRUCTURE_RESUMES_BATCH = 10000
+
+
+def structure_resumes(conn):
+    # experience, education e skills passam a guardar arrays JSON
+    # (consultáveis com json_each); a leitura vira um json.loads direto.
+    # Lê em blocos por resume_id e só regrava linhas que mudam, para não
+    # carregar bancos grandes (ou já no formato novo) inteiros na memória
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT resume_id, experience, education, skills FROM Resumes "
+            "WHERE resume_id > ? ORDER BY resume_id LIMIT ?",
+            (last_id, STRUCTURE_RESUMES_BATCH),
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for resume_id, experience, education, skills in rows:
+            values = (
+                parse_legacy_resume_entries(experience, EXPERIENCE_FIELDS),
+                parse_legacy_resume_entries(education, EDUCATION_FIELDS),
+                parse_legacy_skills(skills),
+            )
+            structured = tuple(
+                json.dumps(value, ensure_ascii=False) if value else None for value in values
+            )
+            if structured != (experience, education, skills):
+                updates.append(structured + (resume_id,))
+        conn.executemany(
+            "UPDATE Resumes SET experience = ?, education = ?, skills = ? WHERE resume_id = ?",
+            updates,
+        )
+        last_id = rows[-1][0]
+
+
+# Índice FTS5 de conteúdo externo sobre Jobs; os triggers o mantêm em dia
+# em create_job/update_job/delete_job (e em qualquer outra escrita em Jobs)
+JOBS_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS JobsSearch USING fts5(
+    job_title, job_description, requirements, benefits,
+    content='Jobs', content_rowid='job_id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+-- Pesos do bm25 por coluna: título > requisitos > descrição/benefícios
+INSERT INTO JobsSearch (JobsSearch, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0, 1.0)');
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_search_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT INTO JobsSearch (rowid, job_title, job_description, requirements, benefits)
+    VALUES (NEW.job_id, NEW.job_title, NEW.job_description, NEW.requirements, NEW.benefits);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_search_delete AFTER DELETE ON Jobs
+BEGIN
+    INSERT INTO JobsSearch (JobsSearch, rowid, job_title, job_description, requirements, benefits)
+    VALUES ('delete', OLD.job_id, OLD.job_title, OLD.job_description, OLD.requirements, OLD.benefits);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_search_update
+AFTER UPDATE OF job_title, job_description, requirements, benefits ON Jobs
+BEGIN
+    INSERT INTO JobsSearch (JobsSearch, rowid, job_title, job_description, requirements, benefits)
+    VALUES ('delete', OLD.job_id, OLD.job_title, OLD.job_description, OLD.requirements, OLD.benefits);
+    INSERT INTO JobsSearch (rowid, job_title, job_description, requirements, benefits)
+    VALUES (NEW.job_id, NEW.job_title, NEW.job_description, NEW.requirements, NEW.benefits);
+END;
+
+INSERT INTO JobsSearch (JobsSearch) VALUES ('rebuild');
+"""
+
+
+# Busca de candidatos: FTS5 sobre resumo/experiências/habilidades (com o JSON
+# achatado em texto) e índice normalizado de habilidades, ambos por currículo
+RESUMES_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS ResumesSearch USING fts5(
+    user_id UNINDEXED, summary, experience, skills,
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS ResumeSkills (
+    skill TEXT NOT NULL, -- minúsculas, sem espaços nas pontas
+    resume_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, resume_id),
+    FOREIGN KEY (resume_id) REFERENCES Resumes(resume_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON ResumeSkills (resume_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_resumes_search_insert AFTER INSERT ON Resumes
+BEGIN
+    INSERT INTO ResumesSearch (rowid, user_id, summary, experience, skills)
+    VALUES (
+        NEW.resume_id, NEW.user_id, NEW.summary,
+        (SELECT group_concat(value, ' ') FROM json_tree(
+            CASE WHEN json_valid(NEW.experience) THEN NEW.experience ELSE '[]' END) WHERE type = 'text'),
+        (SELECT group_concat(value, ' ') FROM json_tree(
+            CASE WHEN json_valid(NEW.skills) THEN NEW.skills ELSE '[]' END) WHERE type = 'text')
+    );
+    INSERT OR IGNORE INTO ResumeSkills (skill, resume_id, user_id)
+    SELECT lower(trim(value)), NEW.resume_id, NEW.user_id
+    FROM json_each(CASE WHEN json_valid(NEW.skills) AND json_type(NEW.skills) = 'array'
+                        THEN NEW.skills ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_resumes_search_update
+AFTER UPDATE OF user_id, summary, experience, skills ON Resumes
+BEGIN
+    DELETE FROM ResumesSearch WHERE rowid = OLD.resume_id;
+    INSERT INTO ResumesSearch (rowid, user_id, summary, experience, skills)
+    VALUES (
+        NEW.resume_id, NEW.user_id, NEW.summary,
+        (SELECT group_concat(value, ' ') FROM json_tree(
+            CASE WHEN json_valid(NEW.experience) THEN NEW.experience ELSE '[]' END) WHERE type = 'text'),
+        (SELECT group_concat(value, ' ') FROM json_tree(
+            CASE WHEN json_valid(NEW.skills) THEN NEW.skills ELSE '[]' END) WHERE type = 'text')
+    );
+    DELETE FROM ResumeSkills WHERE resume_id = OLD.resume_id;
+    INSERT OR IGNORE INTO ResumeSkills (skill, resume_id, user_id)
+    SELECT lower(trim(value)), NEW.resume_id, NEW.user_id
+    FROM json_each(CASE WHEN json_valid(NEW.skills) AND json_type(NEW.skills) = 'array'
+                        THEN NEW.skills ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_resumes_search_delete AFTER DELETE ON Resumes
+BEGIN
+    DELETE FROM ResumesSearch WHERE rowid = OLD.resume_id;
+    DELETE FROM ResumeSkills WHERE resume_id = OLD.resume_id;
+END;
+
+INSERT INTO ResumesSearch (rowid, user_id, summary, experience, skills)
+SELECT r.resume_id, r.user_id, r.summary,
+       (SELECT group_concat(value, ' ') FROM json_tree(
+           CASE WHEN json_valid(r.experience) THEN r.experience ELSE '[]' END) WHERE type = 'text'),
+       (SELECT group_concat(value, ' ') FROM json_tree(
+           CASE WHEN json_valid(r.skills) THEN r.skills ELSE '[]' END) WHERE type = 'text')
+FROM Resumes r;
+
+INSERT OR IGNORE INTO ResumeSkills (skill, resume_id, user_id)
+SELECT lower(trim(s.value)), r.resume_id, r.user_id
+FROM Resumes r, json_each(r.skills) s
+WHERE json_valid(r.skills) AND json_type(r.skills) = 'array' AND trim(s.value) <> '';
+"""
+
+
+def _text_list_sql(column):
+    """
+    Expressão SQL que devolve `column` como array JSON: arrays JSON válidos são
+    mantidos e texto livre vira uma linha por item, sem marcadores ("- ", "•").
+    """
+    lines = (
+        rf"""'["' || replace(replace(replace(replace(replace({column}, '\', '\\'), '"', '\"'), """
+        rf"""char(13), ''), char(9), ' '), char(10), '","') || '"]'"""
+    )
+    return f"""CASE
+            WHEN {column} IS NULL OR trim({column}) = '' THEN '[]'
+            WHEN json_valid({column}) AND json_type({column}) = 'array' THEN {column}
+            ELSE (
+                SELECT json_group_array(item) FROM (
+                    SELECT trim(ltrim(trim(value), '-•*')) AS item
+                    FROM json_each(CASE WHEN json_valid({lines}) THEN {lines} ELSE json_array({column}) END)
+                ) WHERE item <> ''
+            )
+        END"""
+
+
+# Modelo de leitura da listagem (GET /jobs): um card por vaga, já em JSON, com
+# as colunas de filtro/ordenação ao lado. JobCardSource monta o card a partir de
+# Jobs + Users; os triggers o regravam em qualquer escrita nas duas tabelas.
+JOB_CARDS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS JobCards (
+    job_id INTEGER PRIMARY KEY,
+    business_id INTEGER NOT NULL,
+    posted_date TEXT,
+    location TEXT,
+    job_type TEXT,
+    card_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_cards_posted ON JobCards (posted_date, job_id);
+CREATE INDEX IF NOT EXISTS idx_job_cards_location ON JobCards (location, posted_date, job_id);
+CREATE INDEX IF NOT EXISTS idx_job_cards_type ON JobCards (job_type, posted_date, job_id);
+CREATE INDEX IF NOT EXISTS idx_job_cards_business ON JobCards (business_id, posted_date, job_id);
+
+CREATE VIEW IF NOT EXISTS JobCardSource AS
+SELECT j.job_id, j.business_id, j.posted_date, j.location, j.job_type,
+       json_object(
+           'id', j.job_id,
+           'title', j.job_title,
+           'company', u.business_name,
+           'location', j.location,
+           'type', j.job_type,
+           'tags', json(CASE WHEN json_valid(j.social_group) AND json_type(j.social_group) = 'array'
+                             THEN j.social_group ELSE '[]' END),
+           'description', j.job_description,
+           'skills', json({_text_list_sql("j.requirements")}),
+           'benefits', json({_text_list_sql("j.benefits")}),
+           'salary', j.salary_range,
+           'posted_date', j.posted_date
+       ) AS card_json
+FROM Jobs j
+INNER JOIN Users u ON u.user_id = j.business_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_cards_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT OR REPLACE INTO JobCards (job_id, business_id, posted_date, location, job_type, card_json)
+    SELECT job_id, business_id, posted_date, location, job_type, card_json
+    FROM JobCardSource WHERE job_id = NEW.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_cards_update AFTER UPDATE ON Jobs
+BEGIN
+    DELETE FROM JobCards WHERE job_id = OLD.job_id;
+    INSERT OR REPLACE INTO JobCards (job_id, business_id, posted_date, location, job_type, card_json)
+    SELECT job_id, business_id, posted_date, location, job_type, card_json
+    FROM JobCardSource WHERE job_id = NEW.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_job_cards_delete AFTER DELETE ON Jobs
+BEGIN
+    DELETE FROM JobCards WHERE job_id = OLD.job_id;
+END;
+
+-- Nome da empresa aparece em todos os cards dela
+CREATE TRIGGER IF NOT EXISTS trg_job_cards_business AFTER UPDATE OF business_name ON Users
+BEGIN
+    UPDATE JobCards
+    SET card_json = (SELECT s.card_json FROM JobCardSource s WHERE s.job_id = JobCards.job_id)
+    WHERE business_id = NEW.user_id;
+END;
+
+INSERT OR REPLACE INTO JobCards (job_id, business_id, posted_date, location, job_type, card_json)
+SELECT job_id, business_id, posted_date, location, job_type, card_json FROM JobCardSource;
+
+-- Só a listagem usava estes índices; ela agora lê de JobCards
+DROP INDEX IF EXISTS idx_jobs_posted;
+DROP INDEX IF EXISTS idx_jobs_location_posted;
+DROP INDEX IF EXISTS idx_jobs_type_posted;
+"""
+
+
+# Coordenadas pela tabela Gazetteer (geo.py): os triggers geocodificam
+# Jobs.location e Users.address na mesma transação da escrita, e JobsGeo (R*Tree)
+# indexa o ponto de cada vaga para a busca por raio
+GEOCODING_SCHEMA = """
+ALTER TABLE Jobs ADD COLUMN latitude REAL;
+ALTER TABLE Jobs ADD COLUMN longitude REAL;
+ALTER TABLE Users ADD COLUMN latitude REAL;
+ALTER TABLE Users ADD COLUMN longitude REAL;
+
+CREATE TABLE IF NOT EXISTS Gazetteer (
+    name TEXT PRIMARY KEY,  -- lower(trim(texto)), ex.: 'são paulo, sp'
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS JobsGeo USING rtree(job_id, min_lat, max_lat, min_lon, max_lon);
+
+-- Os cards não têm coordenadas: o trigger passa a olhar só as colunas que entram
+-- no card, e a geocodificação (um UPDATE de latitude/longitude) não refaz o card
+DROP TRIGGER IF EXISTS trg_job_cards_update;
+CREATE TRIGGER trg_job_cards_update
+AFTER UPDATE OF business_id, social_group, job_title, job_description, location, salary_range,
+                requirements, posted_date, job_type, benefits ON Jobs
+BEGIN
+    DELETE FROM JobCards WHERE job_id = OLD.job_id;
+    INSERT OR REPLACE INTO JobCards (job_id, business_id, posted_date, location, job_type, card_json)
+    SELECT job_id, business_id, posted_date, location, job_type, card_json
+    FROM JobCardSource WHERE job_id = NEW.job_id;
+END;
+"""
+
+GEOCODING_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_jobs_geocode_insert AFTER INSERT ON Jobs
+WHEN NEW.latitude IS NULL OR NEW.longitude IS NULL
+BEGIN
+    UPDATE Jobs
+    SET latitude = (SELECT latitude FROM Gazetteer WHERE name = lower(trim(NEW.location))),
+        longitude = (SELECT longitude FROM Gazetteer WHERE name = lower(trim(NEW.location)))
+    WHERE job_id = NEW.job_id;
+END;
+
+-- Coordenadas informadas no INSERT são mantidas
+CREATE TRIGGER IF NOT EXISTS trg_jobs_geo_insert AFTER INSERT ON Jobs
+WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+BEGIN
+    INSERT OR REPLACE INTO JobsGeo VALUES (NEW.job_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_geocode_update AFTER UPDATE OF location ON Jobs
+WHEN NEW.latitude IS OLD.latitude AND NEW.longitude IS OLD.longitude
+BEGIN
+    UPDATE Jobs
+    SET latitude = (SELECT latitude FROM Gazetteer WHERE name = lower(trim(NEW.location))),
+        longitude = (SELECT longitude FROM Gazetteer WHERE name = lower(trim(NEW.location)))
+    WHERE job_id = NEW.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_geo_update AFTER UPDATE OF latitude, longitude ON Jobs
+BEGIN
+    DELETE FROM JobsGeo WHERE job_id = OLD.job_id;
+    INSERT INTO JobsGeo
+    SELECT NEW.job_id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+    WHERE NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_geo_delete AFTER DELETE ON Jobs
+BEGIN
+    DELETE FROM JobsGeo WHERE job_id = OLD.job_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_geocode_insert AFTER INSERT ON Users
+WHEN NEW.latitude IS NULL OR NEW.longitude IS NULL
+BEGIN
+    UPDATE Users
+    SET latitude = (SELECT latitude FROM Gazetteer WHERE name = lower(trim(NEW.address))),
+        longitude = (SELECT longitude FROM Gazetteer WHERE name = lower(trim(NEW.address)))
+    WHERE user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_users_geocode_update AFTER UPDATE OF address ON Users
+WHEN NEW.latitude IS OLD.latitude AND NEW.longitude IS OLD.longitude
+BEGIN
+    UPDATE Users
+    SET latitude = (SELECT latitude FROM Gazetteer WHERE name = lower(trim(NEW.address))),
+        longitude = (SELECT longitude FROM Gazetteer WHERE name = lower(trim(NEW.address)))
+    WHERE user_id = NEW.user_id;
+END;
+"""
+
+
+def add_geocoding(conn):
+    run_script(conn, GEOCODING_SCHEMA)
+    conn.executemany(
+        "INSERT OR REPLACE INTO Gazetteer (name, latitude, longitude) VALUES (?, ?, ?)",
+        geo.gazetteer_rows(),
+    )
+    # Preenche antes de criar os triggers, com um UPDATE por tabela
+    run_script(conn, """
+        UPDATE Jobs
+        SET latitude = g.latitude, longitude = g.longitude
+        FROM Gazetteer g
+        WHERE g.name = lower(trim(Jobs.location));
+
+        UPDATE Users
+        SET latitude = g.latitude, longitude = g.longitude
+        FROM Gazetteer g
+        WHERE g.name = lower(trim(Users.address));
+
+        INSERT OR REPLACE INTO JobsGeo
+        SELECT job_id, latitude, latitude, longitude, longitude
+        FROM Jobs WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+    """)
+    run_script(conn, GEOCODING_TRIGGERS)
+
+
+# Versões das tags do cache de respostas (cache.py), compartilhadas entre os
+# workers: toda escrita em Jobs, de qualquer processo (ou do import_jobs.py),
+# incrementa as tags afetadas na mesma transação, e um worker só serve uma
+# entrada do cache se as versões ainda forem as da hora em que ela foi gravada
+CACHE_VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS CacheVersions (
+    tag TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_cache_versions_job_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT 'jobs', 1
+    UNION SELECT 'job:' || NEW.job_id, 1
+    UNION SELECT 'business:' || email, 1 FROM Users WHERE user_id = NEW.business_id
+    ON CONFLICT (tag) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cache_versions_job_update AFTER UPDATE ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT 'jobs', 1
+    UNION SELECT 'job:' || NEW.job_id, 1
+    UNION SELECT 'business:' || email, 1 FROM Users WHERE user_id IN (OLD.business_id, NEW.business_id)
+    ON CONFLICT (tag) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cache_versions_job_delete AFTER DELETE ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT 'jobs', 1
+    UNION SELECT 'job:' || OLD.job_id, 1
+    UNION SELECT 'business:' || email, 1 FROM Users WHERE user_id = OLD.business_id
+    ON CONFLICT (tag) DO UPDATE SET version = version + 1;
+END;
+
+-- O nome da empresa aparece nos cards de GET /jobs
+CREATE TRIGGER IF NOT EXISTS trg_cache_versions_business AFTER UPDATE OF business_name ON Users
+BEGIN
+    INSERT INTO CacheVersions (tag, version) VALUES ('jobs', 1)
+    ON CONFLICT (tag) DO UPDATE SET version = version + 1;
+END;
+"""
+
+# Versão global em CacheVersions: cada escrita grava nas tags afetadas a maior
+# versão da tabela + 1 (as escritas no SQLite são serializadas, então as versões
+# crescem na ordem dos commits). Um worker guarda só a maior versão que já viu
+# e, de tempos em tempos, lê as tags com versão acima dela pelo índice
+CACHE_VERSIONS_GLOBAL_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_cache_versions_version ON CacheVersions (version);
+
+DROP TRIGGER IF EXISTS trg_cache_versions_job_insert;
+CREATE TRIGGER trg_cache_versions_job_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT tag, (SELECT COALESCE(MAX(version), 0) + 1 FROM CacheVersions)
+    FROM (SELECT 'jobs' AS tag
+          UNION SELECT 'job:' || NEW.job_id
+          UNION SELECT 'business:' || email FROM Users WHERE user_id = NEW.business_id)
+    WHERE true
+    ON CONFLICT (tag) DO UPDATE SET version = excluded.version;
+END;
+
+DROP TRIGGER IF EXISTS trg_cache_versions_job_update;
+CREATE TRIGGER trg_cache_versions_job_update AFTER UPDATE ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT tag, (SELECT COALESCE(MAX(version), 0) + 1 FROM CacheVersions)
+    FROM (SELECT 'jobs' AS tag
+          UNION SELECT 'job:' || NEW.job_id
+          UNION SELECT 'business:' || email FROM Users WHERE user_id IN (OLD.business_id, NEW.business_id))
+    WHERE true
+    ON CONFLICT (tag) DO UPDATE SET version = excluded.version;
+END;
+
+DROP TRIGGER IF EXISTS trg_cache_versions_job_delete;
+CREATE TRIGGER trg_cache_versions_job_delete AFTER DELETE ON Jobs
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT tag, (SELECT COALESCE(MAX(version), 0) + 1 FROM CacheVersions)
+    FROM (SELECT 'jobs' AS tag
+          UNION SELECT 'job:' || OLD.job_id
+          UNION SELECT 'business:' || email FROM Users WHERE user_id = OLD.business_id)
+    WHERE true
+    ON CONFLICT (tag) DO UPDATE SET version = excluded.version;
+END;
+
+DROP TRIGGER IF EXISTS trg_cache_versions_business;
+CREATE TRIGGER trg_cache_versions_business AFTER UPDATE OF business_name ON Users
+BEGIN
+    INSERT INTO CacheVersions (tag, version)
+    SELECT tag, (SELECT COALESCE(MAX(version), 0) + 1 FROM CacheVersions)
+    FROM (SELECT 'jobs' AS tag)
+    WHERE true
+    ON CONFLICT (tag) DO UPDATE SET version = excluded.version;
+END;
+"""
+
+# Listagem por grupo social (GET /jobs?social_group=) como leitura por faixa:
+# JobSocialGroups guarda a data da vaga e o índice (grupo, data, id) entrega as
+# vagas do grupo já na ordem da paginação, sem ordenar todas antes do LIMIT
+JOB_SOCIAL_GROUPS_POSTED_SCHEMA = """
+ALTER TABLE JobSocialGroups ADD COLUMN posted_date TEXT;
+UPDATE JobSocialGroups
+SET posted_date = (SELECT posted_date FROM Jobs WHERE Jobs.job_id = JobSocialGroups.job_id);
+
+CREATE INDEX IF NOT EXISTS idx_job_social_groups_posted ON JobSocialGroups (social_group, posted_date, job_id);
+-- Mesmo prefixo (social_group): as buscas por grupo passam a usar o índice novo
+DROP INDEX IF EXISTS idx_job_social_groups_group;
+
+DROP TRIGGER IF EXISTS trg_jobs_social_groups_insert;
+CREATE TRIGGER trg_jobs_social_groups_insert AFTER INSERT ON Jobs
+BEGIN
+    INSERT OR IGNORE INTO JobSocialGroups (job_id, social_group, posted_date)
+    SELECT NEW.job_id, trim(value), NEW.posted_date
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+
+DROP TRIGGER IF EXISTS trg_jobs_social_groups_update;
+CREATE TRIGGER trg_jobs_social_groups_update AFTER UPDATE OF social_group, posted_date ON Jobs
+BEGIN
+    DELETE FROM JobSocialGroups WHERE job_id = OLD.job_id;
+    INSERT OR IGNORE INTO JobSocialGroups (job_id, social_group, posted_date)
+    SELECT NEW.job_id, trim(value), NEW.posted_date
+    FROM json_each(CASE WHEN json_valid(NEW.social_group) AND json_type(NEW.social_group) = 'array'
+                        THEN NEW.social_group ELSE '[]' END)
+    WHERE trim(value) <> '';
+END;
+"""
+
+MIGRATIONS = [
+    (1, "indices das consultas principais", """
+        -- Login/perfil: WHERE email = ? AND user_type = ?
+        CREATE INDEX IF NOT EXISTS idx_users_email_type ON Users (email, user_type);
+        -- Listagens por tipo de usuário (GET /applicants, /users/businesses)
+        CREATE INDEX IF NOT EXISTS idx_users_type ON Users (user_type);
+        -- Candidatos de uma vaga, mais recentes primeiro
+        CREATE INDEX IF NOT EXISTS idx_applications_job ON Applications (job_id, application_date);
+        -- Vagas de uma empresa e joins Jobs -> Users
+        CREATE INDEX IF NOT EXISTS idx_jobs_business ON Jobs (business_id);
+        CREATE INDEX IF NOT EXISTS idx_resumes_user ON Resumes (user_id);
+    """),
+    (2, "UNIQUE(user_id, job_id) em Applications", """
+        -- Mantém só a candidatura mais antiga de cada par antes de criar a restrição
+        DELETE FROM Applications
+        WHERE application_id NOT IN (
+            SELECT MIN(application_id) FROM Applications GROUP BY user_id, job_id
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_applications_user_job ON Applications (user_id, job_id);
+    """),
+    (3, "indices da paginação por cursor de GET /jobs", """
+        CREATE INDEX IF NOT EXISTS idx_jobs_posted ON Jobs (posted_date, job_id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_location_posted ON Jobs (location, posted_date, job_id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_type_posted ON Jobs (job_type, posted_date, job_id);
+        -- Substitui idx_jobs_business: mesmo prefixo, já ordenado para a paginação
+        CREATE INDEX IF NOT EXISTS idx_jobs_business_posted ON Jobs (business_id, posted_date, job_id);
+        DROP INDEX IF EXISTS idx_jobs_business;
+    """),
+    (4, "grupos sociais normalizados (UserSocialGroups, JobSocialGroups)", normalize_social_groups),
+    (5, "currículos estruturados em JSON (experience, education, skills)", structure_resumes),
+    (6, "busca textual de vagas (FTS5 JobsSearch)", JOBS_SEARCH_SCHEMA),
+    (7, "busca de candidatos (FTS5 ResumesSearch, ResumeSkills)", RESUMES_SEARCH_SCHEMA),
+    (8, "cards da listagem de vagas (JobCards)", JOB_CARDS_SCHEMA),
+    (9, "coordenadas de vagas e candidatos (Gazetteer, JobsGeo R*Tree)", add_geocoding),
+    (10, "versões compartilhadas das tags do cache de respostas (CacheVersions)", CACHE_VERSIONS_SCHEMA),
+    (11, "data da vaga em JobSocialGroups para a listagem por grupo", JOB_SOCIAL_GROUPS_POSTED_SCHEMA),
+    (12, "versão global em CacheVersions para a sincronização incremental do cache", CACHE_VERSIONS_GLOBAL_SCHEMA),
+]
+
+
+def split_statements(script):
+    """
+    Divide um script SQL em statements completos (respeita corpos de TRIGGER).
+    """
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip().strip(";").strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=None):
+    """
+    Aplica as migrações pendentes até `target` (padrão: a mais recente).
+    Retorna a lista de números aplicados.
+    """
+    applied = []
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # transações controladas manualmente
+    try:
+        for number, _, step in MIGRATIONS:
+            if target is not None and number > target:
+                break
+            # BEGIN IMMEDIATE + releitura da versão: outro processo pode ter
+            # aplicado a mesma migração enquanto esperávamos o lock
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if current_version(conn) >= number:
+                    conn.execute("ROLLBACK")
+                    continue
+                if callable(step):
+                    step(conn)
+                else:
+                    run_script(conn, step)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(number)
+    finally:
+        conn.isolation_level = isolation_level
+    return applied
+
+
+@contextmanager
+def migration_lock(database):
+    """
+    Lock exclusivo em `<banco>.migrate.lock`: com vários workers subindo juntos,
+    só um aplica as migrações e os outros esperam (sem estourar o busy_timeout
+    do SQLite durante um backfill longo) e depois não encontram nada pendente.
+    """
+    if fcntl is None or database == ":memory:" or database.startswith("file:"):
+        yield
+        return
+    with open(database + ".migrate.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migrate_database(database=None):
+    database = db.resolve_database(database)
+    with migration_lock(database):
+        conn = db.connect(database, instrumented=False)
+        try:
+            return migrate(conn)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    database = sys.argv[1] if len(sys.argv) > 1 else db.DATABASE_URL
+    applied = migrate_database(database)
+    if applied:
+        print(f"Applied migrations: {', '.join(map(str, applied))}")
+    else:
+        print("Database is up to date")
@@ -0,0 +1,159 @@
+"""
+Hash de senhas com scrypt (hashlib), fora do event loop.
+
+O scrypt é propositalmente caro (CPU e memória), então os hashes rodam em um
+pool de processos do tamanho dos núcleos disponíveis. O custo é configurável
+por variáveis de ambiente e fica gravado em cada hash, no formato PHC:
+
+    $scrypt$ln=14,r=8,p=1$<salt>$<hash>
+
+Quando o custo configurado muda, `needs_rehash` indica os hashes antigos e o
+login grava um novo hash com a senha que acabou de ser conferida. Senhas
+gravadas em texto puro (antes deste módulo) são aceitas e trocadas no primeiro
+login da mesma forma.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Custo do scrypt: N = 2 ** SCRYPT_LOG_N (memória ~ 128 * r * N bytes por hash)
+SCRYPT_LOG_N = int(os.environ.get("DIVERSITYJOBS_SCRYPT_LOG_N", "14"))
+SCRYPT_R = int(os.environ.get("DIVERSITYJOBS_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("DIVERSITYJOBS_SCRYPT_P", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Processos do pool; por padrão um por núcleo disponível
+HASH_WORKERS = int(os.environ.get("DIVERSITYJOBS_HASH_WORKERS", str(_available_cpus())))
+# "0" calcula os hashes direto no event loop (apenas para depuração/benchmark)
+OFFLOAD = os.environ.get("DIVERSITYJOBS_HASH_OFFLOAD", "1") != "0"
+
+PREFIX = "$scrypt$"
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, log_n, r, p):
+    n = 2 ** log_n
+    # O limite padrão do OpenSSL (32 MiB) não comporta N >= 2 ** 15 com r = 8
+    maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=HASH_BYTES
+    )
+
+
+def _parse(stored):
+    """
+    (log_n, r, p, salt, hash) de um hash no formato PHC; None para outros valores.
+    """
+    if not stored or not stored.startswith(PREFIX):
+        return None
+    try:
+        params, salt, digest = stored[len(PREFIX):].split("$")
+        values = dict(item.split("=", 1) for item in params.split(","))
+        return int(values["ln"]), int(values["r"]), int(values["p"]), _b64decode(salt), _b64decode(digest)
+    except (ValueError, KeyError):
+        return None
+
+
+def hash_password(password, log_n=None, r=None, p=None):
+    log_n = SCRYPT_LOG_N if log_n is None else log_n
+    r = SCRYPT_R if r is None else r
+    p = SCRYPT_P if p is None else p
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _scrypt(password, salt, log_n, r, p)
+    return f"{PREFIX}ln={log_n},r={r},p={p}${_b64encode(salt)}${_b64encode(digest)}"
+
+
+def verify_password(password, stored):
+    parsed = _parse(stored)
+    if parsed is None:
+        # Senha antiga em texto puro: comparada como está, trocada no login
+        return stored is not None and hmac.compare_digest(password.encode(), stored.encode())
+    log_n, r, p, salt, digest = parsed
+    return hmac.compare_digest(_scrypt(password, salt, log_n, r, p), digest)
+
+
+def needs_rehash(stored):
+    parsed = _parse(stored)
+    return parsed is None or parsed[:3] != (SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: o servidor já tem threads (pools do banco), e fork com
+                # threads ativas pode herdar locks travados
+                _executor = ProcessPoolExecutor(
+                    max_workers=max(HASH_WORKERS, 1), mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+async def _run(fn, *args):
+    if not OFFLOAD:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args))
+
+
+async def hash_password_async(password):
+    """
+    `hash_password` no pool de processos, com o custo configurado.
+    """
+    return await _run(hash_password, password, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P)
+
+
+async def verify_password_async(password, stored):
+    return await _run(verify_password, password, stored)
+
+
+# Comparado quando o e-mail não existe, para o login levar o mesmo tempo
+DUMMY_HASH = None
+
+
+async def dummy_hash_async():
+    """
+    Hash descartável com o custo configurado, calculado no pool (o lifespan
+    já o prepara no aquecimento) e refeito se o custo mudar.
+    """
+    global DUMMY_HASH
+    if DUMMY_HASH is None or needs_rehash(DUMMY_HASH):
+        DUMMY_HASH = await hash_password_async(secrets.token_hex(8))
+    return DUMMY_HASH
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
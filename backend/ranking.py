@@ -0,0 +1,116 @@
+import functools
+import re
+import unicodedata
+
+import numpy as np
+
+
+# Pesos do score final (somam 1.0)
+SKILL_WEIGHT = 0.6
+GROUP_WEIGHT = 0.25
+LOCATION_WEIGHT = 0.15
+
+REMOTE_LOCATIONS = {"remoto", "remote", "home office"}
+
+
+def normalize(text):
+    """
+    Minúsculas e sem acentos, para comparar habilidades/cidades com o texto da vaga.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+# Palavras e sinais soltos ("c++" -> c, +, +; "node.js" -> node, ., js):
+# habilidades e requisitos são quebrados do mesmo jeito e comparados por sequência
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@functools.lru_cache(maxsize=65536)
+def skill_term(skill):
+    """
+    Termo normalizado de uma habilidade: variantes como "Python", "python " e
+    "pýthon" dão o mesmo termo. Memorizado, pois o vocabulário se repete
+    entre requisições.
+    """
+    return tuple(TOKEN_RE.findall(normalize(skill)))
+
+
+def required_skills(requirements, vocabulary):
+    """
+    Termos do vocabulário (habilidades distintas dos candidatos) citados nos
+    requisitos da vaga, como {habilidade gravada: termo}. Variantes com o
+    mesmo termo contam como um só requisito: o total da vaga é
+    len(set(required.values())).
+
+    Os requisitos são tokenizados uma vez, em sequências de até o tamanho do
+    maior termo; cada habilidade é uma consulta nesse set.
+    """
+    tokens = TOKEN_RE.findall(normalize(requirements))
+    if not tokens:
+        return {}
+    terms = {skill: skill_term(skill) for skill in vocabulary}
+    longest = min(max((len(term) for term in terms.values()), default=0), len(tokens))
+    sequences = {
+        tuple(tokens[start:start + size])
+        for size in range(1, longest + 1)
+        for start in range(len(tokens) - size + 1)
+    }
+    return {skill: term for skill, term in terms.items() if term and term in sequences}
+
+
+def location_matches(job_location, addresses):
+    """
+    1.0 quando a vaga é remota ou a cidade da vaga aparece no endereço do candidato.
+    Calculado por endereço distinto e expandido para todos os candidatos.
+    """
+    location = normalize(job_location)
+    if location in REMOTE_LOCATIONS:
+        return np.ones(len(addresses))
+    if not location or not len(addresses):
+        return np.zeros(len(addresses))
+    unique, inverse = np.unique(np.asarray(addresses, dtype=object).astype(str), return_inverse=True)
+    hits = np.array([location in normalize(address) for address in unique], dtype=float)
+    return hits[inverse]
+
+
+def _coverage(user_ids, pair_user_ids, total):
+    # Linhas da matriz candidato × termo (formato coordenada) multiplicadas pelo
+    # vetor da vaga: só os pares com termos da vaga chegam aqui, então o produto
+    # se reduz a contar pares por candidato
+    pair_user_ids = np.asarray(pair_user_ids, dtype=np.int64)
+    rows = np.searchsorted(user_ids, pair_user_ids)
+    known = rows < len(user_ids)
+    known[known] = user_ids[rows[known]] == pair_user_ids[known]
+    counts = np.bincount(rows[known], minlength=len(user_ids))
+    return counts, (counts / total if total else np.zeros(len(user_ids)))
+
+
+def rank_applicants(user_ids, addresses, job_location,
+                    skill_pairs, required_count, group_pairs, group_count):
+    """
+    Pontua todos os candidatos de uma vaga em uma única passada vetorizada.
+
+    `skill_pairs`/`group_pairs` têm um user_id por par (candidato, termo da
+    vaga) — habilidades citadas nos requisitos e grupos sociais da vaga;
+    `required_count`/`group_count` são os totais de termos da vaga.
+
+    Retorna (user_ids, scores, matched_skills) ordenados por score decrescente
+    e, em empate, por user_id.
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    order = np.argsort(user_ids, kind="stable")
+    user_ids = user_ids[order]
+    addresses = np.asarray(addresses, dtype=object)[order]
+
+    matched_skills, skill_score = _coverage(user_ids, skill_pairs, required_count)
+    _, group_score = _coverage(user_ids, group_pairs, group_count)
+    location_score = location_matches(job_location, addresses)
+
+    scores = (
+        SKILL_WEIGHT * skill_score
+        + GROUP_WEIGHT * group_score
+        + LOCATION_WEIGHT * location_score
+    )
+    ranked = np.lexsort((user_ids, -scores))
+    return user_ids[ranked], scores[ranked], matched_skills[ranked]
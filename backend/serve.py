@@ -0,0 +1,125 @@
+"""
+Sobe a API em produção: N processos do uvicorn dividindo o mesmo banco em WAL.
+
+Antes de lançar os workers, confere o banco (existe, diretório gravável para
+os arquivos -wal/-shm, modo WAL) e aplica as migrações pendentes uma única
+vez. Cada worker ainda passa pelo lifespan do app.py (migrações sob lock de
+arquivo, que já não encontram nada pendente, e aquecimento) antes de aceitar
+conexões. O tempo do lançamento até a primeira resposta é mostrado no console.
+
+Uso (a partir de backend/):
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import uvicorn
+
+import db
+import migrations
+
+
+def preflight(database):
+    """
+    Falha cedo, com uma mensagem clara, em vez de cada worker falhar sozinho.
+    """
+    if database == ":memory:":
+        sys.exit("serve.py: an in-memory database cannot be shared between workers")
+    if not os.path.exists(database):
+        sys.exit(f"serve.py: database {database} not found (create it with python generate_db.py)")
+    if not os.access(os.path.dirname(database), os.W_OK):
+        sys.exit(f"serve.py: {os.path.dirname(database)} is not writable (WAL needs the -wal and -shm files)")
+
+    conn = db.connect(database, instrumented=False)
+    try:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        integrity = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if mode.lower() != "wal":
+        sys.exit(f"serve.py: could not switch {database} to WAL (journal_mode={mode})")
+    if integrity != "ok":
+        sys.exit(f"serve.py: quick_check failed for {database}: {integrity}")
+
+    started = time.perf_counter()
+    applied = migrations.migrate_database(database)
+    if applied:
+        print(f"Applied migrations {', '.join(map(str, applied))} in {time.perf_counter() - started:.2f}s")
+
+
+def report_first_response(url, launched_at, timeout):
+    """
+    Espera a primeira resposta de GET / e mostra o tempo desde o lançamento
+    e as fases de inicialização do worker que respondeu.
+    """
+    deadline = launched_at + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/", timeout=1) as response:
+                response.read()
+            break
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.05)
+    else:
+        print(f"No response from {url} after {timeout:.0f}s", file=sys.stderr)
+        return
+    elapsed = time.time() - launched_at
+    phases = {}
+    try:
+        with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+            for line in response.read().decode().splitlines():
+                if line.startswith("diversityjobs_startup_seconds{"):
+                    labels, value = line.rsplit(" ", 1)
+                    phases[labels.split('"')[1]] = float(value)
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        pass
+    details = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in phases.items())
+    print(f"Cold start to first response: {elapsed:.2f}s" + (f" (worker: {details})" if details else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--db", default=db.DATABASE_URL, help="padrão: DIVERSITYJOBS_DB ou diversityjobs.db ao lado do app")
+    parser.add_argument("--no-warmup", action="store_true", help="não aquece caches antes de aceitar conexões")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    launched_at = time.time()
+    database = db.resolve_database(args.db)
+    preflight(database)
+
+    # Herdado pelos workers
+    os.environ["DIVERSITYJOBS_DB"] = database
+    os.environ["DIVERSITYJOBS_LAUNCHED_AT"] = repr(launched_at)
+    if args.no_warmup:
+        os.environ["DIVERSITYJOBS_WARMUP"] = "0"
+    # Com um só worker as invalidações locais bastam (ver cache.py)
+    os.environ.setdefault("DIVERSITYJOBS_CACHE_SHARED", "1" if args.workers > 1 else "0")
+
+    host = "127.0.0.1" if args.host in ("0.0.0.0", "::") else args.host
+    threading.Thread(
+        target=report_first_response, args=(f"http://{host}:{args.port}", launched_at, 120), daemon=True
+    ).start()
+
+    print(f"Serving {database} with {args.workers} worker(s) on http://{args.host}:{args.port}")
+    uvicorn.run(
+        "app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+if __name__ == "__main__":
+    main()
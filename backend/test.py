@@ -1,33 +1,367 @@
-import requests
+"""
+Verificações da API e benchmark de carga/latência do backend.
+
+Alvos (sem serviços externos):
+    inprocess  o app ASGI neste processo, via httpx (padrão)
+    spawn      um uvicorn local iniciado pelo script (--workers N)
+    http://... um servidor que já está rodando
+
+Os alvos inprocess e spawn usam uma cópia temporária do banco (--db),
+então as escritas do benchmark nunca tocam o arquivo original.
+
+    python test.py smoke
+    python test.py bench --concurrency 32 --duration 15 --output bench.json
+    python test.py bench --target spawn --workers 4 --baseline bench.json
+    python test.py smoke --target http://localhost:8000
+
+`bench` mostra a vazão e a latência p50/p95/p99 por endpoint, grava os
+resultados em JSON e, com --baseline, termina com erro quando algum endpoint
+ficou mais lento do que a tolerância permite ou devolveu status inesperados.
+"""
+import argparse
+import asyncio
 import json
-from typing import Dict, Any
+import os
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import subprocess
 import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(BACKEND_DIR, "diversityjobs.db")
+FIXTURE_LIMIT = 200
+DISPOSABLE_JOBS = 200
+SEARCH_TERMS = ["python", "dados", "desenvolvedor", "marketing", "gerente", "design", "sql"]
+STATUSES = ["pending", "reviewed", "accepted", "rejected"]
+
+
+# ---------------------------------------------------------------------------
+# Alvos
+# ---------------------------------------------------------------------------
+
+def copy_database(source: str, destination: str) -> None:
+    # API de backup: cópia consistente mesmo com um arquivo WAL ao lado do banco
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(destination)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
 
-BASE_URL = "http://localhost:8000"
 
-def test_endpoint(endpoint: str, expected_status: int = 200) -> Dict[str, Any]:
+@asynccontextmanager
+async def open_target(args):
     """
-    Test an endpoint and return the result
+    Entrega (client, caminho do banco) para o alvo escolhido.
     """
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.target.startswith("http"):
+        async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=limits) as client:
+            yield client, args.db
+        return
+
+    workdir = tempfile.mkdtemp(prefix="diversityjobs-bench-")
+    database = args.db
+    if not args.in_place:
+        database = os.path.join(workdir, "bench.db")
+        copy_database(args.db, database)
     try:
-        response = requests.get(f"{BASE_URL}{endpoint}")
-        status = "✅" if response.status_code == expected_status else "❌"
+        if args.target == "inprocess":
+            os.environ["DIVERSITYJOBS_DB"] = os.path.abspath(database)
+            sys.path.insert(0, BACKEND_DIR)
+            import db
+            import app as api
+
+            # db pode ter sido importado antes de a variável ser definida
+            db.DATABASE_URL = os.path.abspath(database)
+
+            # lifespan_context roda a inicialização e o encerramento (migrações, pool)
+            async with api.app.router.lifespan_context(api.app):
+                transport = httpx.ASGITransport(app=api.app)
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://testserver", timeout=args.timeout
+                ) as client:
+                    yield client, database
+        elif args.target == "spawn":
+            port = free_port()
+            env = dict(os.environ, DIVERSITYJOBS_DB=os.path.abspath(database))
+            process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=BACKEND_DIR,
+                env=env,
+            )
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+                    await wait_until_ready(client, process)
+                    yield client, database
+            finally:
+                process.terminate()
+                process.wait()
+        else:
+            raise SystemExit(f"Unknown target: {args.target}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            await client.get("/")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not start")
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+def load_fixtures(database: str) -> Dict[str, Any]:
+    """
+    Ids e e-mails que existem no banco, usados para montar as requisições.
+    """
+    conn = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        def column(query, *params):
+            return [row[0] for row in conn.execute(query, params)]
+
+        applications: Dict[int, List[str]] = {}
+        for job_id, email in conn.execute("""
+            SELECT a.job_id, u.email FROM Applications a
+            INNER JOIN Users u ON u.user_id = a.user_id
+            INNER JOIN Jobs j ON j.job_id = a.job_id
+            ORDER BY a.application_id DESC LIMIT ?
+        """, (FIXTURE_LIMIT * 5,)):
+            applications.setdefault(job_id, []).append(email)
+        try:
+            skills = column("SELECT skill FROM ResumeSkills GROUP BY skill ORDER BY COUNT(*) DESC LIMIT 20")
+        except sqlite3.OperationalError:
+            skills = []
         return {
-            "endpoint": endpoint,
-            "status_code": response.status_code,
-            "expected_status": expected_status,
-            "success": status,
-            "response": response.json() if response.status_code == 200 else response.text
+            "job_ids": column("SELECT job_id FROM Jobs ORDER BY job_id DESC LIMIT ?", FIXTURE_LIMIT),
+            "applicants": column(
+                "SELECT email FROM Users WHERE user_type = 'applicant' ORDER BY user_id DESC LIMIT ?", FIXTURE_LIMIT
+            ),
+            "businesses": column(
+                "SELECT email FROM Users WHERE user_type = 'business' ORDER BY user_id LIMIT ?", FIXTURE_LIMIT
+            ),
+            "applications": applications,
+            "skills": skills or ["python", "sql", "excel"],
         }
-    except requests.RequestException as e:
+    finally:
+        conn.close()
+
+
+class Workload:
+    """
+    Estado compartilhado de uma execução: fixtures e as entidades criadas pelo
+    próprio script (as escritas só alteram o status de linhas das fixtures).
+    """
+
+    def __init__(self, fixtures, seed, run_id):
+        self.fixtures = fixtures
+        self.rng = random.Random(seed)
+        self.run_id = run_id
+        self.counter = 0
+        self.created_applicants: List[str] = []
+        self.disposable_jobs: List[int] = []
+
+    def pick(self, key):
+        return self.rng.choice(self.fixtures[key])
+
+    def next_id(self):
+        self.counter += 1
+        return self.counter
+
+    def job_payload(self, title=None):
         return {
-            "endpoint": endpoint,
-            "expected_status": expected_status,
-            "status_code": None,
-            "success": "❌",
-            "response": str(e)
+            "business_email": self.pick("businesses"),
+            "social_group": self.rng.sample(["Mulheres", "PCD", "LGBTQIA+", "Pessoas Negras"], 2),
+            "job_title": title or f"Vaga benchmark {self.run_id}",
+            "job_description": "Vaga criada pelo benchmark",
+            "location": self.rng.choice(["São Paulo", "Remoto", "Recife"]),
+            "salary_range": None,
+            "requirements": "- Experiência com Python e SQL",
+            "posted_date": "2024-12-01",
+            "application_deadline": None,
+            "application_process": None,
         }
 
+
+class Operation:
+    __slots__ = ("name", "kind", "weight", "build", "expected", "on_success")
+
+    def __init__(self, name, kind, weight, build, expected=(200,), on_success=None):
+        self.name = name
+        self.kind = kind
+        self.weight = weight
+        self.build = build  # (workload) -> (method, url, kwargs), ou None quando ainda não há dados
+        self.expected = set(expected)
+        self.on_success = on_success
+
+
+def _applicant_payload(w, email):
+    return {
+        "email": email, "nome": "Benchmark", "senha": "x", "localizacao": "São Paulo, SP",
+        "grupoSocial": ["PCD"], "habilidades": w.rng.sample(w.fixtures["skills"], min(3, len(w.fixtures["skills"]))),
+        "experiencias": [{"tempo": "2020 - Atual", "empresa": "Bench", "cargo": "Dev", "descricao": "x"}],
+    }
+
+
+def _new_applicant(w):
+    email = f"bench-{w.run_id}-{w.next_id()}@example.com"
+    return "POST", "/applicants", {"json": _applicant_payload(w, email)}
+
+
+def _update_applicant(w):
+    if not w.created_applicants:
+        return None
+    email = w.rng.choice(w.created_applicants)
+    return "PUT", f"/applicants/{email}", {"json": _applicant_payload(w, email)}
+
+
+def _login(w):
+    if not w.created_applicants:
+        return None
+    return "POST", "/login", {"json": {"email": w.rng.choice(w.created_applicants), "senha": "x"}}
+
+
+def _apply(w):
+    if not w.created_applicants:
+        return None
+    return "POST", f"/jobs/{w.pick('job_ids')}/apply", {"json": {"applicant_email": w.rng.choice(w.created_applicants)}}
+
+
+def _status(w):
+    if not w.fixtures["applications"]:
+        return None
+    job_id = w.rng.choice(list(w.fixtures["applications"]))
+    email = w.rng.choice(w.fixtures["applications"][job_id])
+    return "POST", f"/applications/{job_id}/status", {
+        "params": {"status": w.rng.choice(STATUSES)}, "json": {"applicant_email": email}
+    }
+
+
+def _status_bulk(w):
+    if not w.fixtures["applications"]:
+        return None
+    job_id = w.rng.choice(list(w.fixtures["applications"]))
+    updates = [{"applicant_email": email, "status": w.rng.choice(STATUSES)}
+               for email in w.fixtures["applications"][job_id][:20]]
+    return "POST", f"/applications/{job_id}/status/bulk", {"json": updates}
+
+
+def _update_job(w):
+    job_id = w.rng.choice(w.disposable_jobs) if w.disposable_jobs else None
+    if job_id is None:
+        return None
+    return "PUT", f"/jobs/{job_id}", {"json": {"application_process": f"Atualizada {w.next_id()}"}}
+
+
+def _delete_job(w):
+    if not w.disposable_jobs:
+        return None
+    return "DELETE", f"/jobs/{w.disposable_jobs.pop()}", {}
+
+
+def _remember_applicant(w, method, url, kwargs, response):
+    w.created_applicants.append(kwargs["json"]["email"])
+
+
+OPERATIONS = [
+    # Leituras
+    Operation("GET /", "read", 1, lambda w: ("GET", "/", {})),
+    Operation("GET /jobs", "read", 20, lambda w: ("GET", "/jobs", {"params": {"limit": 50}})),
+    Operation("GET /jobs?location", "read", 5, lambda w: ("GET", "/jobs", {"params": {"limit": 50, "location": "São Paulo"}})),
+    Operation("GET /jobs/{id}", "read", 20, lambda w: ("GET", f"/jobs/{w.pick('job_ids')}", {})),
+    Operation("GET /jobs/nearby", "read", 4, lambda w: ("GET", "/jobs/nearby", {"params": {"lat": -23.55, "lon": -46.63, "radius_km": 50, "limit": 20}})),
+    Operation("GET /jobs/search", "read", 8, lambda w: ("GET", "/jobs/search", {"params": {"q": w.rng.choice(SEARCH_TERMS)}})),
+    Operation("GET /jobs/{id}/applicants", "read", 4, lambda w: ("GET", f"/jobs/{w.pick('job_ids')}/applicants", {"params": {"limit": 20}})),
+    Operation("GET /jobs/{id}/candidates", "read", 4, lambda w: ("GET", f"/jobs/{w.pick('job_ids')}/candidates", {})),
+    Operation("GET /applicants/{email}", "read", 10, lambda w: ("GET", f"/applicants/{w.pick('applicants')}", {})),
+    Operation("GET /applicants/{email}/matching-jobs", "read", 6, lambda w: ("GET", f"/applicants/{w.pick('applicants')}/matching-jobs", {"params": {"limit": 20}})),
+    Operation("GET /applicants/{email}/applications", "read", 6, lambda w: ("GET", f"/applicants/{w.pick('applicants')}/applications", {})),
+    Operation("GET /businesses/{email}", "read", 4, lambda w: ("GET", f"/businesses/{w.pick('businesses')}", {})),
+    Operation("GET /businesses/{email}/jobs", "read", 6, lambda w: ("GET", f"/businesses/{w.pick('businesses')}/jobs", {})),
+    Operation("GET /businesses/{email}/dashboard", "read", 4, lambda w: ("GET", f"/businesses/{w.pick('businesses')}/dashboard", {})),
+    Operation("GET /candidates/search", "read", 4, lambda w: ("GET", "/candidates/search", {"params": {"skills": w.rng.sample(w.fixtures["skills"], min(2, len(w.fixtures["skills"]))), "limit": 20}})),
+    # Listagens completas: peso baixo, crescem com o banco
+    Operation("GET /applicants", "read", 1, lambda w: ("GET", "/applicants", {}), expected=(200, 404)),
+    Operation("GET /users/businesses", "read", 1, lambda w: ("GET", "/users/businesses", {})),
+    # Escritas
+    Operation("POST /jobs", "write", 4, lambda w: ("POST", "/jobs", {"json": w.job_payload()})),
+    Operation("POST /jobs/bulk", "write", 1, lambda w: ("POST", "/jobs/bulk", {"json": [w.job_payload() for _ in range(10)]})),
+    Operation("PUT /jobs/{id}", "write", 3, _update_job),
+    Operation("DELETE /jobs/{id}", "write", 1, _delete_job),
+    Operation("POST /applicants", "write", 3, _new_applicant, on_success=_remember_applicant),
+    Operation("POST /login", "read", 2, _login),
+    Operation("PUT /applicants/{email}", "write", 2, _update_applicant),
+    Operation("POST /jobs/{id}/apply", "write", 6, _apply, expected=(200, 400)),
+    Operation("POST /applications/{id}/status", "write", 3, _status),
+    Operation("POST /applications/{id}/status/bulk", "write", 1, _status_bulk),
+]
+
+
+async def prepare(client: httpx.AsyncClient, workload: Workload, database: str) -> None:
+    """
+    Cria as vagas usadas por PUT/DELETE e alguns candidatos para as candidaturas.
+    """
+    title = f"bench-{workload.run_id}-disposable"
+    payload = [workload.job_payload(title) for _ in range(DISPOSABLE_JOBS)]
+    (await client.post("/jobs/bulk", json=payload)).raise_for_status()
+    for _ in range(5):
+        method, url, kwargs = _new_applicant(workload)
+        (await client.request(method, url, **kwargs)).raise_for_status()
+        workload.created_applicants.append(kwargs["json"]["email"])
+    try:
+        conn = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+        try:
+            workload.disposable_jobs = [
+                row[0] for row in conn.execute("SELECT job_id FROM Jobs WHERE job_title = ?", (title,))
+            ]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        workload.disposable_jobs = []  # servidor remoto, sem o arquivo: sem PUT/DELETE
+
+
+def select_operations(args) -> List[Operation]:
+    operations = [op for op in OPERATIONS if op.weight > 0]
+    if args.only:
+        operations = [op for op in operations if re.search(args.only, op.name)]
+    if args.exclude:
+        operations = [op for op in operations if not re.search(args.exclude, op.name)]
+    if not operations:
+        raise SystemExit("No operations selected")
+    return operations
+
+
+# ---------------------------------------------------------------------------
+# Verificações (smoke)
+# ---------------------------------------------------------------------------
+
 def print_result(result: Dict[str, Any]) -> None:
     """
     Print the test result in a formatted way
@@ -41,58 +375,291 @@ def print_result(result: Dict[str, Any]) -> None:
         print("Response data received successfully")
     print(f"{'-'*50}\n")
 
-def main():
-    # Test cases using the sample data from generate_db.py
-    test_cases = [
-        # Test existing resources (expecting 200)
-        ("/applicants/john@example.com", 200),
-        ("/applicants/jane@example.com", 200),
-        ("/businesses/tech@company.com", 200),
-        ("/businesses/retail@store.com", 200),
-        ("/jobs/1", 200),
-        ("/jobs/2", 200),
-        ("/jobs/1/applicants", 200),
-        ("/applicants/john@example.com/matching-jobs", 200),
-        ("/businesses/tech@company.com/jobs", 200),
-        ("/jobs", 200),
-        ("/applicants/john@example.com/applications", 200),
-        
-        # Test non-existing resources (expecting 404)
-        ("/applicants/nonexistent@example.com", 404),
-        ("/businesses/nonexistent@example.com", 404),
-        ("/jobs/999", 404),
-        ("/jobs/999/applicants", 404),
-        ("/applicants/nonexistent@example.com/matching-jobs", 404),
-        ("/businesses/nonexistent@example.com/jobs", 404)
-    ]
-
-    print("🔍 Starting API Tests...")
-    
-    success_count = 0
-    total_tests = len(test_cases)
-
-    for endpoint, expected_status in test_cases:
-        result = test_endpoint(endpoint, expected_status)
-        print_result(result)
-        if result['success'] == "✅":
-            success_count += 1
 
-    # Print summary
+async def check(client, name, method, url, expected, **kwargs) -> Dict[str, Any]:
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code in expected
+        return {
+            "endpoint": name if name == url else f"{name} ({url})",
+            "status_code": response.status_code,
+            "expected_status": "/".join(map(str, sorted(expected))),
+            "success": "✅" if ok else "❌",
+            "response": None if ok else response.text[:300],
+        }
+    except httpx.HTTPError as e:
+        return {
+            "endpoint": name,
+            "expected_status": "/".join(map(str, sorted(expected))),
+            "status_code": None,
+            "success": "❌",
+            "response": str(e),
+        }
+
+
+async def check_concurrent_apply(client, workload, parallel: int = 20) -> Dict[str, Any]:
+    """
+    Envia a mesma candidatura em paralelo: exatamente uma deve ser aceita e o
+    candidato deve terminar com uma única candidatura para a vaga.
+    """
+    endpoint = f"/jobs/{{job_id}}/apply x{parallel}"
+    try:
+        email = f"concurrency-{workload.run_id}@example.com"
+        (await client.post("/applicants", json={"email": email, "nome": "Concurrency Test", "senha": "x"})).raise_for_status()
+        job_id = workload.pick("job_ids")
+        responses = await asyncio.gather(*(
+            client.post(f"/jobs/{job_id}/apply", json={"applicant_email": email}) for _ in range(parallel)
+        ))
+        statuses = sorted(response.status_code for response in responses)
+        applications = (await client.get(f"/applicants/{email}/applications")).json()
+        rows = sum(1 for a in applications if a.get("id") == job_id)
+        ok = statuses.count(200) == 1 and statuses.count(400) == parallel - 1 and rows == 1
+        return {
+            "endpoint": endpoint,
+            "status_code": statuses.count(200),
+            "expected_status": 1,
+            "success": "✅" if ok else "❌",
+            "response": f"statuses={statuses} applications={rows}",
+        }
+    except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+        return {"endpoint": endpoint, "expected_status": 1, "status_code": None, "success": "❌", "response": str(e)}
+
+
+async def run_smoke(args) -> int:
+    async with open_target(args) as (client, database):
+        fixtures = load_fixtures(database)
+        workload = Workload(fixtures, args.seed, run_id=f"{int(time.time())}-{os.getpid()}")
+        await prepare(client, workload, database)
+
+        results = []
+        # Recursos inexistentes (404)
+        for url in ["/applicants/nonexistent@example.com", "/businesses/nonexistent@example.com",
+                    "/jobs/999999999", "/jobs/999999999/applicants",
+                    "/applicants/nonexistent@example.com/matching-jobs",
+                    "/businesses/nonexistent@example.com/jobs"]:
+            results.append(await check(client, url, "GET", url, {404}))
+        # Uma requisição de cada operação do workload
+        for op in OPERATIONS:
+            request = op.build(workload)
+            if request is None:
+                continue
+            method, url, kwargs = request
+            result = await check(client, op.name, method, url, op.expected, **kwargs)
+            if result["success"] == "✅" and op.on_success:
+                op.on_success(workload, method, url, kwargs, None)
+            results.append(result)
+        # Envios paralelos da mesma candidatura
+        results.append(await check_concurrent_apply(client, workload))
+
+    print("🔍 API checks")
+    for result in results:
+        print_result(result)
+    failed = sum(1 for result in results if result["success"] != "✅")
     print(f"\n📊 Test Summary:")
-    print(f"Total Tests: {total_tests}")
-    print(f"Successful: {success_count}")
-    print(f"Failed: {total_tests - success_count}")
-    
-    # Calculate success percentage
-    success_percentage = (success_count / total_tests) * 100
-    print(f"Success Rate: {success_percentage:.1f}%")
-    
-    # Return non-zero exit code if any test failed
-    if success_count != total_tests:
+    print(f"Total Tests: {len(results)}")
+    print(f"Successful: {len(results) - failed}")
+    print(f"Failed: {failed}")
+    print(f"Success Rate: {(len(results) - failed) / len(results) * 100:.1f}%")
+    if failed:
         print("\n❌ Some tests failed!")
-        sys.exit(1)
-    else:
-        print("\n✅ All tests passed!")
+        return 1
+    print("\n✅ All tests passed!")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+class Stats:
+    __slots__ = ("latencies", "statuses", "errors")
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    # Posto mais próximo sobre uma lista já ordenada
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(stats: Stats, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(stats.latencies)
+    count = len(ordered)
+    if not count:
+        return {"requests": 0, "errors": stats.errors, "statuses": stats.statuses}
+    return {
+        "requests": count,
+        "errors": stats.errors,
+        "error_rate": stats.errors / count,
+        "statuses": stats.statuses,
+        "throughput_rps": count / elapsed,
+        "mean_ms": sum(ordered) / count * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def drive(client, workload, operations, args, duration, record):
+    reads = [op for op in operations if op.kind == "read"]
+    writes = [op for op in operations if op.kind == "write"]
+    stats: Dict[str, Stats] = {}
+    deadline = time.perf_counter() + duration
+    remaining = [args.requests] if args.requests else None
+
+    def choose():
+        pool = writes if writes and (not reads or workload.rng.random() < args.write_ratio) else reads
+        while True:
+            op = workload.rng.choices(pool, weights=[op.weight for op in pool])[0]
+            request = op.build(workload)
+            if request is not None:
+                return op, request
+            if all(candidate.build is op.build for candidate in pool):
+                pool = reads or writes
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            op, (method, url, kwargs) = choose()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+                ok = response.status_code in op.expected
+            except httpx.HTTPError as e:
+                status, ok, response = type(e).__name__, False, None
+            latency = time.perf_counter() - start
+            if ok and op.on_success:
+                op.on_success(workload, method, url, kwargs, response)
+            if record:
+                entry = stats.setdefault(op.name, Stats())
+                entry.latencies.append(latency)
+                entry.statuses[status] = entry.statuses.get(status, 0) + 1
+                entry.errors += 0 if ok else 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    return elapsed, stats
+
+
+def compare(results, baseline, tolerance, min_requests) -> List[str]:
+    """
+    Regressões por endpoint: p95 acima de baseline * (1 + tolerance) ou
+    vazão abaixo de baseline * (1 - tolerance).
+    """
+    problems = []
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or min(current.get("requests", 0), previous.get("requests", 0)) < min_requests:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            problems.append(
+                f"{name}: throughput {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f} req/s"
+            )
+    return problems
+
+
+def print_table(results) -> None:
+    header = f"{'endpoint':42} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = sorted(results["endpoints"].items()) + [("TOTAL", results["total"])]
+    for name, row in rows:
+        if not row.get("requests"):
+            continue
+        print(f"{name:42} {row['requests']:7d} {row['errors']:5d} {row['throughput_rps']:8.1f} "
+              f"{row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f}")
+
+
+async def run_bench(args) -> int:
+    operations = select_operations(args)
+    async with open_target(args) as (client, database):
+        fixtures = load_fixtures(database)
+        workload = Workload(fixtures, args.seed, run_id=f"{int(time.time())}-{os.getpid()}")
+        await prepare(client, workload, database)
+        if args.warmup:
+            await drive(client, workload, operations, args, args.warmup, record=False)
+        elapsed, stats = await drive(client, workload, operations, args, args.duration, record=True)
+
+    total = Stats()
+    for entry in stats.values():
+        total.latencies.extend(entry.latencies)
+        total.errors += entry.errors
+        for status, count in entry.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.target,
+            "workers": args.workers,
+            "database": os.path.abspath(args.db),
+            "concurrency": args.concurrency,
+            "duration_s": elapsed,
+            "write_ratio": args.write_ratio,
+            "seed": args.seed,
+        },
+        "total": summarize(total, elapsed),
+        "endpoints": {name: summarize(entry, elapsed) for name, entry in stats.items()},
+    }
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    failures = []
+    if results["total"].get("error_rate", 0) > args.max_error_rate:
+        failures.append(f"error rate {results['total']['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            failures += compare(results, json.load(file), args.tolerance, args.min_requests)
+    if failures:
+        print("\n❌ Regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", nargs="?", choices=["smoke", "bench"], default="smoke")
+    parser.add_argument("--target", default="inprocess", help="inprocess, spawn ou uma URL base")
+    parser.add_argument("--db", default=DEFAULT_DB, help="banco a copiar (ou, com uma URL, o banco do servidor)")
+    parser.add_argument("--in-place", action="store_true", help="usa o --db diretamente, sem cópia temporária")
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn com --target spawn")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="segundos de medição")
+    parser.add_argument("--requests", type=int, default=0, help="para depois de N requisições (0 = usa --duration)")
+    parser.add_argument("--warmup", type=float, default=2, help="segundos de aquecimento, sem registro")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--only", help="regex: só as operações cujo nome casa")
+    parser.add_argument("--exclude", help="regex: pula as operações cujo nome casa")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="variação permitida de p95/vazão")
+    parser.add_argument("--min-requests", type=int, default=20, help="ignora endpoints com menos amostras")
+    parser.add_argument("--max-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    if args.requests:
+        args.duration = float("inf")
+
+    runner = run_smoke if args.mode == "smoke" else run_bench
+    sys.exit(asyncio.run(runner(args)))
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,7 @@
 'use client'
 
 import { useRouter } from 'next/navigation'
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import Link from 'next/link'
 import { Button } from "@/components/ui/button"
 import { Input } from "@/components/ui/input"
@@ -34,23 +34,51 @@ export default function JobsPage() {
   const [selectedJob, setSelectedJob] = useState<Job | null>(null)
   const [selectedCity, setSelectedCity] = useState("")
 
-  useEffect(() => {
-    const fetchJobs = async () => {
-      try {
-        const response = await fetch('http://localhost:8000/jobs')
-        if (!response.ok) {
-          throw new Error('Failed to fetch jobs')
-        }
-        const data = await response.json()
-        setJobs(data)
-      } catch (error) {
-        console.error('Error fetching jobs:', error)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loading, setLoading] = useState(false)
+  const sentinelRef = useRef<HTMLDivElement | null>(null)
+
+  // A API devolve as vagas em páginas; o cursor da próxima vem no header X-Next-Cursor
+  const fetchJobs = useCallback(async (cursor: string | null) => {
+    setLoading(true)
+    try {
+      const url = new URL('http://localhost:8000/jobs')
+      if (cursor) {
+        url.searchParams.set('cursor', cursor)
+      }
+      const response = await fetch(url)
+      if (!response.ok) {
+        throw new Error('Failed to fetch jobs')
       }
+      const data = await response.json()
+      setJobs(prev => cursor ? [...prev, ...data] : data)
+      setNextCursor(response.headers.get('X-Next-Cursor'))
+    } catch (error) {
+      console.error('Error fetching jobs:', error)
+      setNextCursor(null)
+    } finally {
+      setLoading(false)
     }
-
-    fetchJobs()
   }, [])
 
+  useEffect(() => {
+    fetchJobs(null)
+  }, [fetchJobs])
+
+  // Rolagem infinita: carrega a próxima página quando o fim da lista aparece
+  useEffect(() => {
+    const sentinel = sentinelRef.current
+    if (!sentinel || !nextCursor) return
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting && !loading) {
+        fetchJobs(nextCursor)
+      }
+    })
+    observer.observe(sentinel)
+    return () => observer.disconnect()
+  }, [fetchJobs, loading, nextCursor])
+
   const handleTagToggle = (tag: string) => {
     setSelectedTags(prev =>
       prev.includes(tag) ? prev.filter(t => t !== tag) : [...prev, tag]
@@ -232,6 +260,8 @@ export default function JobsPage() {
                       </CardFooter>
                     </Card>
                   ))}
+                  <div ref={sentinelRef} />
+                  {loading && <p className="text-sm text-gray-500">Carregando vagas...</p>}
                 </div>
               </div>
             </div>
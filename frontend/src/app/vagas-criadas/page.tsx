@@ -39,7 +39,7 @@ export default function DashboardEmpresa() {
   useEffect(() => {
     const fetchJobs = async () => {
       try {
-        const response = await fetch(`http://localhost:8000/businesses/${businessEmail}/jobs`)
+        const response = await fetch(`http://localhost:8000/businesses/${businessEmail}/dashboard`)
         if (response.ok) {
           const jobs = await response.json()
           setVagasEmpresa(jobs)
@@ -100,7 +100,7 @@ export default function DashboardEmpresa() {
       })
 
       if (response.ok) {
-        const jobsResponse = await fetch(`http://localhost:8000/businesses/${businessEmail}/jobs`)
+        const jobsResponse = await fetch(`http://localhost:8000/businesses/${businessEmail}/dashboard`)
         if (jobsResponse.ok) {
           const jobs = await jobsResponse.json()
           setVagasEmpresa(jobs)
@@ -255,6 +255,7 @@ export default function DashboardEmpresa() {
                       <TableHead>Vaga</TableHead>
                       <TableHead>Localização</TableHead>
                       <TableHead>Data de Criação</TableHead>
+                      <TableHead>Candidatos</TableHead>
                       <TableHead>Status</TableHead>
                       <TableHead>Grupos Sociais</TableHead>
                       <TableHead>Ações</TableHead>
@@ -279,6 +280,13 @@ export default function DashboardEmpresa() {
                             {new Date(vaga.posted_date).toLocaleDateString('pt-BR')}
                           </div>
                         </TableCell>
+                        <TableCell>
+                          <div className="font-medium">{vaga.applicant_count}</div>
+                          <div className="text-sm text-gray-500">
+                            {vaga.status_counts.pending} pendentes
+                            {vaga.latest_application_date && ` · última em ${new Date(vaga.latest_application_date).toLocaleDateString('pt-BR')}`}
+                          </div>
+                        </TableCell>
                         <TableCell>
                           <Badge className={getStatusColor(vaga.status || 'Aberta')}>
                             {vaga.status || 'Aberta'}